@@ -0,0 +1,124 @@
+from src.patterns.web_access.extract import ExtractorFactory
+from src.config.logging import logger
+from typing import Dict
+from typing import List
+import argparse
+import tracemalloc
+import random
+import glob
+import time
+import os
+
+
+# Saved pages (*.html) to benchmark against, e.g. pages downloaded from previous scrapes.
+CORPUS_DIR = './data/patterns/web_access/pages'
+BACKENDS = ['bs4', 'lxml', 'stream']
+
+
+def load_corpus(corpus_dir: str) -> List[bytes]:
+    """
+    Loads every saved HTML page from the corpus directory.
+
+    Args:
+        corpus_dir (str): Directory containing *.html / *.htm files.
+
+    Returns:
+        List[bytes]: Raw page contents.
+    """
+    paths = sorted(glob.glob(os.path.join(corpus_dir, '*.htm*')))
+    pages = []
+    for path in paths:
+        with open(path, 'rb') as file:
+            pages.append(file.read())
+    logger.info(f"Loaded {len(pages)} pages from '{corpus_dir}'")
+    return pages
+
+
+def synthetic_corpus(num_pages: int, paragraphs: int = 400, seed: int = 7) -> List[bytes]:
+    """
+    Generates a corpus of boilerplate-heavy pages for when no saved pages are available.
+
+    Args:
+        num_pages (int): Number of pages to generate.
+        paragraphs (int): Paragraphs per page.
+        seed (int): Random seed so runs are comparable.
+
+    Returns:
+        List[bytes]: Raw page contents.
+    """
+    rng = random.Random(seed)
+    words = "hotel fresno review room suite pool breakfast downtown airport rate guest staff clean".split()
+    pages = []
+    for _ in range(num_pages):
+        body = []
+        for i in range(paragraphs):
+            sentence = ' '.join(rng.choice(words) for _ in range(40))
+            if i % 25 == 0:
+                body.append(f"<h2>Section {i}</h2>")
+            body.append(f"<div class='card'><span>{i}</span><p>{sentence} &amp; <a href='#'>more</a></p></div>")
+            body.append("<script>var tracking = {id: 1, items: [1, 2, 3]};</script>")
+        html = f"<html><head><title>Page</title><style>p {{ color: red; }}</style></head><body>{''.join(body)}</body></html>"
+        pages.append(html.encode('utf-8'))
+    return pages
+
+
+def benchmark_backend(name: str, pages: List[bytes], repeat: int) -> Dict[str, float]:
+    """
+    Measures throughput and peak traced memory of one extraction backend.
+
+    Args:
+        name (str): Extraction backend name.
+        pages (List[bytes]): Pages to extract.
+        repeat (int): Number of passes over the corpus.
+
+    Returns:
+        Dict[str, float]: Pages per second, MB per second and peak memory in MB.
+    """
+    extractor = ExtractorFactory.get_extractor(name)
+    total_bytes = sum(len(page) for page in pages) * repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            extractor.extract(page)
+    elapsed = time.perf_counter() - start
+
+    # Peak memory is measured in a separate pass so tracing overhead does not skew throughput.
+    tracemalloc.start()
+    for page in pages:
+        extractor.extract(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'pages_per_sec': len(pages) * repeat / elapsed,
+        'mb_per_sec': total_bytes / elapsed / 1e6,
+        'peak_mb': peak / 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark HTML text extraction backends.")
+    parser.add_argument('--corpus', default=CORPUS_DIR, help="Directory of saved HTML pages.")
+    parser.add_argument('--synthetic', type=int, default=50, help="Pages to generate if the corpus is empty.")
+    parser.add_argument('--repeat', type=int, default=3, help="Passes over the corpus per backend.")
+    parser.add_argument('--backends', nargs='+', default=BACKENDS)
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus) if os.path.isdir(args.corpus) else []
+    if not pages:
+        logger.info(f"No saved pages found, generating {args.synthetic} synthetic pages.")
+        pages = synthetic_corpus(args.synthetic)
+
+    print(f"{'backend':<10}{'pages/s':>12}{'MB/s':>10}{'peak MB':>10}")
+    for name in args.backends:
+        try:
+            stats = benchmark_backend(name, pages, args.repeat)
+        except ImportError as e:
+            print(f"{name:<10}{'skipped (' + str(e) + ')':>32}")
+            continue
+        print(f"{name:<10}{stats['pages_per_sec']:>12.1f}{stats['mb_per_sec']:>10.2f}{stats['peak_mb']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
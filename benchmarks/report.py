@@ -0,0 +1,116 @@
+from src.commons.report import ReportWriter
+from typing import Callable
+from typing import Dict
+from typing import List
+import tracemalloc
+import argparse
+import tempfile
+import random
+import time
+import os
+
+
+SIZES = [1_000, 2_000, 5_000, 10_000]
+SECTION_CHARS = 2_000  # Roughly the size of one extraction result
+
+
+def synthetic_results(num_subtasks: int, seed: int = 7) -> List[tuple]:
+    """
+    Generates subtask results in a shuffled completion order, as they arrive from concurrent sub-agents.
+
+    Args:
+        num_subtasks (int): Number of subtasks.
+        seed (int): Random seed so runs are comparable.
+
+    Returns:
+        List[tuple]: (task key, task description, result) in completion order.
+    """
+    rng = random.Random(seed)
+    body = ("lorem ipsum dolor sit amet " * (SECTION_CHARS // 27 + 1))[:SECTION_CHARS]
+    results = [(f"task_{i + 1}", f"Extraction task {i + 1}", body) for i in range(num_subtasks)]
+    rng.shuffle(results)
+    return results
+
+
+def concatenate(results: List[tuple], keys: List[str]) -> str:
+    """
+    Builds the report the way the coordinators used to: every result is collected first, then
+    appended to a growing string in task order.
+    """
+    by_key = {key: (description, result) for key, description, result in results}
+    document = "Book Analysis Summary:\n\n"
+    for key in keys:
+        description, result = by_key[key]
+        document += f"## {description}\n{result}\n\n"
+    return document
+
+
+def stream_to_buffer(results: List[tuple], keys: List[str]) -> str:
+    """
+    Builds the report with a ReportWriter fed in completion order.
+    """
+    with ReportWriter(keys=keys, header="Book Analysis Summary:\n\n") as report:
+        for key, description, result in results:
+            report.add(key, f"## {description}\n{result}\n\n")
+    return report.getvalue()
+
+
+def stream_to_file(results: List[tuple], keys: List[str]) -> str:
+    """
+    Writes the report to a file with a ReportWriter fed in completion order.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'report.md')
+        with open(path, 'w') as file, ReportWriter(file, keys=keys, header="Book Analysis Summary:\n\n") as report:
+            for key, description, result in results:
+                report.add(key, f"## {description}\n{result}\n\n")
+        return path
+
+
+def benchmark(build: Callable[[List[tuple], List[str]], object], sizes: List[int], repeat: int) -> Dict[int, Dict[str, float]]:
+    """
+    Measures the best time and the peak traced memory of building a report for each number of subtasks.
+
+    Args:
+        build (Callable): Report builder taking the results in completion order and the keys in task order.
+        sizes (List[int]): Numbers of subtasks.
+        repeat (int): Runs per size; the fastest is kept.
+
+    Returns:
+        Dict[int, Dict[str, float]]: Seconds per report and peak memory in MB, keyed by number of subtasks.
+    """
+    stats = {}
+    for size in sizes:
+        results = synthetic_results(size)
+        keys = [f"task_{i + 1}" for i in range(size)]
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            build(results, keys)
+            best = min(best, time.perf_counter() - start)
+
+        # Peak memory is measured in a separate pass so tracing overhead does not skew the timings.
+        tracemalloc.start()
+        build(results, keys)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stats[size] = {'seconds': best, 'peak_mb': peak / 1e6}
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark assembling combined reports from many subtask results.")
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES, help="Numbers of subtasks.")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per size; the fastest is kept.")
+    args = parser.parse_args()
+
+    builders = {'concat': concatenate, 'buffer': stream_to_buffer, 'file': stream_to_file}
+    print(f"{'builder':<10}{'subtasks':>10}{'ms':>10}{'us/subtask':>12}{'peak MB':>10}")
+    for name, build in builders.items():
+        for size, stats in benchmark(build, args.sizes, args.repeat).items():
+            seconds = stats['seconds']
+            print(f"{name:<10}{size:>10}{seconds * 1e3:>10.1f}{seconds / size * 1e6:>12.2f}{stats['peak_mb']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+from src.utils.tokens import estimate_tokens
+from src.llm.generate import ResponseGenerator
+from src.commons.message import Message
+from src.config.logging import logger
+from typing import Optional
+from typing import List
+import asyncio
+
+
+class ChunkedExtractor:
+    """
+    Runs one extraction task over a document too large for a single request. The task is run on
+    every chunk of the document in parallel (map), and the partial extractions are merged by the
+    LLM in groups that fit MERGE_TOKENS until one result remains (reduce), so no request grows
+    with the length of the document. Shared by the decomposition patterns' chunked sub-agents.
+
+    Attributes:
+        MERGE_TOKENS (int): Token budget of the partial extractions merged in one request.
+        semaphore (Optional[asyncio.Semaphore]): Bounds the LLM requests in flight, shared across agents.
+        model_name (str): The model used for extraction and merging.
+    """
+    MERGE_TOKENS = 24_000
+
+    def __init__(self, semaphore: Optional[asyncio.Semaphore] = None, model_name: str = 'gemini-1.5-flash-001') -> None:
+        """
+        Initializes the extractor.
+
+        Args:
+            semaphore (Optional[asyncio.Semaphore]): Bounds concurrent LLM requests (default is no bound).
+            model_name (str): The model used for extraction and merging (default is 'gemini-1.5-flash-001').
+        """
+        self.semaphore = semaphore
+        self.model_name = model_name
+
+    async def _generate(self, llm_input: str) -> str:
+        """
+        Sends one request to the LLM, waiting for the semaphore if one is set.
+
+        Args:
+            llm_input (str): The prompt.
+
+        Returns:
+            str: The response text.
+        """
+        response_generator = ResponseGenerator()
+
+        # Define a blocking function to make the LLM call in a separate thread
+        def blocking_call():
+            return response_generator.generate_response(
+                model_name=self.model_name,
+                system_instruction='',
+                contents=[llm_input]
+            ).text.strip()
+
+        if self.semaphore is None:
+            return await asyncio.to_thread(blocking_call)
+        async with self.semaphore:
+            return await asyncio.to_thread(blocking_call)
+
+    async def extract_chunk(self, chunk: str, task: str, part: int, parts: int) -> Optional[str]:
+        """
+        Runs the task on one chunk.
+
+        Args:
+            chunk (str): The chunk text.
+            task (str): The task description.
+            part (int): 1-based position of the chunk.
+            parts (int): Number of chunks.
+
+        Returns:
+            Optional[str]: The partial extraction, or None if the request failed.
+        """
+        llm_input = (
+            f"Document (part {part} of {parts} of a longer text):\n{chunk}\n\n"
+            f"Task: {task}\nOnly report what this part of the text contains."
+        )
+        try:
+            return await self._generate(llm_input)
+        except Exception as e:
+            logger.error(f"LLM call failed for part {part} of task: {task} - {str(e)}")
+            return None
+
+    async def merge(self, task: str, partials: List[str]) -> str:
+        """
+        Merges partial extractions, in document order, into one result. Partials are merged in
+        groups that fit MERGE_TOKENS, level by level, until one result remains.
+
+        Args:
+            task (str): The task description.
+            partials (List[str]): Partial extractions in document order.
+
+        Returns:
+            str: The merged extraction.
+        """
+        while len(partials) > 1:
+            groups: List[List[str]] = [[]]
+            group_tokens = 0
+            for partial in partials:
+                tokens = estimate_tokens(partial)
+                if groups[-1] and group_tokens + tokens > self.MERGE_TOKENS:
+                    groups.append([])
+                    group_tokens = 0
+                groups[-1].append(partial)
+                group_tokens += tokens
+            if len(groups) == len(partials):
+                # Every partial fills a group on its own; merge pairs so the reduction still converges
+                groups = [partials[i:i + 2] for i in range(0, len(partials), 2)]
+            logger.info(f"Merging {len(partials)} partial results in {len(groups)} groups.")
+            partials = list(await asyncio.gather(*(self._merge_group(task, group) for group in groups)))
+        return partials[0]
+
+    async def _merge_group(self, task: str, group: List[str]) -> str:
+        """
+        Merges one group of partial extractions with a single LLM request.
+
+        Args:
+            task (str): The task description.
+            group (List[str]): Partial extractions in document order.
+
+        Returns:
+            str: The merged extraction (the partial itself for a group of one).
+        """
+        if len(group) == 1:
+            return group[0]
+        parts = "\n\n".join(f"Part {idx}:\n{partial}" for idx, partial in enumerate(group, start=1))
+        llm_input = (
+            f"Task: {task}\n\n"
+            "The following are results of this task, each extracted from a consecutive part of a longer "
+            "document. Merge them into a single result for the whole document: combine entries that "
+            "describe the same item (neighbouring parts overlap, so items may repeat), keep every distinct "
+            "item, and keep the format of the partial results.\n\n"
+            f"{parts}"
+        )
+        try:
+            return await self._generate(llm_input)
+        except Exception as e:
+            logger.error(f"LLM merge failed for task: {task} - {str(e)}")
+            return "\n\n".join(group)
+
+    async def run(self, chunks: List[str], task: str) -> str:
+        """
+        Runs the task over all chunks and merges the partial extractions.
+
+        Args:
+            chunks (List[str]): The chunks of the document, in order.
+            task (str): The task description.
+
+        Returns:
+            str: The merged extraction, or a failure notice if no chunk could be processed.
+        """
+        partials = await asyncio.gather(
+            *(self.extract_chunk(chunk, task, part, len(chunks)) for part, chunk in enumerate(chunks, start=1))
+        )
+        partials = [partial for partial in partials if partial]
+        if not partials:
+            return f"Failed to extract information for task: {task}"
+        return await self.merge(task, partials)
+
+
+class ChunkedSubTaskAgent:
+    """
+    An agent that runs one extraction subtask over a document too large for a single request, as
+    a map-reduce over the document's chunks (see ChunkedExtractor). It has the same interface as
+    the decomposition patterns' agents (a name and `async process(Message) -> Message`), so both
+    coordinators use it directly.
+
+    Attributes:
+        name (str): The name of the agent.
+        extractor (ChunkedExtractor): Runs the task over the chunks and merges the partial extractions.
+    """
+
+    def __init__(self, name: str, semaphore: Optional[asyncio.Semaphore] = None) -> None:
+        """
+        Initializes the ChunkedSubTaskAgent.
+
+        Args:
+            name (str): The name of the agent.
+            semaphore (Optional[asyncio.Semaphore]): Bounds concurrent LLM requests, shared across agents (default is no bound).
+        """
+        self.name = name
+        self.extractor = ChunkedExtractor(semaphore)
+        logger.info(f"{self.name} initialized.")
+
+    async def process(self, message: Message) -> Message:
+        """
+        Runs the subtask over all chunks of the document and merges the partial extractions.
+
+        Args:
+            message (Message): The message containing the document chunks ("chunks") and the task ("task").
+
+        Returns:
+            Message: A message containing the merged extraction.
+        """
+        logger.info(f"{self.name} processing chunked subtask.")
+        chunks: List[str] = message.content.get("chunks")
+        task = message.content.get("task")
+
+        if not chunks or not task:
+            logger.error(f"Invalid subtask received by {self.name}: Missing chunks or task.")
+            return Message(content="Invalid subtask: Missing document or task.", sender=self.name, recipient=message.sender)
+
+        extraction_result = await self.extractor.run(chunks, task)
+        return Message(content=extraction_result, sender=self.name, recipient=message.sender)
@@ -0,0 +1,101 @@
+from typing import Iterable
+from typing import Hashable
+from typing import Optional
+from typing import TextIO
+from typing import Dict
+from typing import List
+import io
+
+
+class ReportWriter:
+    """
+    Assembles a report section by section as results arrive, writing each section to a file or an
+    in-memory buffer as soon as it can be placed, so the cost of a report is linear in its size
+    however many sections it has.
+
+    When the order of the section keys is given, sections are written in that order: a section
+    that arrives early is held until every section before it has been written. Without an order,
+    sections are written as they arrive.
+
+    Attributes:
+        file (TextIO): Destination of the report.
+        separator (str): Text written between consecutive sections.
+        written (int): Number of sections written so far.
+    """
+
+    def __init__(self, file: Optional[TextIO] = None, keys: Optional[Iterable[Hashable]] = None,
+                 header: str = '', separator: str = '') -> None:
+        """
+        Initializes the ReportWriter and writes the header.
+
+        Args:
+            file (Optional[TextIO]): Destination of the report (default is an in-memory buffer).
+            keys (Optional[Iterable[Hashable]]): Section keys in report order (default is arrival order).
+            header (str): Text written before the first section (default is none).
+            separator (str): Text written between consecutive sections (default is none).
+        """
+        self.file = file if file is not None else io.StringIO()
+        self.separator = separator
+        self.written = 0
+        self._order: Optional[List[Hashable]] = list(keys) if keys is not None else None
+        self._positions: Dict[Hashable, int] = {key: idx for idx, key in enumerate(self._order or [])}
+        self._next = 0  # Position in the order of the next section to write
+        self._pending: Dict[Hashable, str] = {}
+        if header:
+            self.file.write(header)
+
+    def _emit(self, text: str) -> None:
+        if self.written and self.separator:
+            self.file.write(self.separator)
+        self.file.write(text)
+        self.written += 1
+
+    def add(self, key: Hashable, text: str) -> None:
+        """
+        Adds the section for a key, writing it and any held sections that can now follow it.
+
+        Args:
+            key (Hashable): Key of the section.
+            text (str): The section text.
+
+        Raises:
+            KeyError: If the keys were given and the key is not one of them.
+        """
+        if self._order is None:
+            self._emit(text)
+            return
+        if key not in self._positions:
+            raise KeyError(f"Unknown report section: {key!r}")
+        self._pending[key] = text
+        while self._next < len(self._order) and self._order[self._next] in self._pending:
+            self._emit(self._pending.pop(self._order[self._next]))
+            self._next += 1
+
+    def close(self) -> None:
+        """
+        Writes the sections still held back by a missing section, in report order. The file
+        itself is left open.
+        """
+        for key in sorted(self._pending, key=self._positions.get):
+            self._emit(self._pending[key])
+        self._pending.clear()
+        if self._order is not None:
+            self._next = len(self._order)
+
+    def getvalue(self) -> str:
+        """
+        Returns:
+            str: The report written so far, if it is written to an in-memory buffer.
+
+        Raises:
+            TypeError: If the report is written to a file.
+        """
+        if not isinstance(self.file, io.StringIO):
+            raise TypeError("The report is not written to an in-memory buffer.")
+        return self.file.getvalue()
+
+    def __enter__(self) -> 'ReportWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
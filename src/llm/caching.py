@@ -0,0 +1,190 @@
+from vertexai.preview.generative_models import GenerativeModel
+from vertexai.generative_models import GenerationResponse
+from src.llm.strategy import GenerationStrategyFactory
+from src.utils.tokens import estimate_total_tokens
+from src.llm.generate import ResponseGenerator
+from vertexai.preview import caching
+from src.config.logging import logger
+from abc import abstractmethod
+from datetime import timedelta
+from typing import Optional
+from typing import Dict
+from typing import List
+from typing import Any
+from abc import ABC
+
+
+class CachedContext(ABC):
+    """
+    A large, shared prompt prefix (e.g. a document) that several requests are answered against.
+    Each request only sends its own contents; the prefix is supplied by the context.
+    """
+
+    @abstractmethod
+    def generate_response(self, contents: List[str], response_schema: Optional[Dict[str, Any]] = None) -> GenerationResponse:
+        """
+        Generates a response to contents that follow the cached prefix.
+
+        Args:
+            contents (List[str]): Request-specific contents.
+            response_schema (Optional[Dict[str, Any]]): Schema defining response structure (default is None).
+
+        Returns:
+            GenerationResponse: Generated response object.
+
+        Raises:
+            NotImplementedError: If the subclass does not implement this method.
+        """
+        raise NotImplementedError("Subclasses must implement the `generate_response` method")
+
+    def close(self) -> None:
+        """
+        Releases the cached prefix.
+        """
+
+
+class VertexCachedContext(CachedContext):
+    """
+    Context backed by Vertex AI context caching: the prefix is uploaded once as cached content and
+    billed at the cached-token rate by every request that references it.
+
+    Attributes:
+        cached_content (caching.CachedContent): Handle of the cached prefix.
+    """
+
+    def __init__(self, model_name: str, system_instruction: str, contents: List[str], ttl: timedelta,
+                 strategy_type: str = "default") -> None:
+        """
+        Uploads the prefix as cached content.
+
+        Args:
+            model_name (str): Versioned name of the model, e.g. 'gemini-1.5-flash-001'.
+            system_instruction (str): Instruction for the model (empty for none).
+            contents (List[str]): Contents to cache.
+            ttl (timedelta): How long the cached content lives.
+            strategy_type (str): Generation strategy for configuration and safety settings (default is "default").
+
+        Raises:
+            Exception: If the cached content cannot be created.
+        """
+        self.generation_strategy = GenerationStrategyFactory.get_strategy(strategy_type)
+        self.cached_content = caching.CachedContent.create(
+            model_name=model_name,
+            system_instruction=system_instruction or None,
+            contents=contents,
+            ttl=ttl
+        )
+        self._model = GenerativeModel.from_cached_content(cached_content=self.cached_content)
+        logger.info(f"Created cached content {self.cached_content.name} for {model_name}.")
+
+    def generate_response(self, contents: List[str], response_schema: Optional[Dict[str, Any]] = None) -> GenerationResponse:
+        """
+        Generates a response to contents that follow the cached prefix.
+
+        Args:
+            contents (List[str]): Request-specific contents.
+            response_schema (Optional[Dict[str, Any]]): Schema defining response structure (default is None).
+
+        Returns:
+            GenerationResponse: Generated response object.
+
+        Raises:
+            Exception: If an error occurs during response generation.
+        """
+        try:
+            generation_config = self.generation_strategy.create_generation_config(response_schema) if response_schema else None
+            return self._model.generate_content(
+                contents,
+                generation_config=generation_config,
+                safety_settings=self.generation_strategy.create_safety_settings()
+            )
+        except Exception as e:
+            logger.error(f"Error generating response from cached content: {e}")
+            raise
+
+    def close(self) -> None:
+        """
+        Deletes the cached content instead of waiting for its TTL.
+        """
+        try:
+            self.cached_content.delete()
+        except Exception as e:
+            logger.warning(f"Could not delete cached content {self.cached_content.name}: {e}")
+
+
+class LocalCachedContext(CachedContext):
+    """
+    Local stand-in with the same interface: the prefix is kept in memory and sent with every
+    request. Used where context caching is unavailable, e.g. for prefixes below the caching minimum.
+
+    Attributes:
+        model_name (str): Name of the model.
+        system_instruction (str): Instruction for the model.
+        contents (List[str]): The prefix contents.
+    """
+
+    def __init__(self, model_name: str, system_instruction: str, contents: List[str]) -> None:
+        """
+        Initializes the context.
+
+        Args:
+            model_name (str): Name of the model.
+            system_instruction (str): Instruction for the model (empty for none).
+            contents (List[str]): The prefix contents.
+        """
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.contents = contents
+        self.response_generator = ResponseGenerator()
+
+    def generate_response(self, contents: List[str], response_schema: Optional[Dict[str, Any]] = None) -> GenerationResponse:
+        """
+        Generates a response to the prefix followed by the request-specific contents.
+
+        Args:
+            contents (List[str]): Request-specific contents.
+            response_schema (Optional[Dict[str, Any]]): Schema defining response structure (default is None).
+
+        Returns:
+            GenerationResponse: Generated response object.
+        """
+        return self.response_generator.generate_response(
+            self.model_name, self.system_instruction, self.contents + contents, response_schema
+        )
+
+
+class CachedContextFactory:
+    """
+    Factory for cached contexts, falling back to the local stand-in when Vertex AI context caching
+    cannot be used.
+
+    Attributes:
+        MIN_CACHE_TOKENS (int): Smallest prefix Vertex AI accepts as cached content.
+        TTL (timedelta): Default lifetime of cached content.
+    """
+    MIN_CACHE_TOKENS = 32_768
+    TTL = timedelta(minutes=30)
+
+    @staticmethod
+    def create(model_name: str, system_instruction: str, contents: List[str], ttl: timedelta = TTL) -> CachedContext:
+        """
+        Creates a context for the given prefix.
+
+        Args:
+            model_name (str): Versioned name of the model, e.g. 'gemini-1.5-flash-001'.
+            system_instruction (str): Instruction for the model (empty for none).
+            contents (List[str]): The prefix contents.
+            ttl (timedelta): Lifetime of cached content (default is 30 minutes).
+
+        Returns:
+            CachedContext: A Vertex AI cached context, or the local stand-in.
+        """
+        tokens = estimate_total_tokens([system_instruction, *contents])
+        if tokens < CachedContextFactory.MIN_CACHE_TOKENS:
+            logger.info(f"Prefix of ~{tokens} tokens is below the context caching minimum; using a local context.")
+            return LocalCachedContext(model_name, system_instruction, contents)
+        try:
+            return VertexCachedContext(model_name, system_instruction, contents, ttl)
+        except Exception as e:
+            logger.warning(f"Context caching unavailable ({e}); using a local context.")
+            return LocalCachedContext(model_name, system_instruction, contents)
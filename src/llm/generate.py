@@ -4,9 +4,12 @@ from src.llm.factory import ModelFactoryProvider
 from src.config.logging import logger
 from src.config.setup import *
 from typing import Optional
+from typing import Tuple
 from typing import List 
 from typing import Dict 
 from typing import Any 
+import itertools
+import asyncio
 import time
 
 
@@ -18,7 +21,11 @@ class ResponseGenerator:
     Attributes:
         model_factory: Instance of ModelFactoryProvider for creating model instances.
         generation_strategy: Strategy selected for content generation.
+        QUOTA_RETRIES: Number of times a call failing with a 429 quota error is retried.
+        QUOTA_RETRY_DELAY: Seconds to wait before retrying after a 429 quota error.
     """
+    QUOTA_RETRIES = 1
+    QUOTA_RETRY_DELAY = 60
 
     def __init__(self, strategy_type: str = "default") -> None:
         """
@@ -48,60 +55,103 @@ class ResponseGenerator:
             Exception: If an error occurs during response generation.
         """
         logger.info("Starting response generation.")
-        
+        model, generation_config, safety_settings = self._prepare(model_name, system_instruction, response_schema)
+        for attempt in itertools.count():
+            try:
+                response = model.generate_content(
+                    contents, 
+                    generation_config=generation_config, 
+                    safety_settings=safety_settings,
+                    tools=tools
+                )
+                logger.info("Response generated successfully.")
+                return response 
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    async def agenerate_response(self, model_name: str, system_instruction: str, contents: List[str], response_schema: Optional[Dict[str, Any]] = None, tools: List[Any] = None) -> GenerationResponse:
+        """
+        Asynchronous counterpart of `generate_response` that awaits the model without blocking the event loop.
+
+        Args:
+            model_name (str): Name of the model for generation.
+            system_instruction (str): Instruction or prompt for the model.
+            contents (List[str]): Content input list for response generation.
+            response_schema (Optional[Dict[str, Any]]): Schema defining response structure and constraints (default is None).
+            tools (List[Any]): Tools passed to the model for content generation (default is None).
+
+        Returns:
+            GenerationResponse: Generated response object.
+
+        Raises:
+            Exception: If an error occurs during response generation.
+        """
+        logger.info("Starting asynchronous response generation.")
+        model, generation_config, safety_settings = self._prepare(model_name, system_instruction, response_schema)
+        for attempt in itertools.count():
+            try:
+                response = await model.generate_content_async(
+                    contents, 
+                    generation_config=generation_config, 
+                    safety_settings=safety_settings,
+                    tools=tools
+                )
+                logger.info("Response generated successfully.")
+                return response 
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+    def _prepare(self, model_name: str, system_instruction: str, response_schema: Optional[Dict[str, Any]]) -> Tuple[Any, Any, Any]:
+        """
+        Creates the model and the generation settings shared by the sync and async paths.
+
+        Args:
+            model_name (str): Name of the model for generation.
+            system_instruction (str): Instruction or prompt for the model.
+            response_schema (Optional[Dict[str, Any]]): Schema defining response structure and constraints.
+
+        Returns:
+            Tuple[Any, Any, Any]: The model instance, generation configuration and safety settings.
+
+        Raises:
+            Exception: If the model or the settings cannot be created.
+        """
         try:
             logger.info(f"Creating model instance for: {model_name}")
             model = self.model_factory.create_model(model_name, system_instruction)
             logger.info("Model created successfully.")
-            
+
             # Prepare generation configuration and safety settings
             generation_config = self.generation_strategy.create_generation_config(response_schema) if response_schema else None
             safety_settings = self.generation_strategy.create_safety_settings()
-            
-            response = model.generate_content(
-                contents, 
-                generation_config=generation_config, 
-                safety_settings=safety_settings,
-                tools=tools
-            )
-            logger.info("Response generated successfully.")
-            return response 
-        
+            return model, generation_config, safety_settings
         except Exception as e:
-            if "429" in str(e) and "Resource exhausted" in str(e):
-                logger.error("Quota exceeded: 429 Resource exhausted. Retrying in 60 seconds.")
-                time.sleep(60)  # Retry after delay due to quota limits
-                return self._retry_generate_response(model, contents, generation_config, safety_settings, tools)
-            else:
-                logger.error(f"Error generating response: {e}")
-                raise
-
-    def _retry_generate_response(self, model, contents, generation_config, safety_settings, tools) -> GenerationResponse:
+            logger.error(f"Error generating response: {e}")
+            raise
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
         """
-        Retries response generation once after a 429 quota limit error.
+        Retry policy shared by the sync and async paths: a 429 quota error is retried after
+        QUOTA_RETRY_DELAY seconds, up to QUOTA_RETRIES times; any other error is not retried.
 
         Args:
-            model: Model instance to retry with.
-            contents (List[str]): Content input for response generation.
-            generation_config (Any): Configuration for generation.
-            safety_settings (Any): Safety settings for the model.
-            tools (List[Any]): Tools passed to the model.
+            error (Exception): The error raised by the model call.
+            attempt (int): Number of the failed attempt, starting at 0.
 
         Returns:
-            GenerationResponse: The response after retry.
-            
-        Raises:
-            Exception: If the retry fails or another error occurs.
+            Optional[float]: Seconds to wait before retrying, or None to give up and re-raise.
         """
-        try:
-            response = model.generate_content(
-                contents,
-                generation_config=generation_config,
-                safety_settings=safety_settings,
-                tools=tools
-            )
-            logger.info("Response generated successfully after retry.")
-            return response
-        except Exception as retry_error:
-            logger.error(f"Retry failed: {retry_error}")
-            raise
+        if "429" in str(error) and "Resource exhausted" in str(error):
+            if attempt < self.QUOTA_RETRIES:
+                logger.error(f"Quota exceeded: 429 Resource exhausted. Retrying in {self.QUOTA_RETRY_DELAY} seconds.")
+                return self.QUOTA_RETRY_DELAY
+            logger.error(f"Retry failed: {error}")
+            return None
+        logger.error(f"Error generating response: {error}")
+        return None
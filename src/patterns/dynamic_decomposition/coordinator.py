@@ -1,12 +1,24 @@
+from src.patterns.dynamic_decomposition.delegates import PackedSubTaskAgent
 from src.patterns.dynamic_decomposition.delegates import SubTaskAgent
+from src.patterns.dynamic_decomposition.plans import DECOMPOSITION_PROMPT
 from src.patterns.dynamic_decomposition.agent import Agent
+from src.patterns.dynamic_decomposition.plans import PlanCache
+from src.llm.caching import CachedContextFactory
 from src.llm.generate import ResponseGenerator
+from src.llm.caching import CachedContext
+from src.utils.chunk import sample_chunks
+from src.utils.chunk import chunk_text
+from src.commons.report import ReportWriter
+from src.commons.mapreduce import ChunkedSubTaskAgent
 from src.commons.message import Message
 from src.config.logging import logger
+from typing import Optional
+from typing import Dict
 from typing import List
 from typing import Any 
 import asyncio
 import json
+import re
 
 
 class CoordinatorAgent(Agent):
@@ -14,16 +26,63 @@ class CoordinatorAgent(Agent):
     An agent responsible for coordinating the decomposition of a main task 
     (such as analyzing a book) into independent subtasks. Subtasks are assigned 
     to sub-agents for parallel processing.
-    """
 
-    def __init__(self, name: str) -> None:
+    The mode decides how often the book is sent to the LLM:
+    - 'parallel' (default): one request per subtask, each carrying the whole book.
+    - 'packed': subtasks are packed PACK_SIZE at a time into structured requests keyed by task id,
+      so the book is sent once per group; tasks a packed answer misses are retried individually.
+    - 'cached': the book is held in a cached context (Vertex AI context caching, or a local stand-in
+      for books below the caching minimum) and every request, including the decomposition, only
+      sends its instructions.
+    - 'chunked': for books larger than one request, the book is split into chunks of CHUNK_TOKENS;
+      subtasks are planned from an excerpt of CHUNK_TOKENS sampled across all chunks, and every
+      subtask runs over all chunks in parallel with its partial extractions merged afterwards
+      (map-reduce).
+
+    Decomposition plans are cached (see PlanCache) per document and prompt version, and per genre
+    when one is given, so a book analyzed before, or a new book of a known genre, starts fanning
+    out without first sending the whole book to the LLM for planning.
+
+    Attributes:
+        MODES (Tuple[str, ...]): Supported execution modes.
+        PACK_SIZE (int): Maximum number of subtasks per packed request.
+        CHUNK_TOKENS (int): Token budget of one chunk in chunked mode.
+        CHUNK_OVERLAP_TOKENS (int): Tokens shared by consecutive chunks in chunked mode.
+        MAX_CONCURRENT_REQUESTS (int): Maximum number of LLM requests in flight in chunked mode.
+        mode (str): The execution mode.
+        genre (Optional[str]): Genre of the books analyzed, used to share plan templates.
+        plans (Optional[PlanCache]): Decomposition plan cache, or None to always plan with the LLM.
+    """
+    MODES = ('parallel', 'packed', 'cached', 'chunked')
+    PACK_SIZE = 10
+    CHUNK_TOKENS = 8_000
+    CHUNK_OVERLAP_TOKENS = 200
+    MAX_CONCURRENT_REQUESTS = 16
+
+    def __init__(self, name: str, mode: str = 'parallel', genre: Optional[str] = None,
+                 plans: Optional[PlanCache] = None, use_plan_cache: bool = True) -> None:
         """
         Initializes the CoordinatorAgent with the specified name.
 
         Args:
             name (str): The name of this coordinator agent.
+            mode (str): The execution mode, one of MODES (default is 'parallel').
+            genre (Optional[str]): Genre of the books analyzed; plans are reused across books of the same genre (default is None).
+            plans (Optional[PlanCache]): Decomposition plan cache (default is the shared cache at PLAN_CACHE_PATH).
+            use_plan_cache (bool): Whether to cache decomposition plans at all (default is True).
+
+        Raises:
+            ValueError: If the mode is not supported.
         """
         super().__init__(name)
+        if mode not in self.MODES:
+            logger.error(f"Unknown decomposition mode: {mode}")
+            raise ValueError(f"Unknown decomposition mode: {mode}")
+        self.mode = mode
+        self.genre = genre
+        self.plans = plans
+        if self.plans is None and use_plan_cache:
+            self.plans = PlanCache()
         logger.info(f"{self.name} initialized.")
 
     async def process(self, message: Message) -> Message:
@@ -38,29 +97,30 @@ class CoordinatorAgent(Agent):
             Message: The final result after processing all subtasks.
         """
         logger.info(f"{self.name} processing message.")
+        context: Optional[CachedContext] = None
         try:
             book_content = message.content  # Extract book content from the message
 
-            # Decompose the main task into subtasks using an LLM
-            subtasks = await self.decompose_task(book_content)
-
-            # Create sub-agents and execute subtasks concurrently
-            tasks = []
-            for idx, subtask in subtasks.items():  # Use items() to iterate over key-value pairs
-                agent_name = f"SubTaskAgent_{idx}"
-                agent = SubTaskAgent(name=agent_name)
-                logger.info(f"Assigning subtask: {subtask} to {agent_name}")
-                
-                sub_message = Message(
-                    content={"book": book_content, "task": subtask},
-                    sender=self.name,
-                    recipient=agent_name
+            if self.mode == 'cached':
+                context = await asyncio.to_thread(
+                    CachedContextFactory.create, 'gemini-1.5-flash-001', '', [f"Book Text:\n{book_content}"]
                 )
-                task = asyncio.create_task(agent.process(sub_message))
-                tasks.append(task)
 
-            # Collect results from all sub-agents concurrently
-            sub_results = await asyncio.gather(*tasks)
+            if self.mode == 'chunked':
+                chunks = chunk_text(book_content, self.CHUNK_TOKENS, self.CHUNK_OVERLAP_TOKENS)
+                logger.info(f"Split the book into {len(chunks)} chunks.")
+                # Plan from an excerpt sampled across the whole book, which fits in one request
+                subtasks = await self.decompose_task(sample_chunks(chunks, self.CHUNK_TOKENS))
+                sub_results = await self.run_chunked(chunks, subtasks)
+            else:
+                # Decompose the main task into subtasks using an LLM
+                subtasks = await self.decompose_task(book_content, context)
+
+                # Execute the subtasks with sub-agents
+                if self.mode == 'packed':
+                    sub_results = await self.run_packed(book_content, subtasks)
+                else:
+                    sub_results = await self.run_parallel(book_content, subtasks, context)
 
             # Combine the results, preserving the order of subtasks
             combined_result = self.combine_results(sub_results, subtasks)
@@ -75,36 +135,126 @@ class CoordinatorAgent(Agent):
                 sender=self.name,
                 recipient=message.sender
             )
+        finally:
+            if context is not None:
+                await asyncio.to_thread(context.close)
+
+    async def run_parallel(self, book_content: str, subtasks: Dict[str, str],
+                           context: Optional[CachedContext] = None) -> List[Message]:
+        """
+        Executes each subtask with its own sub-agent, concurrently.
+
+        Args:
+            book_content (str): The content of the book.
+            subtasks (Dict[str, str]): Subtask descriptions keyed by task id.
+            context (Optional[CachedContext]): Cached context holding the book; if given, the book is not sent.
+
+        Returns:
+            List[Message]: The sub-agents' results, in subtask order.
+        """
+        tasks = []
+        for idx, subtask in subtasks.items():  # Use items() to iterate over key-value pairs
+            agent_name = f"SubTaskAgent_{idx}"
+            agent = SubTaskAgent(name=agent_name)
+            logger.info(f"Assigning subtask: {subtask} to {agent_name}")
+
+            content = {"context": context, "task": subtask} if context is not None else {"book": book_content, "task": subtask}
+            sub_message = Message(content=content, sender=self.name, recipient=agent_name)
+            tasks.append(asyncio.create_task(agent.process(sub_message)))
+
+        # Collect results from all sub-agents concurrently
+        return list(await asyncio.gather(*tasks))
+
+    async def run_packed(self, book_content: str, subtasks: Dict[str, str]) -> List[Message]:
+        """
+        Executes the subtasks in structured requests of up to PACK_SIZE subtasks each, then retries
+        the subtasks a packed request did not answer individually.
+
+        Args:
+            book_content (str): The content of the book.
+            subtasks (Dict[str, str]): Subtask descriptions keyed by task id.
+
+        Returns:
+            List[Message]: One result per subtask, in subtask order.
+        """
+        task_ids = list(subtasks)
+        groups = [task_ids[i:i + self.PACK_SIZE] for i in range(0, len(task_ids), self.PACK_SIZE)]
+        tasks = []
+        for idx, group in enumerate(groups):
+            agent_name = f"PackedSubTaskAgent_{idx}"
+            sub_message = Message(
+                content={"book": book_content, "tasks": {task_id: subtasks[task_id] for task_id in group}},
+                sender=self.name,
+                recipient=agent_name
+            )
+            tasks.append(asyncio.create_task(PackedSubTaskAgent(name=agent_name).process(sub_message)))
+
+        answers: Dict[str, Message] = {}
+        for response in await asyncio.gather(*tasks):
+            for task_id, result in response.content.items():
+                answers[task_id] = Message(content=result, sender=response.sender, recipient=self.name)
+
+        missing = {task_id: subtasks[task_id] for task_id in task_ids if task_id not in answers}
+        if missing:
+            logger.warning(f"Packed requests did not answer {list(missing)}; running them individually.")
+            for task_id, result in zip(missing, await self.run_parallel(book_content, missing)):
+                answers[task_id] = result
+        logger.info(f"Ran {len(task_ids)} subtasks in {len(groups) + len(missing)} requests.")
+        return [answers[task_id] for task_id in task_ids]
+
+    async def run_chunked(self, chunks: List[str], subtasks: Dict[str, str]) -> List[Message]:
+        """
+        Executes each subtask over all chunks with its own sub-agent. All sub-agents share one
+        semaphore, so at most MAX_CONCURRENT_REQUESTS LLM requests are in flight.
+
+        Args:
+            chunks (List[str]): The chunks of the book, in order.
+            subtasks (Dict[str, str]): Subtask descriptions keyed by task id.
 
-    async def decompose_task(self, book_content: str) -> dict:
+        Returns:
+            List[Message]: The merged results, in subtask order.
         """
-        Decomposes the main task into exactly 10 independent subtasks using an LLM.
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+        tasks = []
+        for idx, subtask in subtasks.items():
+            agent_name = f"ChunkedSubTaskAgent_{idx}"
+            agent = ChunkedSubTaskAgent(name=agent_name, semaphore=semaphore)
+            sub_message = Message(content={"chunks": chunks, "task": subtask}, sender=self.name, recipient=agent_name)
+            tasks.append(asyncio.create_task(agent.process(sub_message)))
+        return list(await asyncio.gather(*tasks))
+
+    async def decompose_task(self, book_content: str, context: Optional[CachedContext] = None) -> dict:
+        """
+        Decomposes the main task into exactly 10 independent subtasks using an LLM, or reuses the
+        cached plan of the book or of its genre.
 
         Args:
             book_content (str): The content of the book to be analyzed.
+            context (Optional[CachedContext]): Cached context holding the book; if given, the book is not sent.
 
         Returns:
             dict: A dictionary with keys 'task_1', 'task_2', etc., 
                   and corresponding subtask descriptions as values.
         """
+        if self.plans is not None:
+            subtasks = await asyncio.to_thread(self.plans.get, book_content, self.genre)
+            if subtasks is not None:
+                return subtasks
+
         logger.info("Decomposing main task into subtasks using LLM.")
 
         # Construct the prompt for the LLM with a JSON output request
-        llm_input = (
-            "You are an expert in literary analysis. Given the text of a book, generate exactly 10 independent "
-            "extraction tasks that can be executed in parallel. The tasks should focus on extracting different "
-            "types of entities such as characters, locations, themes, plot points, and more. The output should be "
-            "a JSON object with keys 'task_1', 'task_2', ..., and corresponding task descriptions as values. "
-            "Do not include tasks that require math operations like counts and frequency.\n\n"
-            "Book Text:\n"
-            f"{book_content}"
-        )
+        llm_input = DECOMPOSITION_PROMPT
+        if context is None:
+            llm_input += f"\n\nBook Text:\n{book_content}"
 
         try:
             response_generator = ResponseGenerator()
 
             # Blocking function to run in a separate thread
             def blocking_call():
+                if context is not None:
+                    return context.generate_response([llm_input]).text.strip()
                 return response_generator.generate_response(
                     model_name='gemini-1.5-flash-001',
                     system_instruction='',
@@ -119,6 +269,9 @@ class CoordinatorAgent(Agent):
 
             logger.info(f"Subtasks generated by LLM: {subtasks}")
 
+            if self.plans is not None:
+                await asyncio.to_thread(self.plans.set, book_content, subtasks, self.genre)
+
             return subtasks
 
         except Exception as e:
@@ -128,7 +281,7 @@ class CoordinatorAgent(Agent):
     def parse_subtasks(self, decomposition_result: str) -> dict:
         """
         Parses the LLM output from a JSON-formatted string into a dictionary of subtasks.
-        Strips any extra markers like ```json or ``` if present.
+        If the output contains a ```json (or ```) fenced block, only the block is parsed.
 
         Args:
             decomposition_result (str): The raw LLM output in JSON format.
@@ -137,15 +290,18 @@ class CoordinatorAgent(Agent):
             dict: A dictionary of subtasks parsed from the LLM output.
         """
         try:
-            # Remove markdown-like markers ```json and ```
-            decomposition_result = decomposition_result.strip().strip('```json').strip('```')
+            # Keep only the contents of a markdown code fence, if present
+            fenced = re.search(r'```(?:json)?\s*(.*?)\s*```', decomposition_result, re.DOTALL)
+            if fenced:
+                decomposition_result = fenced.group(1)
 
             # Parse the cleaned JSON string into a dictionary
             subtasks = json.loads(decomposition_result)
             
             # Ensure the parsed object is a dictionary
-            if not isinstance(subtasks, dict):
+            if not isinstance(subtasks, dict) or not subtasks:
                 raise ValueError("The LLM output is not in the expected dictionary format.")
+            subtasks = {str(key): str(task) for key, task in subtasks.items()}
 
             logger.info(f"Successfully parsed subtasks: {subtasks}")
             return subtasks
@@ -168,8 +324,7 @@ class CoordinatorAgent(Agent):
         Returns:
             str: A structured document summarizing the results of all subtasks.
         """
-        document = "Book Analysis Summary:\n\n"
-        for idx, (key, task_description) in enumerate(subtasks.items()):
-            result = sub_results[idx]
-            document += f"## {task_description}\n{result.content}\n\n"
-        return document
+        with ReportWriter(keys=subtasks, header="Book Analysis Summary:\n\n") as report:
+            for (key, task_description), result in zip(subtasks.items(), sub_results):
+                report.add(key, f"## {task_description}\n{result.content}\n\n")
+        return report.getvalue()
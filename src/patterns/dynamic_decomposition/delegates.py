@@ -1,14 +1,21 @@
 from src.patterns.dynamic_decomposition.agent import Agent
 from src.llm.generate import ResponseGenerator
+from src.llm.caching import CachedContext
 from src.commons.message import Message
 from src.config.logging import logger
+from typing import Dict
+from typing import Any
 import asyncio
+import json
 
 
 class SubTaskAgent(Agent):
     """
     An agent responsible for processing a specific subtask of document extraction
     by invoking an LLM to extract the required information.
+
+    The subtask carries either the document itself ("book") or a cached context holding the
+    document ("context"), in which case only the task is sent with the request.
     """
 
     def __init__(self, name: str) -> None:
@@ -35,11 +42,12 @@ class SubTaskAgent(Agent):
         
         subtask = message.content
 
-        # Extract the document and the task from the subtask
+        # Extract the document (or its cached context) and the task from the subtask
         document = subtask.get("book")
+        context: CachedContext = subtask.get("context")
         task = subtask.get("task")
 
-        if not document or not task:
+        if not (document or context) or not task:
             logger.error(f"Invalid subtask received by {self.name}: Missing document or task.")
             return Message(
                 content="Invalid subtask: Missing document or task.",
@@ -56,6 +64,8 @@ class SubTaskAgent(Agent):
 
             # Define a blocking function to make the LLM call in a separate thread
             def blocking_call():
+                if context is not None:
+                    return context.generate_response([f"Task: {task}"]).text.strip()
                 return response_generator.generate_response(
                     model_name='gemini-1.5-flash-001',
                     system_instruction='',
@@ -75,3 +85,94 @@ class SubTaskAgent(Agent):
             sender=self.name,
             recipient=message.sender
         )
+
+
+class PackedSubTaskAgent(Agent):
+    """
+    An agent that answers several extraction subtasks over the same document in a single LLM
+    request. The response schema has one property per task id, so the document is sent once for
+    the whole group instead of once per subtask.
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        Initializes the PackedSubTaskAgent with the provided name.
+
+        Args:
+            name (str): The name of the subtask agent.
+        """
+        super().__init__(name)
+        logger.info(f"{self.name} initialized.")
+
+    @staticmethod
+    def build_schema(tasks: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Builds the response schema for a group of tasks.
+
+        Args:
+            tasks (Dict[str, str]): Task descriptions keyed by task id.
+
+        Returns:
+            Dict[str, Any]: An object schema with a required string property per task id.
+        """
+        return {
+            "type": "object",
+            "properties": {
+                task_id: {"type": "string", "description": f"The result of the task: {description}"}
+                for task_id, description in tasks.items()
+            },
+            "required": list(tasks)
+        }
+
+    async def process(self, message: Message) -> Message:
+        """
+        Processes a group of subtasks with one structured LLM request.
+
+        Args:
+            message (Message): The message containing the document ("book") and the tasks keyed by id ("tasks").
+
+        Returns:
+            Message: A message whose content maps each answered task id to its extraction result.
+                Task ids missing from the content were not answered and should be retried individually.
+        """
+        logger.info(f"{self.name} processing packed subtasks.")
+        document = message.content.get("book")
+        tasks: Dict[str, str] = message.content.get("tasks")
+
+        if not document or not tasks:
+            logger.error(f"Invalid subtasks received by {self.name}: Missing document or tasks.")
+            return Message(content={}, sender=self.name, recipient=message.sender)
+
+        task_list = "\n".join(f"- {task_id}: {description}" for task_id, description in tasks.items())
+        llm_input = (
+            f"Document:\n{document}\n\n"
+            "Perform each of the following tasks independently on the document. Answer with a JSON object "
+            "that maps every task id to the full result of that task as text.\n\n"
+            f"Tasks:\n{task_list}"
+        )
+        logger.info(f"Calling LLM for {len(tasks)} packed tasks.")
+
+        try:
+            response_generator = ResponseGenerator()
+
+            # Define a blocking function to make the LLM call in a separate thread
+            def blocking_call():
+                return response_generator.generate_response(
+                    model_name='gemini-1.5-flash-001',
+                    system_instruction='',
+                    contents=[llm_input],
+                    response_schema=self.build_schema(tasks)
+                ).text.strip()
+
+            # Run the blocking LLM call in a separate thread
+            response = json.loads(await asyncio.to_thread(blocking_call))
+            results = {
+                task_id: str(response[task_id]).strip()
+                for task_id in tasks
+                if isinstance(response, dict) and str(response.get(task_id) or '').strip()
+            }
+        except Exception as e:
+            logger.error(f"Packed LLM call failed for tasks {list(tasks)} - {str(e)}")
+            results = {}
+
+        return Message(content=results, sender=self.name, recipient=message.sender)
@@ -0,0 +1,139 @@
+from src.utils.cache import PersistentCache
+from src.config.logging import logger
+from typing import Optional
+from typing import Dict
+import unicodedata
+import hashlib
+
+
+PLAN_CACHE_PATH = './data/patterns/dynamic_decomposition/cache/plans.db'
+PLAN_CACHE_TTL = 30 * 24 * 60 * 60  # Plans are regenerated after a month
+
+DECOMPOSITION_PROMPT = (
+    "You are an expert in literary analysis. Given the text of a book, generate exactly 10 independent "
+    "extraction tasks that can be executed in parallel. The tasks should focus on extracting different "
+    "types of entities such as characters, locations, themes, plot points, and more. The output should be "
+    "a JSON object with keys 'task_1', 'task_2', ..., and corresponding task descriptions as values. "
+    "Do not include tasks that require math operations like counts and frequency."
+)
+
+# Changing the decomposition prompt changes its version, so plans made with an older prompt are not reused
+PROMPT_VERSION = hashlib.sha256(DECOMPOSITION_PROMPT.encode('utf-8')).hexdigest()[:12]
+
+
+def fingerprint(text: str) -> str:
+    """
+    Identifies a document independently of Unicode compatibility forms and whitespace, so a
+    re-encoded or re-wrapped copy of the same book maps to the same plan.
+
+    Args:
+        text (str): The document text.
+
+    Returns:
+        str: SHA-256 hex digest of the normalized text.
+    """
+    normalized = ' '.join(unicodedata.normalize('NFKC', text).split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def genre_key(genre: str) -> str:
+    """
+    Args:
+        genre (str): A genre label, e.g. "Mystery".
+
+    Returns:
+        str: The label normalized for case and spacing.
+    """
+    return ' '.join(unicodedata.normalize('NFKC', genre).split()).casefold()
+
+
+class PlanCache:
+    """
+    Stores decomposition plans (subtask descriptions keyed by task id) for reuse.
+
+    A plan is stored under the fingerprint of the document it was made for and, when a genre is
+    given, as the template for that genre. Lookups try the document first and then the genre
+    template, so a book seen before skips decomposition entirely and a new book of a known genre
+    reuses the plan of the last book of that genre. Both keys include PROMPT_VERSION.
+
+    Attributes:
+        cache (PersistentCache): Backing store of the plans.
+    """
+
+    def __init__(self, cache: Optional[PersistentCache] = None) -> None:
+        """
+        Initializes the PlanCache.
+
+        Args:
+            cache (Optional[PersistentCache]): Backing store (default is a cache at PLAN_CACHE_PATH).
+        """
+        self.cache = cache if cache is not None else PersistentCache(PLAN_CACHE_PATH, ttl=PLAN_CACHE_TTL)
+
+    @staticmethod
+    def document_key(text: str) -> str:
+        """
+        Args:
+            text (str): The document text the plan is made for.
+
+        Returns:
+            str: Cache key of the document's plan.
+        """
+        return PersistentCache.make_key('plan', PROMPT_VERSION, fingerprint(text))
+
+    @staticmethod
+    def template_key(genre: str) -> str:
+        """
+        Args:
+            genre (str): The genre label.
+
+        Returns:
+            str: Cache key of the genre's plan template.
+        """
+        return PersistentCache.make_key('template', PROMPT_VERSION, genre_key(genre))
+
+    @staticmethod
+    def is_valid(plan: object) -> bool:
+        """
+        Args:
+            plan (object): A value read from the cache.
+
+        Returns:
+            bool: Whether the value is a non-empty mapping of task ids to task descriptions.
+        """
+        return (isinstance(plan, dict) and bool(plan)
+                and all(isinstance(task, str) and task.strip() for task in plan.values()))
+
+    def get(self, text: str, genre: Optional[str] = None) -> Optional[Dict[str, str]]:
+        """
+        Looks up a plan for a document, falling back to the genre template.
+
+        Args:
+            text (str): The document text.
+            genre (Optional[str]): The document's genre (default is no genre).
+
+        Returns:
+            Optional[Dict[str, str]]: The plan, or None if neither the document nor its genre has one.
+        """
+        plan = self.cache.get(self.document_key(text))
+        if self.is_valid(plan):
+            logger.info("Reusing the cached decomposition plan of this document.")
+            return plan
+        if genre:
+            plan = self.cache.get(self.template_key(genre))
+            if self.is_valid(plan):
+                logger.info(f"Reusing the decomposition plan template for genre '{genre}'.")
+                return plan
+        return None
+
+    def set(self, text: str, plan: Dict[str, str], genre: Optional[str] = None) -> None:
+        """
+        Stores the plan made for a document, and as the genre template if a genre is given.
+
+        Args:
+            text (str): The document text.
+            plan (Dict[str, str]): Subtask descriptions keyed by task id.
+            genre (Optional[str]): The document's genre (default is no genre).
+        """
+        self.cache.set(self.document_key(text), plan)
+        if genre:
+            self.cache.set(self.template_key(genre), plan)
@@ -0,0 +1,170 @@
+from src.patterns.dynamic_sharding.delegates import EntityResult
+from src.patterns.dynamic_sharding.broker import SQLiteBroker
+from src.patterns.dynamic_sharding.broker import Broker
+from src.patterns.dynamic_sharding.delegates import Delegate
+from src.patterns.web_access.pipeline import PipelineProvider
+from concurrent.futures import ProcessPoolExecutor
+from src.config.logging import logger
+from abc import abstractmethod
+from typing import Optional
+from typing import List
+from abc import ABC
+import multiprocessing
+import asyncio
+import time
+import uuid
+import os
+
+
+def run_shard(entities: List[str]) -> List[EntityResult]:
+    """
+    Processes one shard in the current process with its own event loop. Entry point of pool
+    worker processes and of broker workers. Pages are parsed in-process, since a web_access parse
+    pool in every shard worker would start about one process per core per worker.
+
+    Args:
+        entities (List[str]): The entities of the shard.
+
+    Returns:
+        List[EntityResult]: One result per entity, in shard order.
+    """
+    PipelineProvider.configure(parse_workers=0)
+    delegate = Delegate(name=f"ShardWorker_{os.getpid()}")
+    return asyncio.run(delegate.process_shard(entities))
+
+
+class Backend(ABC):
+    """
+    Abstract base class for execution backends that process shards outside the coordinator's
+    event loop and process.
+    """
+
+    @abstractmethod
+    async def run_shards(self, shards: List[List[str]]) -> List[List[EntityResult]]:
+        """
+        Processes shards, possibly in parallel.
+
+        Args:
+            shards (List[List[str]]): The shards to process.
+
+        Returns:
+            List[List[EntityResult]]: The results of each shard, in shard order.
+
+        Raises:
+            NotImplementedError: If the subclass does not implement this method.
+        """
+        logger.error("Backend run_shards method not implemented.")
+        raise NotImplementedError("Subclasses must implement the `run_shards` method")
+
+    def close(self) -> None:
+        """
+        Releases the backend's resources.
+        """
+
+
+class ProcessPoolBackend(Backend):
+    """
+    Processes shards in a pool of local worker processes, so the CPU-heavy scraping and parsing of
+    different shards runs on different cores. Workers are spawned rather than forked because the
+    coordinator's event loop and threads may be running.
+
+    Attributes:
+        MAX_WORKERS (int): Default number of worker processes.
+        max_workers (int): Number of worker processes.
+    """
+    MAX_WORKERS = os.cpu_count() or 1
+
+    def __init__(self, max_workers: int = MAX_WORKERS) -> None:
+        """
+        Initializes the backend; the pool is started on first use.
+
+        Args:
+            max_workers (int): Number of worker processes (default is the number of cores).
+        """
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def run_shards(self, shards: List[List[str]]) -> List[List[EntityResult]]:
+        """
+        Processes shards in the worker pool.
+
+        Args:
+            shards (List[List[str]]): The shards to process.
+
+        Returns:
+            List[List[EntityResult]]: The results of each shard, in shard order.
+        """
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+            logger.info(f"Started shard pool with {self.max_workers} worker processes.")
+        loop = asyncio.get_running_loop()
+        return list(await asyncio.gather(*(loop.run_in_executor(self._pool, run_shard, shard) for shard in shards)))
+
+    def close(self) -> None:
+        """
+        Shuts down the worker pool, if one was started.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class BrokerBackend(Backend):
+    """
+    Submits shards as tasks to a broker and waits for workers to complete them (see `worker.py`).
+    Any `Broker` implementation can be used; the default `SQLiteBroker` only reaches workers on
+    the same host.
+
+    Attributes:
+        BROKER_PATH (str): Default path of the SQLite broker.
+        POLL_INTERVAL (float): Seconds between checks for completed jobs.
+        broker (Broker): The task broker.
+        timeout (Optional[float]): Seconds to wait for a job before giving up, or None to wait indefinitely.
+    """
+    BROKER_PATH = './data/patterns/dynamic_sharding/broker.db'
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, broker: Optional[Broker] = None, timeout: Optional[float] = None) -> None:
+        """
+        Initializes the backend.
+
+        Args:
+            broker (Optional[Broker]): The task broker (default is a SQLiteBroker at BROKER_PATH).
+            timeout (Optional[float]): Seconds to wait for a job (default is no limit).
+        """
+        self.broker = broker if broker is not None else SQLiteBroker(self.BROKER_PATH)
+        self.timeout = timeout
+
+    async def run_shards(self, shards: List[List[str]]) -> List[List[EntityResult]]:
+        """
+        Submits the shards as one job and polls the broker until workers have completed all of them.
+
+        Args:
+            shards (List[List[str]]): The shards to process.
+
+        Returns:
+            List[List[EntityResult]]: The results of each shard, in shard order.
+
+        Raises:
+            TimeoutError: If the job is not completed within `timeout` seconds.
+        """
+        job = uuid.uuid4().hex
+        await asyncio.to_thread(self.broker.submit, job, shards)
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        try:
+            while True:
+                results = await asyncio.to_thread(self.broker.results, job)
+                if results is not None:
+                    return results
+                if deadline is not None and time.monotonic() > deadline:
+                    logger.error(f"Job {job} was not completed within {self.timeout}s.")
+                    raise TimeoutError(f"Job {job} was not completed within {self.timeout}s")
+                await asyncio.sleep(self.POLL_INTERVAL)
+        finally:
+            await asyncio.to_thread(self.broker.delete, job)
+
+    def close(self) -> None:
+        """
+        Closes the broker connection.
+        """
+        self.broker.close()
@@ -0,0 +1,260 @@
+from src.config.logging import logger
+from abc import abstractmethod
+from typing import Optional
+from typing import Tuple
+from typing import List
+from typing import Any
+from abc import ABC
+import threading
+import sqlite3
+import json
+import time
+import os
+
+
+class Broker(ABC):
+    """
+    Abstract task queue between the coordinator and shard workers. `BrokerBackend` submits jobs and
+    collects their results, and workers (see `worker.serve`) claim and complete tasks, both through
+    this interface only, so workers on other machines just need an implementation backed by a
+    networked queue or database.
+
+    A job is a list of task payloads. Every task must go to exactly one worker at a time, and a
+    claim is a lease: a task whose worker does not complete it in time can be claimed again.
+    Payloads and results are JSON-serializable.
+    """
+
+    @abstractmethod
+    def submit(self, job: str, payloads: List[Any]) -> None:
+        """
+        Enqueues the tasks of a job.
+
+        Args:
+            job (str): Unique job identifier.
+            payloads (List[Any]): JSON-serializable task payloads, in job order.
+
+        Raises:
+            NotImplementedError: If the subclass does not implement this method.
+        """
+        logger.error("Broker submit method not implemented.")
+        raise NotImplementedError("Subclasses must implement the `submit` method")
+
+    @abstractmethod
+    def claim(self, worker: str) -> Optional[Tuple[str, int, Any]]:
+        """
+        Claims a pending task, or a claimed task whose lease has expired.
+
+        Args:
+            worker (str): Name of the claiming worker.
+
+        Returns:
+            Optional[Tuple[str, int, Any]]: Job, position and payload of the task, or None if there is no work.
+
+        Raises:
+            NotImplementedError: If the subclass does not implement this method.
+        """
+        logger.error("Broker claim method not implemented.")
+        raise NotImplementedError("Subclasses must implement the `claim` method")
+
+    @abstractmethod
+    def complete(self, job: str, position: int, result: Any) -> None:
+        """
+        Stores the result of a task.
+
+        Args:
+            job (str): Job identifier.
+            position (int): Position of the task in the job.
+            result (Any): JSON-serializable result.
+
+        Raises:
+            NotImplementedError: If the subclass does not implement this method.
+        """
+        logger.error("Broker complete method not implemented.")
+        raise NotImplementedError("Subclasses must implement the `complete` method")
+
+    @abstractmethod
+    def results(self, job: str) -> Optional[List[Any]]:
+        """
+        Collects the results of a job once all of its tasks are done.
+
+        Args:
+            job (str): Job identifier.
+
+        Returns:
+            Optional[List[Any]]: Results in job order, or None while tasks are outstanding.
+
+        Raises:
+            NotImplementedError: If the subclass does not implement this method.
+        """
+        logger.error("Broker results method not implemented.")
+        raise NotImplementedError("Subclasses must implement the `results` method")
+
+    @abstractmethod
+    def delete(self, job: str) -> None:
+        """
+        Removes the tasks of a job.
+
+        Args:
+            job (str): Job identifier.
+
+        Raises:
+            NotImplementedError: If the subclass does not implement this method.
+        """
+        logger.error("Broker delete method not implemented.")
+        raise NotImplementedError("Subclasses must implement the `delete` method")
+
+    def close(self) -> None:
+        """
+        Releases the broker's resources.
+        """
+
+
+class SQLiteBroker(Broker):
+    """
+    Broker in a SQLite file, standing in for a message broker between the coordinator and shard
+    workers on the same machine, e.g. for testing. The database uses write-ahead logging, which needs
+    shared memory between its clients, so the file must be on a local filesystem and cannot be
+    shared between machines (e.g. over NFS or SMB).
+
+    A job is a list of shards stored as tasks. Workers claim one pending task at a time inside an
+    immediate transaction, so every task goes to exactly one worker. A claim is a lease: a task
+    whose worker has not completed it within `lease` seconds (e.g. because the worker crashed) can
+    be claimed again.
+
+    Attributes:
+        path (str): Path to the SQLite database file.
+        lease (float): Seconds after which a claimed, unfinished task can be claimed again.
+    """
+    LEASE = 600.0
+
+    def __init__(self, path: str, lease: float = LEASE) -> None:
+        """
+        Opens (or creates) the broker database.
+
+        Args:
+            path (str): Path to the SQLite database file.
+            lease (float): Seconds a claim is valid for (default is 600).
+        """
+        self.path = path
+        self.lease = lease
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "job TEXT NOT NULL, position INTEGER NOT NULL, payload TEXT NOT NULL, status TEXT NOT NULL, "
+            "worker TEXT, claimed_at REAL, result TEXT, PRIMARY KEY (job, position))"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, claimed_at)")
+
+    def __repr__(self) -> str:
+        return f"SQLiteBroker('{self.path}')"
+
+    def submit(self, job: str, payloads: List[Any]) -> None:
+        """
+        Enqueues the tasks of a job.
+
+        Args:
+            job (str): Unique job identifier.
+            payloads (List[Any]): JSON-serializable task payloads, in job order.
+        """
+        rows = [(job, position, json.dumps(payload, ensure_ascii=False)) for position, payload in enumerate(payloads)]
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.executemany(
+                    "INSERT INTO tasks (job, position, payload, status) VALUES (?, ?, ?, 'pending')", rows
+                )
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+        logger.info(f"Submitted job {job} with {len(rows)} tasks to '{self.path}'.")
+
+    def claim(self, worker: str) -> Optional[Tuple[str, int, Any]]:
+        """
+        Claims the oldest pending task, or a claimed task whose lease has expired.
+
+        Args:
+            worker (str): Name of the claiming worker.
+
+        Returns:
+            Optional[Tuple[str, int, Any]]: Job, position and payload of the task, or None if there is no work.
+        """
+        now = time.time()
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._connection.execute(
+                    "SELECT job, position, payload FROM tasks "
+                    "WHERE status = 'pending' OR (status = 'claimed' AND claimed_at < ?) "
+                    "ORDER BY rowid LIMIT 1",
+                    (now - self.lease,)
+                ).fetchone()
+                if row is not None:
+                    self._connection.execute(
+                        "UPDATE tasks SET status = 'claimed', worker = ?, claimed_at = ? WHERE job = ? AND position = ?",
+                        (worker, now, row[0], row[1])
+                    )
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job, position, payload = row
+        return job, position, json.loads(payload)
+
+    def complete(self, job: str, position: int, result: Any) -> None:
+        """
+        Stores the result of a task.
+
+        Args:
+            job (str): Job identifier.
+            position (int): Position of the task in the job.
+            result (Any): JSON-serializable result.
+        """
+        with self._lock:
+            self._connection.execute(
+                "UPDATE tasks SET status = 'done', result = ? WHERE job = ? AND position = ?",
+                (json.dumps(result, ensure_ascii=False), job, position)
+            )
+
+    def results(self, job: str) -> Optional[List[Any]]:
+        """
+        Collects the results of a job once all of its tasks are done.
+
+        Args:
+            job (str): Job identifier.
+
+        Returns:
+            Optional[List[Any]]: Results in job order, or None while tasks are outstanding.
+        """
+        with self._lock:
+            outstanding = self._connection.execute(
+                "SELECT COUNT(*) FROM tasks WHERE job = ? AND status != 'done'", (job,)
+            ).fetchone()[0]
+            if outstanding:
+                return None
+            rows = self._connection.execute(
+                "SELECT result FROM tasks WHERE job = ? ORDER BY position", (job,)
+            ).fetchall()
+        return [json.loads(result) for (result,) in rows]
+
+    def delete(self, job: str) -> None:
+        """
+        Removes the tasks of a job.
+
+        Args:
+            job (str): Job identifier.
+        """
+        with self._lock:
+            self._connection.execute("DELETE FROM tasks WHERE job = ?", (job,))
+
+    def close(self) -> None:
+        """
+        Closes the underlying database connection.
+        """
+        with self._lock:
+            self._connection.close()
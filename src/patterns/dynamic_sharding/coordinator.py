@@ -1,7 +1,20 @@
+from src.patterns.dynamic_sharding.backends import ProcessPoolBackend
+from src.patterns.dynamic_sharding.sharder import AdaptiveSharder
+from src.patterns.dynamic_sharding.backends import Backend
+from src.patterns.dynamic_sharding.delegates import EntityResult
+from src.patterns.dynamic_sharding.delegates import clean_entity
+from src.patterns.dynamic_sharding.delegates import entity_key
+from src.patterns.dynamic_sharding.delegates import WorkerStats
 from src.patterns.dynamic_sharding.delegates import Delegate
 from src.patterns.dynamic_sharding.agent import Agent
 from src.commons.message import Message
 from src.config.logging import logger
+from typing import AsyncIterator
+from collections import deque
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+from typing import Dict
 from typing import List
 import asyncio
 
@@ -11,18 +24,47 @@ class Coordinator(Agent):
     An agent that coordinates the processing of a list of entities by sharding
     the list and dynamically creating sub-agents to process each shard in parallel.
 
+    The message's `mode` selects how entities are distributed:
+    - 'adaptive' (default): shards are cut from the remaining entities whenever capacity frees up,
+      sized from the observed latency, error rate and rate-limit headroom (see AdaptiveSharder).
+    - 'pool': a fixed pool of workers pulls entities one at a time from a shared queue, so an idle
+      worker always takes the next entity and tail latency is bounded by the slowest single entity.
+    - 'fixed': the list is sliced into `shard_size` shards that all run at once.
+    - 'distributed': `shard_size` shards are handed to the coordinator's execution backend, which
+      runs them in other processes or on other machines (see backends.py).
+    In 'adaptive', 'pool' and 'distributed' mode failed entities are put back into the remaining work.
+
+    Entities are normalized (see `entity_key`) and duplicates within a request are processed once,
+    keeping the first spelling; delegates additionally cache entity results across runs.
+
     Attributes:
         name (str): The name of the coordinator agent.
+        MODES (Tuple[str, ...]): Supported distribution modes.
+        MAX_ATTEMPTS (int): Attempts per entity before its failure is reported.
+        POOL_SIZE (int): Default number of workers in 'pool' mode.
+        STREAM_WINDOW (int): Maximum distance in the input between the oldest unfinished entity and
+            the newest admitted one in `process_stream`.
+        backend (Optional[Backend]): Execution backend used in 'distributed' mode.
+        worker_stats (Dict[str, WorkerStats]): Per-worker statistics of the last 'pool' run.
     """
+    MODES = ('adaptive', 'pool', 'fixed', 'distributed')
+    MAX_ATTEMPTS = 2
+    POOL_SIZE = 8
+    STREAM_WINDOW = 256
 
-    def __init__(self, name: str) -> None:
+    def __init__(self, name: str, sharder: Optional[AdaptiveSharder] = None, backend: Optional[Backend] = None) -> None:
         """
         Initializes the CoordinatorAgent.
 
         Args:
             name (str): The name of the agent.
+            sharder (Optional[AdaptiveSharder]): Sharder used in adaptive mode (default is a new AdaptiveSharder per request).
+            backend (Optional[Backend]): Execution backend used in distributed mode (default is a ProcessPoolBackend).
         """
         super().__init__(name)
+        self.sharder = sharder
+        self.backend = backend
+        self.worker_stats: Dict[str, WorkerStats] = {}
         logger.info(f"{self.name} initialized.")
 
     async def process(self, message: Message) -> Message:
@@ -31,7 +73,10 @@ class Coordinator(Agent):
         shards the list, creates sub-agents dynamically, and collects the results.
 
         Args:
-            message (Message): The incoming message containing the list and shard size.
+            message (Message): The incoming message containing the list of entities, and optionally
+                `mode` (default 'adaptive'), `shard_size` (the fixed shard size, or the maximum
+                shard size in adaptive mode; also the shard size in distributed mode) and
+                `workers` (the pool size in pool mode).
 
         Returns:
             Message: A message containing the consolidated entity information.
@@ -43,9 +88,26 @@ class Coordinator(Agent):
             entities: List[str] = data.get('entities', [])
             shard_size: int = data.get('shard_size', 1)
 
+            entities = self.deduplicate(entities)
             if not entities:
                 raise ValueError("No entities provided.")
 
+            mode = data.get('mode', 'adaptive')
+            if mode not in self.MODES:
+                raise ValueError(f"Unknown sharding mode: {mode}")
+            if mode == 'adaptive':
+                sharder = self.sharder or AdaptiveSharder(max_shard_size=data.get('shard_size', AdaptiveSharder.MAX_SHARD_SIZE))
+                entity_info = await self.process_adaptive(entities, sharder)
+                return Message(content="\n\n".join(entity_info), sender=self.name, recipient=message.sender)
+            if mode == 'pool':
+                entity_info = await self.process_pool(entities, data.get('workers', self.POOL_SIZE))
+                return Message(content="\n\n".join(entity_info), sender=self.name, recipient=message.sender)
+            if mode == 'distributed':
+                if self.backend is None:
+                    self.backend = ProcessPoolBackend()
+                entity_info = await self.process_distributed(entities, shard_size, self.backend)
+                return Message(content="\n\n".join(entity_info), sender=self.name, recipient=message.sender)
+
             # Shard the list
             shards = [entities[i:i + shard_size] for i in range(0, len(entities), shard_size)]
             logger.info(f"Sharded list into {len(shards)} shards.")
@@ -77,4 +139,245 @@ class Coordinator(Agent):
                 content="An error occurred while processing the request.",
                 sender=self.name,
                 recipient=message.sender
-            )
\ No newline at end of file
+            )
+
+    @staticmethod
+    def deduplicate(entities: List[str]) -> List[str]:
+        """
+        Normalizes entities and drops blanks and duplicates that differ only in case, width or spacing.
+
+        Args:
+            entities (List[str]): The requested entities.
+
+        Returns:
+            List[str]: The cleaned, distinct entities in order of first occurrence.
+        """
+        distinct: Dict[str, str] = {}
+        for entity in entities:
+            key = entity_key(entity)
+            if key and key not in distinct:
+                distinct[key] = clean_entity(entity)
+        if len(distinct) < len(entities):
+            logger.info(f"Reduced {len(entities)} entities to {len(distinct)} distinct entities.")
+        return list(distinct.values())
+
+    def close(self) -> None:
+        """
+        Releases the execution backend, if one was started.
+        """
+        if self.backend is not None:
+            self.backend.close()
+
+    async def process_adaptive(self, entities: List[str], sharder: AdaptiveSharder) -> List[str]:
+        """
+        Processes entities with adaptively sized shards. Whenever a shard completes, its latencies
+        and failures update the sharder, failed entities are queued again (up to MAX_ATTEMPTS),
+        and new shards are cut from the remaining work to fill the freed capacity.
+
+        Args:
+            entities (List[str]): The entities to process.
+            sharder (AdaptiveSharder): Sizes shards from the observed latency, errors and rate limit.
+
+        Returns:
+            List[str]: The information for each entity, in input order.
+        """
+        remaining = deque(range(len(entities)))
+        attempts: Dict[int, int] = {}
+        results: Dict[int, str] = {}
+        running: Dict[asyncio.Task, List[int]] = {}
+        in_flight = 0
+        shard_count = 0
+
+        while remaining or running:
+            # Fill the available capacity with new shards
+            while remaining:
+                size = sharder.next_shard_size(len(remaining), in_flight)
+                if size == 0:
+                    break
+                shard = [remaining.popleft() for _ in range(size)]
+                agent_name = f"ShardProcessingAgent_{shard_count}"
+                shard_count += 1
+                sharder.dispatch(size)
+                task = asyncio.create_task(Delegate(name=agent_name).process_shard([entities[index] for index in shard]))
+                running[task] = shard
+                in_flight += size
+
+            # Wait for a shard to finish, or for rate-limit headroom when nothing is running
+            timeout = sharder.wait_time() if remaining else None
+            if not running:
+                await asyncio.sleep(timeout or 0)
+                continue
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                shard = running.pop(task)
+                in_flight -= len(shard)
+                shard_results: List[EntityResult] = task.result()
+                for index, result in zip(shard, shard_results):
+                    if not result['cached']:
+                        sharder.record(result['latency'], result['ok'])
+                    attempts[index] = attempts.get(index, 0) + 1
+                    if result['ok'] or attempts[index] >= self.MAX_ATTEMPTS:
+                        results[index] = result['info']
+                    else:
+                        logger.warning(f"Requeueing {result['entity']} after failed attempt {attempts[index]}.")
+                        remaining.append(index)
+
+        logger.info(f"Processed {len(entities)} entities in {shard_count} adaptive shards.")
+        return [results[index] for index in range(len(entities))]
+
+    async def process_pool(self, entities: List[str], workers: int) -> List[str]:
+        """
+        Processes entities with a fixed pool of workers pulling from a shared queue. Each worker
+        fetches one entity at a time, so a slow entity only occupies its own worker while the
+        others keep draining the queue. Failed entities are queued again (up to MAX_ATTEMPTS).
+
+        Args:
+            entities (List[str]): The entities to process.
+            workers (int): Number of workers in the pool.
+
+        Returns:
+            List[str]: The information for each entity, in input order.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for index in range(len(entities)):
+            queue.put_nowait(index)
+        attempts: Dict[int, int] = {}
+        results: Dict[int, str] = {}
+
+        async def work(worker: Delegate) -> None:
+            while True:
+                index = await queue.get()
+                try:
+                    result = await worker.fetch_entity(entities[index])
+                    attempts[index] = attempts.get(index, 0) + 1
+                    if result['ok'] or attempts[index] >= self.MAX_ATTEMPTS:
+                        results[index] = result['info']
+                    else:
+                        logger.warning(f"Requeueing {result['entity']} after failed attempt {attempts[index]}.")
+                        queue.put_nowait(index)
+                finally:
+                    queue.task_done()
+
+        pool = [Delegate(name=f"PoolWorker_{idx}") for idx in range(max(1, min(workers, len(entities))))]
+        tasks = [asyncio.create_task(work(worker)) for worker in pool]
+        try:
+            await queue.join()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.worker_stats = {worker.name: worker.stats for worker in pool}
+        for name, stats in self.worker_stats.items():
+            logger.info(f"{name}: {stats}")
+        return [results[index] for index in range(len(entities))]
+
+    async def process_distributed(self, entities: List[str], shard_size: int, backend: Backend) -> List[str]:
+        """
+        Processes `shard_size` shards on an execution backend. Entities that failed are sharded
+        again and sent back to the backend (up to MAX_ATTEMPTS in total).
+
+        Args:
+            entities (List[str]): The entities to process.
+            shard_size (int): Number of entities per shard.
+            backend (Backend): Runs the shards in other processes or on other machines.
+
+        Returns:
+            List[str]: The information for each entity, in input order.
+        """
+        results: Dict[int, str] = {}
+        remaining = list(range(len(entities)))
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            shards = [remaining[i:i + shard_size] for i in range(0, len(remaining), shard_size)]
+            logger.info(f"Dispatching {len(shards)} shards to {type(backend).__name__} (attempt {attempt}).")
+            shard_results = await backend.run_shards([[entities[index] for index in shard] for shard in shards])
+
+            remaining = []
+            for shard, shard_result in zip(shards, shard_results):
+                for index, result in zip(shard, shard_result):
+                    if result['ok'] or attempt == self.MAX_ATTEMPTS:
+                        results[index] = result['info']
+                    else:
+                        remaining.append(index)
+            if not remaining:
+                break
+            logger.warning(f"Retrying {len(remaining)} failed entities.")
+
+        return [results[index] for index in range(len(entities))]
+
+    async def process_stream(self, entities: Iterable[Tuple[int, str]], workers: int = POOL_SIZE,
+                             window: int = STREAM_WINDOW) -> AsyncIterator[Tuple[int, EntityResult]]:
+        """
+        Processes a lazily read stream of entities with a fixed pool of workers and yields each
+        result as soon as it completes. Entities are pulled from the stream only as workers free
+        up and only within `window` positions of the oldest unfinished entity, so memory stays
+        constant for inputs of any length. Failed entities are retried (up to MAX_ATTEMPTS) by
+        the worker that fetched them.
+
+        Args:
+            entities (Iterable[Tuple[int, str]]): Pairs of input position and entity, in increasing position order.
+            workers (int): Number of workers in the pool (default is POOL_SIZE).
+            window (int): Maximum position distance of entities in flight (default is STREAM_WINDOW).
+
+        Yields:
+            Tuple[int, EntityResult]: Input position and result of each entity, in completion order.
+        """
+        pending: asyncio.Queue = asyncio.Queue(maxsize=workers)
+        completed: asyncio.Queue = asyncio.Queue()
+        in_flight: Dict[int, None] = {}  # Positions in admission order, so the first is the oldest
+        admitted = asyncio.Condition()
+
+        async def produce() -> None:
+            error: Optional[Exception] = None
+            try:
+                for index, entity in entities:
+                    async with admitted:
+                        await admitted.wait_for(lambda: not in_flight or index - next(iter(in_flight)) < window)
+                        in_flight[index] = None
+                    await pending.put((index, entity))
+            except Exception as e:
+                logger.error(f"Error reading entities: {e}")
+                error = e
+            # Stop the workers once the admitted entities are drained, even if reading failed
+            for _ in pool:
+                await pending.put(None)
+            if error is not None:
+                raise error
+
+        async def work(worker: Delegate) -> None:
+            while (item := await pending.get()) is not None:
+                index, entity = item
+                for attempt in range(1, self.MAX_ATTEMPTS + 1):
+                    result = await worker.fetch_entity(entity)
+                    if result['ok'] or attempt == self.MAX_ATTEMPTS:
+                        break
+                    logger.warning(f"Retrying {entity} after failed attempt {attempt}.")
+                await completed.put((index, result))
+            await completed.put(None)
+
+        pool = [Delegate(name=f"StreamWorker_{idx}") for idx in range(max(1, workers))]
+        tasks = [asyncio.create_task(produce())] + [asyncio.create_task(work(worker)) for worker in pool]
+        finished_workers = processed = 0
+        try:
+            while finished_workers < len(pool):
+                item = await completed.get()
+                if item is None:
+                    finished_workers += 1
+                    continue
+                index, result = item
+                async with admitted:
+                    del in_flight[index]
+                    admitted.notify_all()
+                processed += 1
+                yield index, result
+            await tasks[0]  # Surface errors raised while reading the input
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.worker_stats = {worker.name: worker.stats for worker in pool}
+        for name, stats in self.worker_stats.items():
+            logger.info(f"{name}: {stats}")
+        logger.info(f"Streamed {processed} entities through {len(pool)} workers.")
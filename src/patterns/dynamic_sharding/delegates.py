@@ -1,9 +1,114 @@
 from src.patterns.dynamic_sharding.agent import Agent
-from src.patterns.web_access.pipeline import run 
-from src.commons.message import Message 
+from src.patterns.web_access.pipeline import run
+from src.utils.cache import PersistentCache
+from src.commons.message import Message
 from src.config.logging import logger
+from typing import TypedDict
+from typing import Optional
 from typing import List
+import unicodedata
+import threading
 import asyncio
+import time
+
+
+ENTITY_CACHE_PATH = './data/patterns/dynamic_sharding/cache/entities.db'
+ENTITY_CACHE_TTL = 7 * 24 * 60 * 60  # Entity information is refreshed after a week
+
+
+class EntityResult(TypedDict):
+    """
+    Outcome of fetching information for a single entity. Cached results have no latency of
+    their own and are left out of latency and error statistics.
+    """
+    entity: str
+    info: str
+    ok: bool
+    latency: float
+    cached: bool
+
+
+def clean_entity(entity: str) -> str:
+    """
+    Normalizes the spelling of an entity for display and search: Unicode compatibility forms are
+    folded (NFKC) and whitespace is collapsed.
+
+    Args:
+        entity (str): The raw entity, e.g. a line of the input file.
+
+    Returns:
+        str: The cleaned entity.
+    """
+    return ' '.join(unicodedata.normalize('NFKC', entity).split())
+
+
+def entity_key(entity: str) -> str:
+    """
+    Identifies an entity independently of case, width and spacing, so that e.g. "Taylor Swift"
+    and "taylor  swift" are fetched once and share a cache entry.
+
+    Args:
+        entity (str): The raw entity.
+
+    Returns:
+        str: The normalized key.
+    """
+    return clean_entity(entity).casefold()
+
+
+_entity_cache: Optional[PersistentCache] = None
+_cache_lock = threading.Lock()
+
+def get_entity_cache() -> PersistentCache:
+    """
+    Returns the process-wide entity result cache, opening it on first use.
+
+    Returns:
+        PersistentCache: Cache of entity information keyed on the normalized entity.
+    """
+    global _entity_cache
+    with _cache_lock:
+        if _entity_cache is None:
+            _entity_cache = PersistentCache(ENTITY_CACHE_PATH, ttl=ENTITY_CACHE_TTL)
+        return _entity_cache
+
+
+class WorkerStats:
+    """
+    Running statistics of the entities a delegate has processed.
+
+    Attributes:
+        processed (int): Number of entities processed.
+        failed (int): Number of entities that failed.
+        busy_time (float): Total seconds spent fetching entities.
+        max_latency (float): Latency of the slowest entity in seconds.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes empty statistics.
+        """
+        self.processed = 0
+        self.failed = 0
+        self.busy_time = 0.0
+        self.max_latency = 0.0
+
+    def record(self, result: EntityResult) -> None:
+        """
+        Adds the outcome of one entity.
+
+        Args:
+            result (EntityResult): The entity's outcome.
+        """
+        self.processed += 1
+        self.failed += 0 if result['ok'] else 1
+        self.busy_time += result['latency']
+        self.max_latency = max(self.max_latency, result['latency'])
+
+    def __repr__(self) -> str:
+        mean = self.busy_time / self.processed if self.processed else 0.0
+        return (f"WorkerStats(processed={self.processed}, failed={self.failed}, busy={self.busy_time:.1f}s, "
+                f"mean={mean:.1f}s, max={self.max_latency:.1f}s)")
 
 
 class Delegate(Agent):
@@ -11,18 +116,29 @@ class Delegate(Agent):
     An agent that processes a shard of entities by fetching information
     using web research.
 
+    Fetched information is cached per normalized entity for ENTITY_CACHE_TTL, so recurring entities
+    only run the web research pipeline again once their cached information has gone stale.
+
     Attributes:
         name (str): The name of the shard processing agent.
+        cache (Optional[PersistentCache]): Entity result cache, or None to always fetch.
+        stats (WorkerStats): Statistics of the entities this agent has fetched.
     """
 
-    def __init__(self, name: str) -> None:
+    def __init__(self, name: str, cache: Optional[PersistentCache] = None, use_cache: bool = True) -> None:
         """
         Initializes the ShardProcessingAgent.
 
         Args:
             name (str): The name of the agent.
+            cache (Optional[PersistentCache]): Entity result cache (default is the shared cache at ENTITY_CACHE_PATH).
+            use_cache (bool): Whether to cache entity results at all (default is True).
         """
         super().__init__(name)
+        self.cache = cache
+        if use_cache and cache is None:
+            self.cache = get_entity_cache()
+        self.stats = WorkerStats()
         logger.info(f"{self.name} initialized.")
 
     async def process(self, message: Message) -> Message:
@@ -38,16 +154,8 @@ class Delegate(Agent):
         logger.info(f"{self.name} processing shard.")
         try:
             entities: List[str] = message.content
-            tasks = []
-
-            # Create tasks to fetch information for each entity
-            for entity in entities:
-                task = asyncio.create_task(self.fetch_entity_info(entity))
-                tasks.append(task)
-
-            # Gather information
-            entity_info = await asyncio.gather(*tasks)
-            shard_info = "\n\n".join(entity_info)
+            results = await self.process_shard(entities)
+            shard_info = "\n\n".join(result['info'] for result in results)
 
             return Message(content=shard_info, sender=self.name, recipient=message.sender)
         except Exception as e:
@@ -58,21 +166,64 @@ class Delegate(Agent):
                 recipient=message.sender
             )
 
-    async def fetch_entity_info(self, entity: str) -> str:
+    async def process_shard(self, entities: List[str]) -> List[EntityResult]:
         """
-        Fetches information about an entity using web search.
+        Fetches information for every entity of the shard concurrently, reporting the outcome
+        and latency of each so the coordinator can adapt its sharding.
+
+        Args:
+            entities (List[str]): The entities of the shard.
+
+        Returns:
+            List[EntityResult]: One result per entity, in shard order.
+        """
+        return list(await asyncio.gather(*(self.fetch_entity(entity) for entity in entities)))
+
+    async def fetch_entity(self, entity: str) -> EntityResult:
+        """
+        Fetches information about an entity, timing the request and recording whether it failed.
+        Fresh cached information is returned without fetching, and successful fetches are cached.
 
         Args:
             entity (str): The name of the entity.
 
         Returns:
-            str: Information about the entity.
+            EntityResult: The information (or failure notice), success flag and latency in seconds.
         """
+        entity = clean_entity(entity)
+        cache_key = PersistentCache.make_key('entity', entity_key(entity))
+        if self.cache is not None:
+            info = await asyncio.to_thread(self.cache.get, cache_key)
+            if info is not None:
+                logger.info(f"{self.name} using cached information for {entity}.")
+                return {'entity': entity, 'info': f"Information about {entity}:\n{info}", 'ok': True, 'latency': 0.0,
+                        'cached': True}
+
         logger.info(f"{self.name} fetching information for {entity}.")
+        start = time.monotonic()
         try:
             # Use the run function to perform web search asynchronously
             info = await asyncio.to_thread(run, f"{entity} information")
-            return f"Information about {entity}:\n{info}"
+            result: EntityResult = {'entity': entity, 'info': f"Information about {entity}:\n{info}", 'ok': True,
+                                    'latency': time.monotonic() - start, 'cached': False}
         except Exception as e:
             logger.error(f"Error fetching information for {entity}: {e}")
-            return f"Could not fetch information for {entity}."
\ No newline at end of file
+            result = {'entity': entity, 'info': f"Could not fetch information for {entity}.", 'ok': False,
+                      'latency': time.monotonic() - start, 'cached': False}
+        if result['ok'] and self.cache is not None:
+            await asyncio.to_thread(self.cache.set, cache_key, info)
+        self.stats.record(result)
+        return result
+
+    async def fetch_entity_info(self, entity: str) -> str:
+        """
+        Fetches information about an entity using web search.
+
+        Args:
+            entity (str): The name of the entity.
+
+        Returns:
+            str: Information about the entity.
+        """
+        result = await self.fetch_entity(entity)
+        return result['info']
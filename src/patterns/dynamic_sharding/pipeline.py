@@ -1,12 +1,16 @@
 from src.patterns.dynamic_sharding.coordinator import Coordinator
+from src.patterns.dynamic_sharding.progress import ProgressIndex
 from src.commons.message import Message
 from src.config.logging import logger
+from typing import Iterator
+from typing import Tuple
 import asyncio
 
 
 # Paths for input and output files
 INPUT_FILE = "./data/patterns/dynamic_sharding/entities.txt"
 OUTPUT_FILE = "./data/patterns/dynamic_sharding/entity_info.txt"
+PROGRESS_FILE = "./data/patterns/dynamic_sharding/entity_info.progress.json"
 
 async def pipeline() -> None:
     """
@@ -20,12 +24,13 @@ async def pipeline() -> None:
     with open(INPUT_FILE, 'r') as file:
         entities = [line.strip() for line in file.readlines()]
 
-    shard_size = 3  # Number of entities per shard
+    shard_size = 3  # Maximum number of entities per shard; shards are sized adaptively up to it
 
     # Create a message containing entities and shard size
     message_content = {
         'entities': entities,
-        'shard_size': shard_size
+        'shard_size': shard_size,
+        'mode': 'adaptive'  # Or 'pool' for a work-stealing worker pool, 'fixed' for static shards
     }
     message = Message(content=message_content, sender="User", recipient="CoordinatorAgent")
 
@@ -39,6 +44,55 @@ async def pipeline() -> None:
     logger.info(f"Entity information has been saved to {OUTPUT_FILE}")
 
 
+def read_entities(path: str) -> Iterator[Tuple[int, str]]:
+    """
+    Lazily reads entities from a file, one per line, skipping blank lines.
+
+    Args:
+        path (str): Path to the entity file.
+
+    Yields:
+        Tuple[int, str]: Position of the entity among the non-blank lines, and the entity.
+    """
+    with open(path, 'r') as file:
+        entities = (line.strip() for line in file)
+        yield from enumerate(entity for entity in entities if entity)
+
+
+async def stream_pipeline(input_file: str = INPUT_FILE, output_file: str = OUTPUT_FILE,
+                          progress_file: str = PROGRESS_FILE, workers: int = Coordinator.POOL_SIZE) -> None:
+    """
+    Streaming variant of `pipeline` for entity lists too large to hold in memory. Entities are
+    read lazily, each result is appended to the output file as soon as it completes, and a resume
+    index records what is done. If the run is interrupted, running it again skips the entities
+    already written and appends the rest; the progress file is removed once the run completes.
+
+    Results are written in completion order. An entity whose result was written just before a
+    crash, but not yet recorded in the progress file, is written again on resume.
+
+    Args:
+        input_file (str): Path to the entity file (default is INPUT_FILE).
+        output_file (str): Path to the output file (default is OUTPUT_FILE).
+        progress_file (str): Path to the resume index (default is PROGRESS_FILE).
+        workers (int): Number of concurrent workers (default is Coordinator.POOL_SIZE).
+    """
+    coordinator = Coordinator(name="CoordinatorAgent")
+    progress = ProgressIndex(progress_file)
+    # Start a fresh output file unless an interrupted run is being resumed
+    mode = 'a' if progress.completed else 'w'
+    entities = ((index, entity) for index, entity in read_entities(input_file) if not progress.is_done(index))
+
+    with open(output_file, mode) as file:
+        async for index, result in coordinator.process_stream(entities, workers=workers):
+            file.write(f"{result['info']}\n\n")
+            file.flush()
+            progress.mark_done(index)
+
+    logger.info(f"Entity information for {progress.completed} entities has been saved to {output_file}")
+    progress.clear()
+
+
 if __name__ == "__main__":
     # Execute the pipeline within an asynchronous event loop
+    # (use stream_pipeline() instead for very large entity files)
     asyncio.run(pipeline())
@@ -0,0 +1,86 @@
+from src.config.logging import logger
+from typing import Set
+import json
+import os
+
+
+class ProgressIndex:
+    """
+    Resume index of a streaming run, persisted as a small JSON file next to the output.
+
+    Entities are numbered by their position in the input. The index keeps a watermark below which
+    every entity is done, plus the completed entities above it. The streaming coordinator only
+    admits entities within a bounded window of the oldest unfinished one, so the set above the
+    watermark, and with it the file, stays bounded however long the input is.
+
+    Attributes:
+        path (str): Path to the progress file.
+        watermark (int): Number of leading entities that are all done.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Loads the progress file, or starts empty if there is none.
+
+        Args:
+            path (str): Path to the progress file.
+        """
+        self.path = path
+        self.watermark = 0
+        self._done: Set[int] = set()
+        if os.path.exists(path):
+            with open(path, 'r') as file:
+                state = json.load(file)
+            self.watermark = state['watermark']
+            self._done = set(state['done'])
+            logger.info(f"Resuming from '{path}': {self.completed} entities already done.")
+
+    @property
+    def completed(self) -> int:
+        """
+        Returns:
+            int: Number of entities done.
+        """
+        return self.watermark + len(self._done)
+
+    def is_done(self, index: int) -> bool:
+        """
+        Args:
+            index (int): Position of the entity in the input.
+
+        Returns:
+            bool: Whether the entity was already processed.
+        """
+        return index < self.watermark or index in self._done
+
+    def mark_done(self, index: int) -> None:
+        """
+        Records an entity as done and saves the index.
+
+        Args:
+            index (int): Position of the entity in the input.
+        """
+        self._done.add(index)
+        while self.watermark in self._done:
+            self._done.remove(self.watermark)
+            self.watermark += 1
+        self.save()
+
+    def save(self) -> None:
+        """
+        Writes the index atomically, so a crash leaves either the previous or the new state.
+        """
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w') as file:
+            json.dump({'watermark': self.watermark, 'done': sorted(self._done)}, file)
+        os.replace(temporary_path, self.path)
+
+    def clear(self) -> None:
+        """
+        Deletes the progress file once a run has completed.
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.watermark = 0
+        self._done.clear()
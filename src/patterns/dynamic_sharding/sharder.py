@@ -0,0 +1,167 @@
+from src.config.logging import logger
+from collections import deque
+from typing import Optional
+from typing import Deque
+import math
+import time
+
+
+class RateWindow:
+    """
+    Sliding one-minute window of dispatched entity requests, used to measure rate-limit headroom.
+
+    Attributes:
+        requests_per_minute (int): Number of requests allowed per minute.
+    """
+
+    def __init__(self, requests_per_minute: int) -> None:
+        """
+        Initializes the window.
+
+        Args:
+            requests_per_minute (int): Number of requests allowed per minute.
+        """
+        self.requests_per_minute = requests_per_minute
+        self._dispatched: Deque[float] = deque()
+
+    def _expire(self, now: float) -> None:
+        """
+        Forgets dispatches older than one minute.
+
+        Args:
+            now (float): Current monotonic time.
+        """
+        while self._dispatched and now - self._dispatched[0] >= 60:
+            self._dispatched.popleft()
+
+    def record(self, count: int) -> None:
+        """
+        Records dispatched requests.
+
+        Args:
+            count (int): Number of requests dispatched now.
+        """
+        now = time.monotonic()
+        self._dispatched.extend([now] * count)
+
+    def headroom(self) -> int:
+        """
+        Returns:
+            int: Number of requests that can still be dispatched in the current window.
+        """
+        self._expire(time.monotonic())
+        return max(0, self.requests_per_minute - len(self._dispatched))
+
+    def wait_time(self) -> float:
+        """
+        Returns:
+            float: Seconds until the window has headroom again (0 if it has headroom now).
+        """
+        now = time.monotonic()
+        self._expire(now)
+        if len(self._dispatched) < self.requests_per_minute:
+            return 0.0
+        return 60 - (now - self._dispatched[0])
+
+
+class AdaptiveSharder:
+    """
+    Sizes shards from what the run has observed so far instead of a fixed shard size.
+
+    The number of entities in flight is bounded by `max_concurrency`, by the concurrency the rate
+    limit can sustain at the observed latency (Little's law: rate x latency), and shrinks with the
+    observed error rate. Shards are cut from the remaining work whenever capacity frees up: free
+    capacity is split evenly into shards of at most `max_shard_size`, so the tail of the work is
+    spread across many small shards instead of waiting on one large one.
+
+    Attributes:
+        MAX_CONCURRENCY (int): Default maximum number of entities in flight.
+        REQUESTS_PER_MINUTE (int): Default rate limit of entity requests.
+        MAX_SHARD_SIZE (int): Default maximum number of entities per shard.
+        SMOOTHING (float): Weight of the newest observation in the moving averages.
+        latency (Optional[float]): Moving average of per-entity latency in seconds, None until observed.
+        error_rate (float): Moving average of the per-entity failure rate.
+        window (RateWindow): Dispatches in the current rate-limit window.
+    """
+    MAX_CONCURRENCY = 16
+    REQUESTS_PER_MINUTE = 60
+    MAX_SHARD_SIZE = 5
+    SMOOTHING = 0.3
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, requests_per_minute: int = REQUESTS_PER_MINUTE,
+                 max_shard_size: int = MAX_SHARD_SIZE) -> None:
+        """
+        Initializes the sharder.
+
+        Args:
+            max_concurrency (int): Maximum number of entities in flight (default is 16).
+            requests_per_minute (int): Rate limit of entity requests (default is 60).
+            max_shard_size (int): Maximum number of entities per shard (default is 5).
+        """
+        self.max_concurrency = max_concurrency
+        self.max_shard_size = max_shard_size
+        self.window = RateWindow(requests_per_minute)
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+
+    def record(self, latency: float, ok: bool) -> None:
+        """
+        Updates the moving averages with the outcome of one entity.
+
+        Args:
+            latency (float): Seconds the entity took.
+            ok (bool): Whether the entity succeeded.
+        """
+        self.latency = latency if self.latency is None else self.SMOOTHING * latency + (1 - self.SMOOTHING) * self.latency
+        self.error_rate = self.SMOOTHING * (0.0 if ok else 1.0) + (1 - self.SMOOTHING) * self.error_rate
+
+    def capacity(self) -> int:
+        """
+        Returns:
+            int: Number of entities that may be in flight given the observed latency and error rate.
+        """
+        capacity = float(self.max_concurrency)
+        if self.latency is not None:
+            sustainable = self.window.requests_per_minute / 60 * self.latency
+            capacity = min(capacity, sustainable)
+        return max(1, math.floor(capacity * (1 - self.error_rate)))
+
+    def next_shard_size(self, remaining: int, in_flight: int) -> int:
+        """
+        Sizes the next shard.
+
+        Args:
+            remaining (int): Number of entities not yet dispatched.
+            in_flight (int): Number of entities currently being processed.
+
+        Returns:
+            int: Number of entities for the next shard, or 0 if nothing should be dispatched now.
+        """
+        free = min(self.capacity() - in_flight, self.window.headroom(), remaining)
+        if free <= 0:
+            return 0
+        # Split the free capacity evenly rather than into full shards plus a small remainder
+        shards = math.ceil(free / self.max_shard_size)
+        return math.ceil(free / shards)
+
+    def dispatch(self, count: int) -> None:
+        """
+        Records that a shard was dispatched.
+
+        Args:
+            count (int): Number of entities in the shard.
+        """
+        self.window.record(count)
+        logger.info(
+            f"Dispatching shard of {count} (capacity {self.capacity()}, latency "
+            f"{'n/a' if self.latency is None else f'{self.latency:.1f}s'}, error rate {self.error_rate:.0%}, "
+            f"headroom {self.window.headroom()})"
+        )
+
+    def wait_time(self) -> Optional[float]:
+        """
+        Returns:
+            Optional[float]: Seconds until rate-limit headroom returns, or None if only capacity is exhausted.
+        """
+        wait = self.window.wait_time()
+        return wait if wait > 0 else None
@@ -0,0 +1,60 @@
+from src.patterns.dynamic_sharding.backends import BrokerBackend
+from src.patterns.dynamic_sharding.broker import SQLiteBroker
+from src.patterns.dynamic_sharding.broker import Broker
+from src.patterns.dynamic_sharding.backends import run_shard
+from src.config.logging import logger
+from typing import Optional
+import argparse
+import socket
+import time
+import os
+
+
+def serve(broker: Broker, idle_timeout: Optional[float] = None, poll_interval: float = BrokerBackend.POLL_INTERVAL) -> int:
+    """
+    Claims shards from the broker and processes them one at a time until stopped. Start one worker
+    per core to scale out: on the machine holding the file for a SQLiteBroker, or on any machine
+    that reaches a networked Broker implementation.
+
+    Args:
+        broker (Broker): The task broker.
+        idle_timeout (Optional[float]): Seconds without work after which the worker exits (default is never).
+        poll_interval (float): Seconds between checks for new work.
+
+    Returns:
+        int: Number of shards processed.
+    """
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info(f"Worker {name} serving {broker!r}.")
+    processed = 0
+    idle_since = time.monotonic()
+    while True:
+        task = broker.claim(name)
+        if task is None:
+            if idle_timeout is not None and time.monotonic() - idle_since > idle_timeout:
+                logger.info(f"Worker {name} idle for {idle_timeout}s, exiting after {processed} shards.")
+                return processed
+            time.sleep(poll_interval)
+            continue
+
+        job, position, entities = task
+        try:
+            results = run_shard(entities)
+        except Exception as e:
+            logger.error(f"Worker {name} failed on shard {position} of job {job}: {e}")
+            results = [
+                {'entity': entity, 'info': f"Could not fetch information for {entity}.", 'ok': False, 'latency': 0.0,
+                 'cached': False}
+                for entity in entities
+            ]
+        broker.complete(job, position, results)
+        processed += 1
+        idle_since = time.monotonic()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process dynamic sharding shards from a broker.")
+    parser.add_argument('--broker', default=BrokerBackend.BROKER_PATH, help="Path to the SQLite broker file.")
+    parser.add_argument('--idle-timeout', type=float, default=None, help="Exit after this many idle seconds.")
+    args = parser.parse_args()
+    serve(SQLiteBroker(args.broker), idle_timeout=args.idle_timeout)
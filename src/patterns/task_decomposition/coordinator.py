@@ -1,7 +1,15 @@
 from src.patterns.task_decomposition.delegates import SubTaskAgent
 from src.patterns.task_decomposition.agent import Agent
+from src.commons.report import ReportWriter
+from src.commons.mapreduce import ChunkedSubTaskAgent
 from src.commons.message import Message
+from src.utils.chunk import chunk_text
 from src.config.logging import logger
+from typing import AsyncIterator
+from typing import Optional
+from typing import Union
+from typing import Tuple
+from typing import Dict
 from typing import List
 from typing import Any 
 import asyncio
@@ -12,18 +20,50 @@ class CoordinatorAgent(Agent):
     An agent that coordinates the processing of a document by decomposing it
     into extraction subtasks and assigning them to sub-agents to execute in parallel.
 
+    In 'chunked' mode the document is split into chunks of CHUNK_TOKENS, and every subtask runs
+    over all chunks in parallel with its partial extractions merged afterwards (map-reduce), so
+    documents of any length are handled with bounded per-request size.
+
     Attributes:
         name (str): The name of the coordinator agent.
+        MODES (Tuple[str, ...]): Supported execution modes.
+        CHUNK_TOKENS (int): Token budget of one chunk in chunked mode.
+        CHUNK_OVERLAP_TOKENS (int): Tokens shared by consecutive chunks in chunked mode.
+        MAX_CONCURRENT_REQUESTS (int): Maximum number of LLM requests in flight in chunked mode.
+        MAX_CONCURRENT_SUBTASKS (int): Default maximum number of sub-agents running at once.
+        SUBTASK_TIMEOUT (Optional[float]): Default number of seconds a subtask may take, None for no limit.
+        mode (str): The execution mode.
+        max_concurrency (int): Maximum number of sub-agents running at once.
+        timeout (Optional[float]): Seconds a subtask may take, or None for no limit.
     """
-
-    def __init__(self, name: str) -> None:
+    MODES = ('parallel', 'chunked')
+    CHUNK_TOKENS = 8_000
+    CHUNK_OVERLAP_TOKENS = 200
+    MAX_CONCURRENT_REQUESTS = 16
+    MAX_CONCURRENT_SUBTASKS = 5
+    SUBTASK_TIMEOUT: Optional[float] = None  # Chunked map-reduces over long documents can run for many minutes
+
+    def __init__(self, name: str, mode: str = 'parallel', max_concurrency: int = MAX_CONCURRENT_SUBTASKS,
+                 timeout: Optional[float] = SUBTASK_TIMEOUT) -> None:
         """
         Initializes the CoordinatorAgent.
 
         Args:
             name (str): The name of the agent.
+            mode (str): The execution mode, 'parallel' or 'chunked' (default is 'parallel').
+            max_concurrency (int): Maximum number of sub-agents running at once (default is 5).
+            timeout (Optional[float]): Seconds a subtask may take (default is None, no limit).
+
+        Raises:
+            ValueError: If the mode is not supported.
         """
         super().__init__(name)
+        if mode not in self.MODES:
+            logger.error(f"Unknown decomposition mode: {mode}")
+            raise ValueError(f"Unknown decomposition mode: {mode}")
+        self.mode = mode
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
         logger.info(f"{self.name} initialized.")
 
     async def process(self, message: Message) -> Message:
@@ -42,23 +82,13 @@ class CoordinatorAgent(Agent):
         try:
             document_content = message.content  # Assume message content is the document
 
-            # Decompose the document into subtasks
             subtasks = self.decompose_task(document_content)
 
-            # Create sub-agents and execute subtasks in parallel
-            tasks = []
-            for idx, subtask in enumerate(subtasks):
-                agent_name = f"SubTaskAgent_{idx}"
-                agent = SubTaskAgent(name=agent_name)
-                sub_message = Message(content=subtask, sender=self.name, recipient=agent_name)
-                task = asyncio.create_task(agent.process(sub_message))
-                tasks.append(task)
-
-            # Gather results from all sub-agents concurrently
-            sub_results = await asyncio.gather(*tasks)
-
-            # Combine results into a structured summary
-            combined_result = self.combine_results(sub_results)
+            # Write each result into the summary as its sub-agent completes, in the order of the subtasks
+            with ReportWriter(keys=range(len(subtasks)), header="Document Summary:\n") as report:
+                async for idx, _, result in self.iter_results(document_content, subtasks):
+                    report.add(idx, f"{result.content}\n")
+            combined_result = report.getvalue()
 
             # Return the final message
             return Message(content=combined_result, sender=self.name, recipient=message.sender)
@@ -71,6 +101,89 @@ class CoordinatorAgent(Agent):
                 recipient=message.sender
             )
 
+    def create_agent(self, idx: int, semaphore: Optional[asyncio.Semaphore] = None) -> Union[Agent, ChunkedSubTaskAgent]:
+        """
+        Creates the sub-agent for a subtask.
+
+        Args:
+            idx (int): Position of the subtask.
+            semaphore (Optional[asyncio.Semaphore]): Bounds LLM requests of chunked sub-agents.
+
+        Returns:
+            Union[Agent, ChunkedSubTaskAgent]: A SubTaskAgent, or a ChunkedSubTaskAgent in chunked mode.
+        """
+        if self.mode == 'chunked':
+            return ChunkedSubTaskAgent(name=f"ChunkedSubTaskAgent_{idx}", semaphore=semaphore)
+        return SubTaskAgent(name=f"SubTaskAgent_{idx}")
+
+    async def iter_results(self, document_content: str,
+                           subtasks: Optional[List[dict]] = None) -> AsyncIterator[Tuple[int, str, Message]]:
+        """
+        Decomposes the document and runs the subtasks with at most `max_concurrency` sub-agents
+        at a time, yielding each result as soon as its sub-agent finishes so callers can render or
+        persist it right away. A subtask that exceeds `timeout` is cancelled and reported as timed
+        out; results that already completed are unaffected. Stopping the iteration early cancels
+        the subtasks still running.
+
+        Args:
+            document_content (str): The full text of the document.
+            subtasks (Optional[List[dict]]): The subtasks to run (default is decompose_task's).
+
+        Yields:
+            Tuple[int, str, Message]: Position of the subtask, its task description and the
+                sub-agent's result, in completion order.
+        """
+        # Decompose the document into subtasks
+        if subtasks is None:
+            subtasks = self.decompose_task(document_content)
+
+        semaphore = None
+        if self.mode == 'chunked':
+            chunks = chunk_text(document_content, self.CHUNK_TOKENS, self.CHUNK_OVERLAP_TOKENS)
+            logger.info(f"Split the document into {len(chunks)} chunks.")
+            semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+            subtasks = [{"chunks": chunks, "task": subtask["task"]} for subtask in subtasks]
+
+        pending = iter(enumerate(subtasks))
+        running: Dict[asyncio.Task, Tuple[int, str]] = {}
+
+        def launch() -> None:
+            # Start subtasks until the concurrency bound is reached or none are left
+            while len(running) < self.max_concurrency:
+                try:
+                    idx, subtask = next(pending)
+                except StopIteration:
+                    return
+                agent = self.create_agent(idx, semaphore)
+                sub_message = Message(content=subtask, sender=self.name, recipient=agent.name)
+                task = asyncio.create_task(asyncio.wait_for(agent.process(sub_message), self.timeout))
+                running[task] = (idx, subtask["task"])
+
+        launch()
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    idx, description = running.pop(task)
+                    try:
+                        result = task.result()
+                    except asyncio.TimeoutError:
+                        logger.error(f"Subtask {idx} timed out after {self.timeout}s: {description}")
+                        result = Message(content=f"Timed out extracting information for task: {description}",
+                                         sender=self.name, recipient=self.name)
+                    except Exception as e:
+                        logger.error(f"Subtask {idx} failed: {str(e)}")
+                        result = Message(content=f"Failed to extract information for task: {description}",
+                                         sender=self.name, recipient=self.name)
+                    # Keep the executor busy while the caller handles the result
+                    launch()
+                    yield idx, description, result
+        finally:
+            for task in running:
+                task.cancel()
+            # Wait for the cancellations to finish so no task is left pending
+            await asyncio.gather(*running, return_exceptions=True)
+
     def decompose_task(self, document_content: str) -> List[dict]:
         """
         Decomposes the document into extraction subtasks.
@@ -101,7 +214,7 @@ class CoordinatorAgent(Agent):
         Returns:
             str: A structured summary of the document.
         """
-        summary = "Document Summary:\n"
-        for result in sub_results:
-            summary += f"{result.content}\n"
-        return summary
+        with ReportWriter(header="Document Summary:\n") as report:
+            for result in sub_results:
+                report.add(None, f"{result.content}\n")
+        return report.getvalue()
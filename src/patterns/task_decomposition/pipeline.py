@@ -1,4 +1,4 @@
-from coordinator import CoordinatorAgent
+from src.patterns.task_decomposition.coordinator import CoordinatorAgent
 from src.commons.message import Message
 from src.config.logging import logger
 import asyncio
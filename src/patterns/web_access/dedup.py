@@ -0,0 +1,302 @@
+from src.patterns.web_access.rank import split_passages
+from src.patterns.web_access.tasks import ScrapedPage
+from src.config.logging import logger
+from typing import Optional
+from typing import Tuple
+from typing import Dict
+from typing import List
+import numpy as np
+import threading
+import hashlib
+import sqlite3
+import time
+import os
+
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3  # Words per shingle
+BANDS = 4  # A distance of at most BANDS - 1 bits leaves at least one 16-bit band identical
+BAND_BITS = SIMHASH_BITS // BANDS
+_BIT_POSITIONS = np.arange(SIMHASH_BITS, dtype=np.uint64)
+
+
+def simhash(text: str, shingle_size: int = SHINGLE_SIZE) -> Optional[int]:
+    """
+    Computes the 64-bit SimHash of a text over its lowercase word shingles. Shingles are hashed with
+    BLAKE2b, which is stable across processes, so fingerprints can be persisted.
+
+    Args:
+        text (str): Text to fingerprint.
+        shingle_size (int): Words per shingle (default is 3).
+
+    Returns:
+        Optional[int]: Unsigned 64-bit fingerprint, or None if the text is shorter than one shingle.
+    """
+    words = text.lower().split()
+    if len(words) < shingle_size:
+        return None
+    hashes = np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(' '.join(words[i:i + shingle_size]).encode('utf-8'), digest_size=8).digest(), 'little')
+            for i in range(len(words) - shingle_size + 1)
+        ),
+        dtype=np.uint64
+    )
+    bits = ((hashes[:, np.newaxis] >> _BIT_POSITIONS) & np.uint64(1)).astype(np.int64)
+    votes = 2 * bits.sum(axis=0) - len(hashes)
+    return int(np.packbits((votes > 0)[::-1]).view('>u8')[0])
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """
+    Counts the bits in which two fingerprints differ.
+
+    Args:
+        a (int): First fingerprint.
+        b (int): Second fingerprint.
+
+    Returns:
+        int: Hamming distance.
+    """
+    return bin(a ^ b).count('1')
+
+
+def bands(fingerprint: int) -> List[int]:
+    """
+    Splits a fingerprint into its bands, used as exact-match lookup keys.
+
+    Args:
+        fingerprint (int): Unsigned 64-bit fingerprint.
+
+    Returns:
+        List[int]: BANDS band values.
+    """
+    mask = (1 << BAND_BITS) - 1
+    return [(fingerprint >> (band * BAND_BITS)) & mask for band in range(BANDS)]
+
+
+def _to_signed(fingerprint: int) -> int:
+    """
+    Maps an unsigned 64-bit fingerprint onto SQLite's signed INTEGER range.
+    """
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+class SimHashIndex:
+    """
+    Persistent, banded SimHash index mapping passage fingerprints to the URL of the page they were
+    first seen on (their canonical source). Lookups only compare candidates sharing a band, so they
+    stay cheap as the index grows across runs.
+
+    Attributes:
+        path (str): Path to the SQLite database file.
+        max_entries (Optional[int]): Maximum number of fingerprints kept, oldest evicted first.
+    """
+
+    def __init__(self, path: str, max_entries: Optional[int] = None) -> None:
+        """
+        Opens (or creates) the index database.
+
+        Args:
+            path (str): Path to the SQLite database file.
+            max_entries (Optional[int]): Maximum number of fingerprints kept (default is no limit).
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS fingerprints (fingerprint INTEGER PRIMARY KEY, url TEXT NOT NULL, "
+                + ", ".join(f"band{band} INTEGER NOT NULL" for band in range(BANDS))
+                + ", created_at REAL NOT NULL)"
+            )
+            for band in range(BANDS):
+                self._connection.execute(f"CREATE INDEX IF NOT EXISTS fingerprints_band{band} ON fingerprints (band{band})")
+
+    def lookup(self, fingerprint: int, max_distance: int) -> Optional[Tuple[int, str]]:
+        """
+        Finds the closest stored near-duplicate of a fingerprint.
+
+        Args:
+            fingerprint (int): Unsigned 64-bit fingerprint.
+            max_distance (int): Largest Hamming distance counted as a near-duplicate (below BANDS).
+
+        Returns:
+            Optional[Tuple[int, str]]: Stored fingerprint and canonical URL of the nearest match, or None if there is none.
+        """
+        clauses = " OR ".join(f"band{band} = ?" for band in range(BANDS))
+        with self._lock:
+            rows = self._connection.execute(f"SELECT fingerprint, url FROM fingerprints WHERE {clauses}", bands(fingerprint)).fetchall()
+        best: Optional[Tuple[int, int, str]] = None
+        for stored, url in rows:
+            stored &= (1 << 64) - 1
+            distance = hamming_distance(fingerprint, stored)
+            if distance <= max_distance and (best is None or distance < best[0]):
+                best = (distance, stored, url)
+        return best[1:] if best else None
+
+    def add_many(self, entries: List[Tuple[int, str]], replace: bool = False) -> None:
+        """
+        Records fingerprints with their canonical URL.
+
+        Args:
+            entries (List[Tuple[int, str]]): Pairs of unsigned 64-bit fingerprint and URL.
+            replace (bool): Whether fingerprints already present are reassigned to the new URL
+                (default is False, they keep their URL).
+        """
+        now = time.time()
+        rows = [(_to_signed(fingerprint), url, *bands(fingerprint), now) for fingerprint, url in entries]
+        conflict = 'REPLACE' if replace else 'IGNORE'
+        with self._lock, self._connection:
+            self._connection.executemany(
+                f"INSERT OR {conflict} INTO fingerprints VALUES (?, ?, {', '.join('?' * BANDS)}, ?)", rows
+            )
+            if self.max_entries is not None:
+                self._connection.execute(
+                    "DELETE FROM fingerprints WHERE fingerprint IN ("
+                    "SELECT fingerprint FROM fingerprints ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Closes the underlying database connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+
+class DuplicateFilter:
+    """
+    Drops near-duplicate passages from scraped pages before they reach the summarizer.
+
+    Pages are fingerprinted passage by passage up front, then processed in search rank order. A
+    passage is dropped when a near-duplicate was already kept earlier in the run, or when the
+    persistent index attributes it to a later page of the same run that still carries a
+    near-duplicate of it; that page keeps its copy, so syndicated text is attributed to the same
+    source on every run. If the canonical page no longer carries the passage (it changed, or was
+    cut off elsewhere), the passage is kept and its index entry is reassigned to the page keeping
+    it, so no text is lost. Kept passages are added to the index.
+
+    Attributes:
+        INDEX_PATH (str): Default path of the persistent fingerprint index.
+        MAX_DISTANCE (int): Largest Hamming distance counted as a near-duplicate.
+        PASSAGE_WORDS (int): Number of words per passage.
+        MAX_ENTRIES (int): Maximum number of fingerprints kept in the index.
+        index (Optional[SimHashIndex]): Persistent index, or None to only deduplicate within a run.
+    """
+    INDEX_PATH = './data/patterns/web_access/cache/simhash.db'
+    MAX_DISTANCE = 3
+    PASSAGE_WORDS = 60
+    MAX_ENTRIES = 500_000
+
+    def __init__(self, index: Optional[SimHashIndex] = None, persist: bool = True) -> None:
+        """
+        Initializes the filter.
+
+        Args:
+            index (Optional[SimHashIndex]): Persistent index (default is an index at INDEX_PATH).
+            persist (bool): Whether to use a persistent index at all (default is True).
+        """
+        self.index = index
+        if persist and index is None:
+            self.index = SimHashIndex(self.INDEX_PATH, max_entries=self.MAX_ENTRIES)
+
+    def _near_duplicates(self, fingerprint: int, table: Dict[Tuple[int, int], List[Tuple[int, int]]],
+                         page_number: Optional[int] = None) -> List[int]:
+        """
+        Finds the fingerprints of a banded table within MAX_DISTANCE of a fingerprint.
+
+        Args:
+            fingerprint (int): Unsigned 64-bit fingerprint.
+            table (Dict[Tuple[int, int], List[Tuple[int, int]]]): (band, value) to (fingerprint, page number) pairs.
+            page_number (Optional[int]): Only consider fingerprints of this page (default is any page).
+
+        Returns:
+            List[int]: The matching fingerprints.
+        """
+        candidates = {
+            entry for key in enumerate(bands(fingerprint)) for entry in table.get(key, [])
+            if page_number is None or entry[1] == page_number
+        }
+        return [other for other, _ in candidates if hamming_distance(fingerprint, other) <= self.MAX_DISTANCE]
+
+    def run(self, pages: List[ScrapedPage]) -> List[ScrapedPage]:
+        """
+        Removes near-duplicate passages across pages.
+
+        Args:
+            pages (List[ScrapedPage]): Scraped pages in search rank order.
+
+        Returns:
+            List[ScrapedPage]: Copies of the pages without duplicate passages; pages left empty are dropped.
+        """
+        # Fingerprint every page first, so a passage is only deferred to a page that still carries it
+        page_passages = [
+            [(passage, simhash(passage)) for passage in split_passages(page.get('content', ''), self.PASSAGE_WORDS)]
+            for page in pages
+        ]
+        page_numbers: Dict[str, int] = {}
+        run_table: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        for page_number, (page, passages) in enumerate(zip(pages, page_passages)):
+            page_numbers.setdefault(page['url'], page_number)
+            for _, fingerprint in passages:
+                if fingerprint is not None:
+                    for key in enumerate(bands(fingerprint)):
+                        run_table.setdefault(key, []).append((fingerprint, page_number))
+
+        seen: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        claimed = set()  # (page number, fingerprint) of copies other pages deferred to; they are never deferred
+        kept_fingerprints: List[Tuple[int, str]] = []
+        reassigned: List[Tuple[int, str]] = []
+        deduplicated = []
+        total = dropped = 0
+
+        for page_number, (page, passages) in enumerate(zip(pages, page_passages)):
+            kept_passages = []
+            for passage, fingerprint in passages:
+                total += 1
+                if fingerprint is None:
+                    kept_passages.append(passage)
+                    continue
+                if self._near_duplicates(fingerprint, seen):
+                    dropped += 1
+                    continue
+
+                match = self.index.lookup(fingerprint, self.MAX_DISTANCE) if self.index is not None else None
+                canonical_url = match[1] if match else None
+                if canonical_url is not None and canonical_url != page['url'] and canonical_url in page_numbers:
+                    canonical_page = page_numbers[canonical_url]
+                    copies = self._near_duplicates(fingerprint, run_table, canonical_page)
+                    if canonical_page > page_number and copies and (page_number, fingerprint) not in claimed:
+                        claimed.update((canonical_page, copy) for copy in copies)
+                        dropped += 1
+                        continue
+                    # The canonical page no longer carries the passage, or already dropped it: this page takes over
+                    reassigned.append((match[0], page['url']))
+                    canonical_url = page['url']
+
+                kept_passages.append(passage)
+                kept_fingerprints.append((fingerprint, canonical_url or page['url']))
+                for key in enumerate(bands(fingerprint)):
+                    seen.setdefault(key, []).append((fingerprint, page_number))
+
+            if kept_passages:
+                deduplicated.append({**page, 'content': ' '.join(kept_passages)})
+            else:
+                logger.info(f"Dropping {page['url']}: all of its content duplicates other pages.")
+
+        if self.index is not None:
+            if kept_fingerprints:
+                self.index.add_many(kept_fingerprints)
+            if reassigned:
+                self.index.add_many(reassigned, replace=True)
+                logger.info(f"Reassigned {len(reassigned)} passages whose canonical page no longer carries them.")
+        logger.info(f"Dropped {dropped} of {total} passages as near-duplicates across {len(pages)} pages.")
+        return deduplicated
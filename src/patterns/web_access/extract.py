@@ -0,0 +1,321 @@
+from src.config.logging import logger
+from html.parser import HTMLParser
+from abc import abstractmethod
+from typing import Optional
+from typing import List
+from abc import ABC
+import codecs
+import re
+
+
+# Tags whose text is kept for summarization, shared by every extraction backend.
+TEXT_TAGS = ('p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+# Tags whose character data never counts as visible text.
+SKIP_TAGS = ('script', 'style', 'template')
+
+# Content types worth parsing; anything else (PDFs, images, archives) is skipped before download.
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain', '')
+
+# Leading bytes of common binary formats that are sometimes served as text/html.
+BINARY_SIGNATURES = (b'%PDF', b'\x89PNG', b'\xff\xd8\xff', b'GIF8', b'PK\x03\x04', b'\x1f\x8b', b'RIFF')
+
+# Size of the decoded slices fed to the streaming parser between early-termination checks.
+FEED_SIZE = 65536
+
+# Elements without an end tag, which never enclose text.
+VOID_TAGS = ('area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr')
+
+# Bytes searched for a <meta> charset declaration, which must appear early in the document.
+META_SNIFF_BYTES = 2048
+CHARSET_PATTERN = re.compile(rb'charset\s*=\s*["\']?\s*([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+META_CHARSET_PATTERN = re.compile(rb'<meta[^>]*?charset\s*=\s*["\']?\s*([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+
+
+def clean_text(text: str) -> str:
+    """
+    Cleans extracted text by removing extra spaces and newlines.
+
+    Args:
+        text (str): Raw extracted text.
+
+    Returns:
+        str: Cleaned text with unnecessary spaces removed.
+    """
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def is_html_content_type(content_type: str) -> bool:
+    """
+    Checks whether a Content-Type header announces a parseable document.
+
+    Args:
+        content_type (str): Raw Content-Type header value, possibly with parameters.
+
+    Returns:
+        bool: True for HTML-like or missing content types.
+    """
+    return content_type.split(';')[0].strip().lower() in HTML_CONTENT_TYPES
+
+
+def looks_binary(head: bytes) -> bool:
+    """
+    Sniffs the first bytes of a response for binary content mislabelled as HTML.
+
+    Args:
+        head (bytes): First chunk of the response body.
+
+    Returns:
+        bool: True if the bytes match a known binary signature or contain NUL bytes.
+    """
+    return head.startswith(BINARY_SIGNATURES) or b'\x00' in head[:1024]
+
+
+def truncate_text(text: str, max_chars: Optional[int]) -> str:
+    """
+    Truncates text to at most `max_chars` characters, backing off to a word boundary.
+
+    Args:
+        text (str): Cleaned text.
+        max_chars (Optional[int]): Character budget, or None for no limit.
+
+    Returns:
+        str: The possibly truncated text.
+    """
+    if max_chars is None or len(text) <= max_chars:
+        return text
+    truncated = text[:max_chars]
+    boundary = truncated.rfind(' ')
+    return truncated[:boundary] if boundary > 0 else truncated
+
+
+def charset_from_content_type(content_type: str) -> Optional[str]:
+    """
+    Reads the charset parameter of a Content-Type header.
+
+    Args:
+        content_type (str): Raw Content-Type header value.
+
+    Returns:
+        Optional[str]: The declared charset, or None if the header declares none.
+    """
+    match = CHARSET_PATTERN.search(content_type.encode('latin-1', errors='ignore'))
+    return match.group(1).decode('ascii') if match else None
+
+
+def sniff_encoding(content: bytes) -> Optional[str]:
+    """
+    Detects the encoding a page declares for itself, from a byte order mark or a <meta> tag
+    (`<meta charset=...>` or `<meta http-equiv="Content-Type" content="...; charset=...">`).
+
+    Args:
+        content (bytes): Raw HTML bytes.
+
+    Returns:
+        Optional[str]: The declared encoding, or None if the page declares none.
+    """
+    if content.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    match = META_CHARSET_PATTERN.search(content[:META_SNIFF_BYTES])
+    return match.group(1).decode('ascii') if match else None
+
+
+def decode_content(content: bytes, encoding: Optional[str] = None) -> str:
+    """
+    Decodes raw page bytes, trying in turn the encoding advertised by the server, the encoding
+    declared by the page itself and UTF-8, and falling back to Windows-1252 (a superset of
+    Latin-1) with replacement characters, the same order BeautifulSoup uses.
+
+    Args:
+        content (bytes): Raw HTML bytes.
+        encoding (Optional[str]): Encoding advertised by the server, if any.
+
+    Returns:
+        str: Decoded HTML markup.
+    """
+    for candidate in (encoding, sniff_encoding(content), 'utf-8'):
+        if not candidate:
+            continue
+        try:
+            return content.decode(candidate)
+        except (LookupError, UnicodeDecodeError):
+            continue
+    return content.decode('cp1252', errors='replace')
+
+
+class TextExtractor(ABC):
+    """
+    Abstract base class for HTML text extraction backends.
+
+    Every backend honours the same output contract: the text of all heading and paragraph
+    elements, in document order, joined by single spaces with whitespace collapsed.
+    """
+
+    @abstractmethod
+    def extract(self, content: bytes, encoding: Optional[str] = None, max_chars: Optional[int] = None) -> str:
+        """
+        Extracts heading and paragraph text from raw HTML.
+
+        Args:
+            content (bytes): Raw HTML bytes.
+            encoding (Optional[str]): Encoding advertised by the server, if any.
+            max_chars (Optional[int]): Stop once this many characters are extracted (default is no limit).
+
+        Returns:
+            str: Cleaned text content.
+        """
+        raise NotImplementedError("Subclasses must implement the `extract` method")
+
+
+class BeautifulSoupExtractor(TextExtractor):
+    """
+    Reference backend that builds a full BeautifulSoup tree with the pure-Python `html.parser`.
+    """
+
+    def __init__(self) -> None:
+        from bs4 import BeautifulSoup
+        self._soup = BeautifulSoup
+
+    def extract(self, content: bytes, encoding: Optional[str] = None, max_chars: Optional[int] = None) -> str:
+        soup = self._soup(content, 'html.parser', from_encoding=encoding)
+        text_elements = soup.find_all(list(TEXT_TAGS))
+        return truncate_text(clean_text(' '.join(elem.get_text() for elem in text_elements)), max_chars)
+
+
+class LxmlExtractor(TextExtractor):
+    """
+    Backend built on the libxml2 HTML parser. Requires the optional `lxml` package.
+    """
+
+    def __init__(self) -> None:
+        try:
+            import lxml.html
+        except ImportError as e:
+            logger.error("The 'lxml' extractor requires the lxml package (pip install lxml).")
+            raise ImportError("lxml is not installed") from e
+        self._html = lxml.html
+
+    def extract(self, content: bytes, encoding: Optional[str] = None, max_chars: Optional[int] = None) -> str:
+        if not content.strip():
+            return ""
+        parser = self._html.HTMLParser(encoding=encoding) if encoding else None
+        document = self._html.fromstring(content, parser=parser)
+        for element in list(document.iter(*SKIP_TAGS)):
+            element.drop_tree()
+        text_elements = document.iter(*TEXT_TAGS)
+        return truncate_text(clean_text(' '.join(elem.text_content() for elem in text_elements)), max_chars)
+
+
+class _TextCollector(HTMLParser):
+    """
+    SAX-style parser that collects the text of heading and paragraph elements
+    without ever materialising a document tree.
+
+    Text of nested matching elements is credited to every open element, mirroring
+    `find_all` followed by `get_text` on each match. An end tag closes every element left open
+    inside the element it ends, as BeautifulSoup's tree builder does, so e.g. an unclosed <p> in a
+    table cell ends with the cell.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.segments: List[str] = []
+        self.extracted_chars = 0
+        self._open: List[tuple] = []
+        self._elements: List[tuple] = []  # Open elements as (tag, number of open text elements before it)
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+            return
+        if tag in VOID_TAGS:
+            return
+        self._elements.append((tag, len(self._open)))
+        if tag in TEXT_TAGS:
+            self.segments.append('')
+            self._open.append((tag, len(self.segments) - 1, []))
+
+    def handle_startendtag(self, tag: str, attrs: list) -> None:
+        if tag in TEXT_TAGS:
+            self.segments.append('')
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        # Close the innermost open element with this tag, along with anything left open inside it.
+        for position in range(len(self._elements) - 1, -1, -1):
+            if self._elements[position][0] == tag:
+                open_before = self._elements[position][1]
+                del self._elements[position:]
+                while len(self._open) > open_before:
+                    self._close_innermost()
+                break
+
+    def handle_data(self, data: str) -> None:
+        if self._skip_depth:
+            return
+        for _, _, parts in self._open:
+            parts.append(data)
+
+    def _close_innermost(self) -> None:
+        _, index, parts = self._open.pop()
+        self.segments[index] = ''.join(parts)
+        self.extracted_chars += len(self.segments[index])
+
+    def close(self) -> None:
+        super().close()
+        while self._open:
+            self._close_innermost()
+        self._elements.clear()
+
+
+class StreamingExtractor(TextExtractor):
+    """
+    Backend built on the standard library's incremental `HTMLParser`. It never builds a tree,
+    so memory stays proportional to the extracted text rather than the page, and it stops
+    parsing as soon as `max_chars` characters have been collected.
+    """
+
+    def extract(self, content: bytes, encoding: Optional[str] = None, max_chars: Optional[int] = None) -> str:
+        collector = _TextCollector()
+        markup = decode_content(content, encoding)
+        for offset in range(0, len(markup), FEED_SIZE):
+            collector.feed(markup[offset:offset + FEED_SIZE])
+            if max_chars is not None and collector.extracted_chars >= max_chars:
+                break
+        collector.close()
+        return truncate_text(clean_text(' '.join(collector.segments)), max_chars)
+
+
+class ExtractorFactory:
+    """
+    Factory for creating text extraction backends by name.
+    """
+    _EXTRACTORS = {
+        'bs4': BeautifulSoupExtractor,
+        'lxml': LxmlExtractor,
+        'stream': StreamingExtractor,
+    }
+
+    @staticmethod
+    def get_extractor(name: str = 'stream') -> TextExtractor:
+        """
+        Retrieves the extraction backend registered under the given name.
+
+        Args:
+            name (str): One of 'bs4', 'lxml' or 'stream'. Defaults to 'stream'.
+
+        Returns:
+            TextExtractor: The corresponding extractor instance.
+
+        Raises:
+            ValueError: If the name does not match a known backend.
+        """
+        try:
+            extractor_class = ExtractorFactory._EXTRACTORS[name]
+        except KeyError:
+            logger.error(f"Unknown extractor backend: {name}")
+            raise ValueError(f"Unknown extractor backend: {name}")
+        return extractor_class()
@@ -5,6 +5,7 @@ from src.patterns.web_access.tasks import SummarizeTask
 from src.patterns.web_access.tasks import SearchTask
 from src.patterns.web_access.tasks import ScrapeTask
 from src.config.logging import logger
+from typing import Optional
 
 
 class TaskFactory:
@@ -14,46 +15,55 @@ class TaskFactory:
     """
 
     @staticmethod
-    def create_search_task() -> SearchTask:
+    def create_search_task(rewrite_mode: str = WebSearchAgent.REWRITE_MODE) -> SearchTask:
         """
         Creates and returns a new SearchTask instance using WebSearchAgent.
 
+        Args:
+            rewrite_mode (str): Query rewrite mode, one of 'llm', 'heuristic' or 'none'.
+
         Returns:
             SearchTask: An instance of the SearchTask class, implemented by WebSearchAgent.
         """
         try:
-            logger.info("Creating search task (WebSearchAgent).")
-            return WebSearchAgent()
+            logger.info(f"Creating search task (WebSearchAgent, rewrite mode '{rewrite_mode}').")
+            return WebSearchAgent(rewrite_mode=rewrite_mode)
         except Exception as e:
             logger.error(f"Error while creating search task: {str(e)}")
             raise
 
     @staticmethod
-    def create_scrape_task() -> ScrapeTask:
+    def create_scrape_task(parse_workers: int = WebScrapeAgent.PARSE_WORKERS) -> ScrapeTask:
         """
         Creates and returns a new ScrapeTask instance using WebScrapeAgent.
 
+        Args:
+            parse_workers (int): Number of parse worker processes (0 parses in-process).
+
         Returns:
             ScrapeTask: An instance of the ScrapeTask class, implemented by WebScrapeAgent.
         """
         try:
             logger.info("Creating scrape task (WebScrapeAgent).")
-            return WebScrapeAgent()
+            return WebScrapeAgent(parse_workers=parse_workers)
         except Exception as e:
             logger.error(f"Error while creating scrape task: {str(e)}")
             raise
 
     @staticmethod
-    def create_summarize_task() -> SummarizeTask:
+    def create_summarize_task(relevance_tokens: Optional[int] = WebContentSummarizeAgent.RELEVANCE_TOKENS) -> SummarizeTask:
         """
         Creates and returns a new SummarizeTask instance using WebContentSummarizeAgent.
 
+        Args:
+            relevance_tokens (Optional[int]): Token budget of the passages kept by relevance filtering (None disables it).
+
         Returns:
             SummarizeTask: An instance of the SummarizeTask class, implemented by WebContentSummarizeAgent.
         """
         try:
             logger.info("Creating summarize task (WebContentSummarizeAgent).")
-            return WebContentSummarizeAgent()
+            return WebContentSummarizeAgent(relevance_tokens=relevance_tokens)
         except Exception as e:
             logger.error(f"Error while creating summarize task: {str(e)}")
             raise
@@ -1,49 +1,134 @@
+from src.patterns.web_access.serp import dedupe_search_results
+from src.patterns.web_access.serp import save_search_results
+from src.patterns.web_access.serp import normalize_url
+from src.patterns.web_access.workspace import Workspace
+from src.patterns.web_access.scrape import WebScrapeAgent
+from src.patterns.web_access.tasks import SearchResult
+from src.patterns.web_access.tasks import ScrapedPage
 from src.patterns.web_access.factory import TaskFactory
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.io import generate_filename
+from concurrent.futures import Future
 from src.config.logging import logger
 from typing import Optional
-import shutil
+from typing import Dict
+from typing import List
+from typing import Any
+import threading
 import os
 
 
 class Pipeline:
     """
     Pipeline class that orchestrates the execution of search, scrape, and summarize tasks.
+
+    In in-memory mode (the default) each stage hands its results directly to the next one and
+    the intermediate outputs are written to disk by a background writer, if at all. Otherwise
+    stages exchange data through the output folders, as they originally did.
+
+    Every run writes into its own workspace under `output/runs/<run_id>` unless isolation is
+    turned off, so concurrent runs never delete or read each other's files. Once a persisted run
+    is written, all but the `keep_runs` most recently finished run workspaces are deleted; the
+    workspaces of runs still in progress, in this process or another, are never deleted.
     
     Attributes:
         _search_task: Task instance responsible for performing search operations.
         _scrape_task: Task instance responsible for scraping data from search results.
         _summarize_task: Task instance responsible for summarizing the scraped content.
-        _output_folders: List of folders for output files related to each task.
+        _in_memory: Whether stages hand results to each other directly.
+        _persist: Whether outputs are kept on disk once the run completes.
+        _isolate: Whether each run gets its own workspace instead of the shared output folders.
+        _keep_runs: Number of run workspaces kept on disk, or None to keep them all.
+        _writer: Single background thread that persists outputs off the critical path.
+        MAX_SUMMARY_WORKERS: Maximum number of queries of a batch summarized concurrently.
     """
-    def __init__(self):
-        self._search_task = TaskFactory.create_search_task()
-        self._scrape_task = TaskFactory.create_scrape_task()
-        self._summarize_task = TaskFactory.create_summarize_task()
-        self._output_folders = [
-            './data/patterns/web_access/output/search',
-            './data/patterns/web_access/output/scrape',
-            './data/patterns/web_access/output/summarize'
-        ]
-
-    def _flush_output_folders(self):
-        """
-        Flushes all files in the output folders before starting the pipeline.
-        Ensures a clean start for each execution by removing previous results.
-        """
-        for folder in self._output_folders:
-            try:
-                if os.path.exists(folder):
-                    for filename in os.listdir(folder):
-                        file_path = os.path.join(folder, filename)
-                        if os.path.isfile(file_path):
-                            os.unlink(file_path)
-                        elif os.path.isdir(file_path):
-                            shutil.rmtree(file_path)
-                    logger.info(f"Flushed output folder: {folder}")
-                else:
-                    logger.warning(f"Output folder does not exist: {folder}")
-            except Exception as e:
-                logger.error(f"Error flushing folder {folder}: {str(e)}")
+    MAX_SUMMARY_WORKERS = 4
+
+    def __init__(self, in_memory: bool = True, persist: bool = True, isolate: bool = True, rewrite_mode: str = 'llm',
+                 relevance_filter: bool = True, keep_runs: Optional[int] = Workspace.MAX_RUNS,
+                 parse_workers: int = WebScrapeAgent.PARSE_WORKERS):
+        self._search_task = TaskFactory.create_search_task(rewrite_mode)
+        self._scrape_task = TaskFactory.create_scrape_task(parse_workers)
+        self._summarize_task = TaskFactory.create_summarize_task() if relevance_filter else TaskFactory.create_summarize_task(None)
+        self._in_memory = in_memory
+        self._persist = persist
+        self._isolate = isolate
+        self._keep_runs = keep_runs
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='web_access_writer')
+
+    def _persist_outputs(self, workspace: Workspace, query: str, search_results: List[SearchResult],
+                         scraped_pages: List[ScrapedPage], summary: str) -> None:
+        """
+        Writes the outputs of an in-memory run to the workspace folders.
+
+        Args:
+            workspace (Workspace): Output folders of the run.
+            query (str): The query the outputs belong to.
+            search_results (List[SearchResult]): Results of the search stage.
+            scraped_pages (List[ScrapedPage]): Results of the scrape stage.
+            summary (str): Result of the summarize stage.
+        """
+        save_search_results(search_results, os.path.join(workspace.search_dir, generate_filename(query, 'json')))
+        self._scrape_task.save_results(query, scraped_pages, workspace.scrape_dir)
+        self._summarize_task._save_summary(summary, query, workspace.summarize_dir)
+
+    def _finish_run(self, workspace: Workspace) -> None:
+        """
+        Releases a run's workspace once its outputs have been written and applies the retention
+        policy. Runs on the background writer after the run's own writes, so prunes never overlap.
+
+        Args:
+            workspace (Workspace): Workspace of the run just written.
+        """
+        if workspace.run_id is None:
+            return
+        workspace.release()
+        if self._keep_runs is not None:
+            Workspace.prune_runs(self._keep_runs)
+
+    @staticmethod
+    def _log_persist_failure(future: Future) -> None:
+        """
+        Logs an error raised by a background persistence job.
+
+        Args:
+            future (Future): The completed persistence job.
+        """
+        if future.exception() is not None:
+            logger.error(f"Failed to persist pipeline outputs: {future.exception()}")
+
+    def close(self) -> None:
+        """
+        Waits for pending background writes and releases the pipeline's workers.
+        """
+        self._writer.shutdown(wait=True)
+        if hasattr(self._scrape_task, 'close'):
+            self._scrape_task.close()
+
+    async def aclose(self) -> None:
+        """
+        Closes the async clients the pipeline opened on the running event loop. Call it before the
+        loop is closed; `close` still has to be called to release the remaining workers.
+        """
+        for task in (self._search_task, self._scrape_task):
+            if hasattr(task, 'aclose'):
+                await task.aclose()
+
+    def _create_workspace(self) -> Workspace:
+        """
+        Creates the workspace for a run: a fresh per-run namespace, or the shared output
+        folders flushed of previous results when isolation is turned off.
+
+        Returns:
+            Workspace: The workspace the run reads from and writes to.
+        """
+        if self._isolate:
+            workspace = Workspace.for_run()
+            logger.info(f"Using workspace '{workspace.root}' for run {workspace.run_id}")
+            return workspace
+        workspace = Workspace()
+        workspace.flush()
+        return workspace
 
     def execute(self, model_name: str, query: str, location: str = '') -> str:
         """
@@ -60,18 +145,86 @@ class Pipeline:
         Raises:
             Exception: If any task fails, the error is logged and re-raised.
         """
+        workspace = None
         try:
             # logger.info(f"Starting pipeline execution for query: '{query}' with model: '{model_name}' and location: '{location}'.")
-            self._flush_output_folders()
+            if not self._in_memory:
+                workspace = self._create_workspace()
+
+                logger.info("Executing search task.")
+                self._search_task.run(model_name, query, location, workspace=workspace)
+
+                logger.info("Executing scrape task.")
+                self._scrape_task.run(query, location, workspace=workspace)
+
+                logger.info("Executing summarize task.")
+                summary = self._summarize_task.run(model_name, query, workspace=workspace)
+            else:
+                logger.info("Executing search task.")
+                search_results = self._search_task.run(model_name, query, location, persist=False)
+
+                logger.info("Executing scrape task.")
+                scraped_pages = self._scrape_task.run(query, location, results=search_results, persist=False)
 
+                logger.info("Executing summarize task.")
+                summary = self._summarize_task.run(model_name, query, scraped_pages=scraped_pages, persist=False)
+
+                if self._persist:
+                    workspace = self._create_workspace()
+                    future = self._writer.submit(self._persist_outputs, workspace, query, search_results, scraped_pages, summary)
+                    future.add_done_callback(self._log_persist_failure)
+                    self._writer.submit(self._finish_run, workspace).add_done_callback(self._log_persist_failure)
+
+            logger.info("Pipeline execution completed successfully.")
+            return summary
+
+        except Exception as e:
+            logger.error(f"An error occurred during pipeline execution: {e}", exc_info=True)
+            raise
+        finally:
+            # File-based runs that should not leave outputs behind clean up their own workspace;
+            # persisted ones apply the retention policy instead.
+            if workspace is not None and workspace.run_id is not None:
+                if not self._persist:
+                    workspace.remove()
+                elif not self._in_memory:
+                    self._writer.submit(self._finish_run, workspace).add_done_callback(self._log_persist_failure)
+
+    async def aexecute(self, model_name: str, query: str, location: str = '') -> str:
+        """
+        Asynchronous counterpart of `execute` that runs every stage on the event loop: the model
+        calls, SERP request and page downloads are native async I/O, and CPU-bound parsing,
+        ranking and deduplication are offloaded, so one process can serve many concurrent runs.
+
+        Stages always hand results over in memory; outputs are persisted by the background
+        writer when persistence is enabled.
+
+        Args:
+            model_name (str): The model to be used for summarization.
+            query (str): The search query to process.
+            location (str): Optional location context for search and scrape tasks.
+
+        Returns:
+            str: A summary generated from the search results.
+
+        Raises:
+            Exception: If any task fails, the error is logged and re-raised.
+        """
+        try:
             logger.info("Executing search task.")
-            self._search_task.run(model_name, query, location)
+            search_results = await self._search_task.arun(model_name, query, location, persist=False)
 
             logger.info("Executing scrape task.")
-            self._scrape_task.run(query, location)
+            scraped_pages = await self._scrape_task.arun(query, location, results=search_results, persist=False)
 
             logger.info("Executing summarize task.")
-            summary = self._summarize_task.run(model_name, query)
+            summary = await self._summarize_task.arun(model_name, query, scraped_pages=scraped_pages, persist=False)
+
+            if self._persist:
+                workspace = self._create_workspace()
+                future = self._writer.submit(self._persist_outputs, workspace, query, search_results, scraped_pages, summary)
+                future.add_done_callback(self._log_persist_failure)
+                self._writer.submit(self._finish_run, workspace).add_done_callback(self._log_persist_failure)
 
             logger.info("Pipeline execution completed successfully.")
             return summary
@@ -80,10 +233,119 @@ class Pipeline:
             logger.error(f"An error occurred during pipeline execution: {e}", exc_info=True)
             raise
 
+    def execute_batch(self, model_name: str, queries: List[str], location: str = '') -> Dict[str, str]:
+        """
+        Executes the pipeline for several related queries at once. The queries are searched
+        concurrently, result URLs shared between queries are deduplicated and scraped once in a
+        single scrape stage, and each query is then summarized from its own pages.
+
+        Batches always hand results over in memory; outputs are persisted per query into one
+        workspace for the batch when persistence is enabled.
+
+        Args:
+            model_name (str): The model to be used for query rewriting and summarization.
+            queries (List[str]): The search queries to process; duplicates are processed once.
+            location (str): Optional location context for the searches.
+
+        Returns:
+            Dict[str, str]: The summary generated for each query, in query order.
+
+        Raises:
+            Exception: If any task fails, the error is logged and re-raised.
+        """
+        try:
+            logger.info("Executing batch search task.")
+            results_by_query = self._search_task.run_batch(model_name, queries, location, persist=False)
+            unique_results = dedupe_search_results(results_by_query)
+
+            logger.info(f"Executing shared scrape task for {len(unique_results)} URLs.")
+            scraped_pages = self._scrape_task.scrape_results(unique_results)
+            pages_by_url = {normalize_url(page['url']): page for page in scraped_pages}
+
+            # Near-duplicates are removed per query, so no query loses text only another query's pages carry
+            pages_by_query = {}
+            for query, results in results_by_query.items():
+                urls = dict.fromkeys(normalize_url(result['Link']) for result in results if result.get('Link'))
+                pages_by_query[query] = self._scrape_task.deduplicate([pages_by_url[url] for url in urls if url in pages_by_url])
+
+            logger.info(f"Executing summarize task for {len(pages_by_query)} queries.")
+            with ThreadPoolExecutor(max_workers=max(1, min(self.MAX_SUMMARY_WORKERS, len(pages_by_query)))) as executor:
+                futures = {
+                    query: executor.submit(self._summarize_task.run, model_name, query, scraped_pages=pages, persist=False)
+                    for query, pages in pages_by_query.items()
+                }
+                summaries = {query: future.result() for query, future in futures.items()}
+
+            if self._persist and summaries:
+                workspace = self._create_workspace()
+                for query, summary in summaries.items():
+                    future = self._writer.submit(self._persist_outputs, workspace, query, results_by_query[query],
+                                                 pages_by_query[query], summary)
+                    future.add_done_callback(self._log_persist_failure)
+                self._writer.submit(self._finish_run, workspace).add_done_callback(self._log_persist_failure)
+
+            logger.info("Batch pipeline execution completed successfully.")
+            return summaries
+
+        except Exception as e:
+            logger.error(f"An error occurred during batch pipeline execution: {e}", exc_info=True)
+            raise
+
+
+class PipelineProvider:
+    """
+    Thread-safe singleton provider for a shared Pipeline.
+
+    Runs are isolated in their own workspaces and hand results over in memory, so one Pipeline
+    can serve concurrent callers. Sharing it means the agents, their templates, response
+    generators and the scrape parse pool are built once per process instead of once per query.
+    Options for the shared Pipeline can be set with `configure` before it is first used.
+    """
+    _instance: Optional[Pipeline] = None
+    _options: Dict[str, Any] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def configure(**options: Any) -> None:
+        """
+        Sets the keyword arguments the shared Pipeline is created with. Has no effect on a Pipeline
+        that already exists until `reset` is called.
+
+        Args:
+            **options (Any): Keyword arguments of `Pipeline`, e.g. `parse_workers=0`.
+        """
+        with PipelineProvider._lock:
+            PipelineProvider._options = dict(options)
+
+    @staticmethod
+    def get_instance() -> Pipeline:
+        """
+        Returns the shared Pipeline, creating it on first use.
+
+        Returns:
+            Pipeline: The shared Pipeline instance.
+        """
+        if PipelineProvider._instance is None:
+            with PipelineProvider._lock:
+                if PipelineProvider._instance is None:
+                    logger.info("Creating shared web_access pipeline.")
+                    PipelineProvider._instance = Pipeline(**PipelineProvider._options)
+        return PipelineProvider._instance
+
+    @staticmethod
+    def reset() -> None:
+        """
+        Closes and discards the shared Pipeline, waiting for its pending writes.
+        """
+        with PipelineProvider._lock:
+            if PipelineProvider._instance is not None:
+                PipelineProvider._instance.close()
+                PipelineProvider._instance = None
+
 
 def run(query: str, model_name: Optional[str] = 'gemini-1.5-flash-001') -> str:
     """
-    Initializes and runs the pipeline to generate a summary for the given query.
+    Runs the shared pipeline to generate a summary for the given query.
 
     Args:
         query (str): The search query to process.
@@ -97,7 +359,7 @@ def run(query: str, model_name: Optional[str] = 'gemini-1.5-flash-001') -> str:
     """
     try:
         logger.info(f"Starting pipeline for query: {query} with model: {model_name}")
-        pipeline = Pipeline()
+        pipeline = PipelineProvider.get_instance()
         summary = pipeline.execute(model_name, query)
         logger.info("Pipeline run successfully completed.")
         return summary
@@ -106,6 +368,54 @@ def run(query: str, model_name: Optional[str] = 'gemini-1.5-flash-001') -> str:
         raise
 
 
+async def arun(query: str, model_name: Optional[str] = 'gemini-1.5-flash-001') -> str:
+    """
+    Asynchronous counterpart of `run` on the shared pipeline, for callers already on an event loop.
+
+    Args:
+        query (str): The search query to process.
+        model_name (Optional[str]): The model used for summarization. Defaults to 'gemini-1.5-flash-001'.
+
+    Returns:
+        str: The generated summary from the pipeline.
+
+    Raises:
+        Exception: Logs and re-raises any error during pipeline execution.
+    """
+    try:
+        logger.info(f"Starting async pipeline for query: {query} with model: {model_name}")
+        summary = await PipelineProvider.get_instance().aexecute(model_name, query)
+        logger.info("Pipeline run successfully completed.")
+        return summary
+    except Exception as e:
+        logger.error(f"Pipeline execution failed: {str(e)}")
+        raise
+
+
+def run_batch(queries: List[str], model_name: Optional[str] = 'gemini-1.5-flash-001') -> Dict[str, str]:
+    """
+    Runs the shared pipeline for several related queries, scraping pages they share only once.
+
+    Args:
+        queries (List[str]): The search queries to process.
+        model_name (Optional[str]): The model used for summarization. Defaults to 'gemini-1.5-flash-001'.
+
+    Returns:
+        Dict[str, str]: The generated summary for each query.
+
+    Raises:
+        Exception: Logs and re-raises any error during pipeline execution.
+    """
+    try:
+        logger.info(f"Starting batch pipeline for {len(queries)} queries with model: {model_name}")
+        summaries = PipelineProvider.get_instance().execute_batch(model_name, queries)
+        logger.info("Batch pipeline run successfully completed.")
+        return summaries
+    except Exception as e:
+        logger.error(f"Batch pipeline execution failed: {str(e)}")
+        raise
+
+
 if __name__ == '__main__':
     query = 'best hotels in Fresno, California'
     summary = run(query)
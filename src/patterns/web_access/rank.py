@@ -0,0 +1,208 @@
+from src.patterns.web_access.tasks import ScrapedPage
+from src.patterns.web_access.extract import truncate_text
+from src.utils.tokens import tokens_to_chars
+from src.utils.tokens import estimate_tokens
+from src.config.logging import logger
+from typing import Optional
+from typing import Tuple
+from typing import List
+import numpy as np
+import re
+
+
+# Very common English words that carry no relevance signal for BM25.
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how i in is it its of on or that the this to was "
+    "what when where which who why will with".split()
+)
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits text into lowercase word terms, dropping stopwords.
+
+    Args:
+        text (str): Text to tokenize.
+
+    Returns:
+        List[str]: Terms in order of appearance.
+    """
+    return [term for term in TOKEN_PATTERN.findall(text.lower()) if term not in STOPWORDS]
+
+
+def split_passages(text: str, passage_words: int) -> List[str]:
+    """
+    Splits text into consecutive passages of about `passage_words` words. Scraped content is
+    whitespace-collapsed, so passages are cut at sentence ends where possible and at word
+    boundaries otherwise.
+
+    Args:
+        text (str): Cleaned page text.
+        passage_words (int): Target number of words per passage.
+
+    Returns:
+        List[str]: Passages in document order.
+    """
+    words = text.split()
+    passages = []
+    start = 0
+    while start < len(words):
+        end = min(start + passage_words, len(words))
+        # Back off to the last sentence end within the second half of the window
+        for cut in range(end, start + passage_words // 2, -1):
+            if end == len(words) or words[cut - 1].endswith(('.', '!', '?')):
+                end = cut
+                break
+        passages.append(' '.join(words[start:end]))
+        start = end
+    return passages
+
+
+class BM25Scorer:
+    """
+    Okapi BM25 scorer over a set of passages, vectorized with NumPy. Only query terms are counted,
+    so the term-frequency matrix is (passages x query terms) however large the vocabulary is.
+
+    Attributes:
+        k1 (float): Term-frequency saturation.
+        b (float): Passage-length normalization.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        """
+        Initializes the scorer.
+
+        Args:
+            k1 (float): Term-frequency saturation (default is 1.5).
+            b (float): Passage-length normalization (default is 0.75).
+        """
+        self.k1 = k1
+        self.b = b
+
+    def score(self, query: str, passages: List[str]) -> np.ndarray:
+        """
+        Scores passages against a query.
+
+        Args:
+            query (str): Query text.
+            passages (List[str]): Passages to score.
+
+        Returns:
+            np.ndarray: BM25 score of every passage.
+        """
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not passages or not query_terms:
+            return np.zeros(len(passages))
+
+        term_index = {term: column for column, term in enumerate(query_terms)}
+        frequencies = np.zeros((len(passages), len(query_terms)), dtype=np.float64)
+        lengths = np.empty(len(passages), dtype=np.float64)
+        for row, passage in enumerate(passages):
+            terms = tokenize(passage)
+            lengths[row] = len(terms)
+            for term in terms:
+                column = term_index.get(term)
+                if column is not None:
+                    frequencies[row, column] += 1
+
+        document_frequency = np.count_nonzero(frequencies, axis=0)
+        idf = np.log1p((len(passages) - document_frequency + 0.5) / (document_frequency + 0.5))
+        average_length = max(lengths.mean(), 1.0)
+        norm = self.k1 * (1 - self.b + self.b * lengths / average_length)
+        weights = frequencies * (self.k1 + 1) / (frequencies + norm[:, np.newaxis])
+        return weights @ idf
+
+
+class RelevanceFilter:
+    """
+    Local, CPU-only relevance stage between scraping and summarization. Pages are split into
+    passages, every passage is scored with BM25 against the query, and the best passages are kept
+    up to a token budget. Kept passages are put back into their pages in document order.
+
+    Attributes:
+        MAX_TOKENS (int): Default token budget of the kept passages.
+        PASSAGE_WORDS (int): Default number of words per passage.
+        max_tokens (int): Token budget of the kept passages.
+        passage_words (int): Number of words per passage.
+        scorer (BM25Scorer): Passage scorer.
+    """
+    MAX_TOKENS = 6000
+    PASSAGE_WORDS = 120
+
+    def __init__(self, max_tokens: int = MAX_TOKENS, passage_words: int = PASSAGE_WORDS,
+                 scorer: Optional[BM25Scorer] = None) -> None:
+        """
+        Initializes the filter.
+
+        Args:
+            max_tokens (int): Token budget of the kept passages (default is 6000).
+            passage_words (int): Number of words per passage (default is 120).
+            scorer (Optional[BM25Scorer]): Passage scorer (default is BM25 with standard parameters).
+        """
+        self.max_tokens = max_tokens
+        self.passage_words = passage_words
+        self.scorer = scorer or BM25Scorer()
+
+    def run(self, query: str, pages: List[ScrapedPage]) -> List[ScrapedPage]:
+        """
+        Keeps the passages most relevant to the query within the token budget.
+
+        Pages without any kept passage are dropped. When no passage matches a query term the
+        ranking falls back to document order, which degrades to plain truncation. The top-ranked
+        passage is always kept, truncated to the budget if it does not fit on its own.
+
+        Args:
+            query (str): Query the summary is written for.
+            pages (List[ScrapedPage]): Scraped pages in rank order.
+
+        Returns:
+            List[ScrapedPage]: Copies of the pages holding only their kept passages.
+        """
+        located: List[Tuple[int, int]] = []
+        passages: List[str] = []
+        for page_number, page in enumerate(pages):
+            for passage_number, passage in enumerate(split_passages(page.get('content', ''), self.passage_words)):
+                located.append((page_number, passage_number))
+                passages.append(passage)
+        if not passages:
+            return pages
+
+        total_tokens = sum(estimate_tokens(passage) for passage in passages)
+        if total_tokens <= self.max_tokens:
+            return pages
+
+        scores = self.scorer.score(query, passages)
+        # Stable sort keeps document and page order among equal scores
+        order = np.argsort(-scores, kind='stable')
+        kept = set()
+        used_tokens = 0
+        for index in order:
+            passage_tokens = estimate_tokens(passages[index])
+            if used_tokens + passage_tokens > self.max_tokens:
+                continue
+            kept.add(int(index))
+            used_tokens += passage_tokens
+        if not kept:
+            top = int(order[0])
+            passages[top] = truncate_text(passages[top], tokens_to_chars(self.max_tokens))
+            kept.add(top)
+            used_tokens = estimate_tokens(passages[top])
+
+        # Rebuild each page from its kept passages, marking the gaps between non-adjacent ones
+        contents = [''] * len(pages)
+        previous: Optional[Tuple[int, int]] = None
+        for index in sorted(kept):
+            page_number, passage_number = located[index]
+            if contents[page_number]:
+                adjacent = previous == (page_number, passage_number - 1)
+                contents[page_number] += ' ' if adjacent else ' ... '
+            contents[page_number] += passages[index]
+            previous = located[index]
+
+        filtered = [{**page, 'content': content} for page, content in zip(pages, contents) if content]
+        logger.info(
+            f"Kept {len(kept)} of {len(passages)} passages from {len(filtered)} of {len(pages)} pages "
+            f"(~{used_tokens} of ~{total_tokens} tokens)."
+        )
+        return filtered
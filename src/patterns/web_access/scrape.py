@@ -1,33 +1,162 @@
+from src.patterns.web_access.extract import charset_from_content_type
+from src.patterns.web_access.extract import is_html_content_type
+from src.patterns.web_access.extract import ExtractorFactory
+from src.patterns.web_access.extract import TextExtractor
+from src.patterns.web_access.extract import looks_binary
+from src.patterns.web_access.extract import clean_text
+from src.patterns.web_access.dedup import DuplicateFilter
+from concurrent.futures import ProcessPoolExecutor
+from src.patterns.web_access.store import ScrapeStore
+from src.patterns.web_access.tasks import SearchResult
+from src.patterns.web_access.tasks import ScrapedPage
+from src.patterns.web_access.workspace import Workspace
 from src.patterns.web_access.tasks import ScrapeTask
 from concurrent.futures import ThreadPoolExecutor
 from concurrent.futures import as_completed
 from src.utils.io import generate_filename
 from src.config.logging import logger
+from src.utils.aio import LoopLocal
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
+from typing import Optional
 from typing import Tuple
 from typing import Dict 
 from typing import List 
 from typing import Any 
+import multiprocessing
+import threading
 import requests
+import aiohttp
+import asyncio
+import queue
 import json
 import time
 import os
-import re
+
+
+# Extractors are cached per process so parse workers build each backend only once.
+_extractors: Dict[str, TextExtractor] = {}
+
+
+def extract_text(content: bytes, extractor: str, max_chars: Optional[int] = None, encoding: Optional[str] = None) -> str:
+    """
+    Extracts text from raw page bytes. Defined at module level so it can run in parse worker processes.
+
+    Args:
+        content (bytes): Raw HTML bytes.
+        extractor (str): Name of the extraction backend.
+        max_chars (Optional[int]): Stop once this many characters are extracted (default is no limit).
+        encoding (Optional[str]): Charset advertised by the server, if any.
+
+    Returns:
+        str: Cleaned text content.
+    """
+    if extractor not in _extractors:
+        _extractors[extractor] = ExtractorFactory.get_extractor(extractor)
+    return _extractors[extractor].extract(content, encoding=encoding, max_chars=max_chars)
 
 
 class WebScrapeAgent(ScrapeTask):
     """
     WebScrapeAgent is responsible for scraping content from websites based on search results.
 
+    Scraping runs as a two-stage pipeline: a thread pool downloads page bytes concurrently and
+    hands them over a bounded queue to a process pool that parses them, so CPU-bound parsing
+    never holds the GIL while other downloads are in flight.
+
     Attributes:
         INPUT_DIR (str): Directory path where search results (JSON) are stored.
         OUTPUT_DIR (str): Directory path where scraped content is saved.
-        MAX_WORKERS (int): Maximum number of concurrent threads for scraping.
+        MAX_WORKERS (int): Maximum number of concurrent threads for downloading.
+        PARSE_WORKERS (int): Number of worker processes for parsing (0 parses in-process).
+        QUEUE_SIZE (int): Maximum number of downloaded pages waiting to be parsed.
+        EXTRACTOR (str): Default HTML text extraction backend ('bs4', 'lxml' or 'stream').
+        MAX_BYTES (int): Download cap per page; larger pages are truncated mid-stream.
+        MAX_CHARS (int): Extracted characters per page after which parsing stops.
+        CHUNK_SIZE (int): Size of the chunks read from the response stream.
+        DEDUPLICATE (bool): Whether near-duplicate passages across pages are dropped.
+        FETCH_TIMEOUT (float): Seconds allowed for connecting and for each read of a page download.
+        MAX_CONNECTIONS (int): Connection pool size of the async scraper, shared by all concurrent runs on a loop.
+        FETCH_STAGGER (float): Seconds between the starts of the downloads of one result set.
     """
     INPUT_DIR = "./data/patterns/web_access/output/search"
     OUTPUT_DIR = "./data/patterns/web_access/output/scrape"
     MAX_WORKERS = 10
+    PARSE_WORKERS = os.cpu_count() or 1
+    QUEUE_SIZE = 20
+    EXTRACTOR = "stream"
+    MAX_BYTES = 2_000_000
+    MAX_CHARS = 20_000
+    CHUNK_SIZE = 65536
+    DEDUPLICATE = True
+    FETCH_TIMEOUT = 5
+    MAX_CONNECTIONS = 100
+    FETCH_STAGGER = 0.1
+
+    def __init__(self, extractor: str = EXTRACTOR, parse_workers: int = PARSE_WORKERS,
+                 deduplicate: bool = DEDUPLICATE) -> None:
+        """
+        Initializes WebScrapeAgent with the requested text extraction backend.
+
+        Args:
+            extractor (str): Name of the extraction backend (default is 'stream').
+            parse_workers (int): Number of parse worker processes (default is the number of cores).
+            deduplicate (bool): Whether to drop near-duplicate passages across pages (default is True).
+        """
+        self.extractor_name = extractor
+        self.extractor = ExtractorFactory.get_extractor(extractor)
+        self.parse_workers = parse_workers
+        self.duplicate_filter = DuplicateFilter() if deduplicate else None
+        self._http_sessions: LoopLocal[aiohttp.ClientSession] = LoopLocal(self._create_http_session, aiohttp.ClientSession.close)
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _get_parse_pool(self) -> Optional[ProcessPoolExecutor]:
+        """
+        Lazily creates the parse worker pool, which is reused across scrapes.
+        Workers are spawned rather than forked because download threads may be running.
+
+        Returns:
+            Optional[ProcessPoolExecutor]: The pool, or None when parsing runs in-process.
+        """
+        if self.parse_workers <= 0:
+            return None
+        with self._pool_lock:
+            if self._parse_pool is None:
+                self._parse_pool = ProcessPoolExecutor(
+                    max_workers=self.parse_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                logger.info(f"Started parse pool with {self.parse_workers} worker processes.")
+            return self._parse_pool
+
+    def close(self) -> None:
+        """
+        Shuts down the parse worker pool, if one was started.
+        """
+        with self._pool_lock:
+            if self._parse_pool is not None:
+                self._parse_pool.shutdown()
+                self._parse_pool = None
+
+    def _create_http_session(self) -> aiohttp.ClientSession:
+        """
+        Creates the pooled HTTP session used by async scraping on the running event loop.
+
+        Returns:
+            aiohttp.ClientSession: A new session.
+        """
+        return aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(sock_connect=self.FETCH_TIMEOUT, sock_read=self.FETCH_TIMEOUT),
+            connector=aiohttp.TCPConnector(limit=self.MAX_CONNECTIONS)
+        )
+
+    async def aclose(self) -> None:
+        """
+        Closes the HTTP session of the running event loop, if one was created.
+        """
+        session = self._http_sessions.pop()
+        if session is not None:
+            await session.close()
 
     @staticmethod
     def clean_text(text: str) -> str:
@@ -40,7 +169,7 @@ class WebScrapeAgent(ScrapeTask):
         Returns:
             str: Cleaned text with unnecessary spaces removed.
         """
-        return re.sub(r'\s+', ' ', text).strip()
+        return clean_text(text)
 
     @staticmethod
     def get_domain(url: str) -> str:
@@ -55,114 +184,261 @@ class WebScrapeAgent(ScrapeTask):
         """
         return urlparse(url).netloc
 
-    def scrape_website(self, url: str) -> str:
+    def fetch_page(self, url: str) -> Tuple[Optional[bytes], Optional[str]]:
         """
-        Scrapes content from a specified URL, with a timeout of 5 seconds. 
+        Streams the raw bytes of a page, with a timeout of `FETCH_TIMEOUT` seconds. Non-HTML
+        responses are skipped from their headers or first chunk, and the body is cut off at
+        `MAX_BYTES`.
 
         Args:
-            url (str): Website URL to be scraped.
+            url (str): Website URL to be downloaded.
 
         Returns:
-            str: Extracted text content or an empty string if an error occurs.
+            Tuple[Optional[bytes], Optional[str]]: Raw page content, or None if an error occurs or the
+                page is not HTML, and the charset declared in the Content-Type header, if any.
         """
         try:
-            response = requests.get(url, timeout=5)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            text_elements = soup.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-            extracted_text = ' '.join(elem.get_text() for elem in text_elements)
-            return self.clean_text(extracted_text)
+            with requests.get(url, timeout=self.FETCH_TIMEOUT, stream=True) as response:
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type', '')
+                if not is_html_content_type(content_type):
+                    logger.info(f"Skipping {url} due to non-HTML content type '{content_type}'.")
+                    return None, None
+
+                chunks = []
+                size = 0
+                for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                    if not chunks and looks_binary(chunk):
+                        logger.info(f"Skipping {url} due to binary content.")
+                        return None, None
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= self.MAX_BYTES:
+                        logger.info(f"Truncating {url} at {self.MAX_BYTES} bytes.")
+                        break
+                return b''.join(chunks)[:self.MAX_BYTES], charset_from_content_type(content_type)
         except requests.Timeout:
             logger.warning(f"Skipping {url} due to timeout.")
-            return ""
+            return None, None
         except requests.RequestException as e:
             logger.warning(f"Error scraping {url}: {e}")
-            return ""
+            return None, None
+
+    async def afetch_page(self, url: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """
+        Asynchronous counterpart of `fetch_page`, streaming the body over the loop's pooled session.
+
+        Args:
+            url (str): Website URL to be downloaded.
+
+        Returns:
+            Tuple[Optional[bytes], Optional[str]]: Raw page content, or None if an error occurs or the
+                page is not HTML, and the charset declared in the Content-Type header, if any.
+        """
+        try:
+            async with self._http_sessions.get().get(url) as response:
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type', '')
+                if not is_html_content_type(content_type):
+                    logger.info(f"Skipping {url} due to non-HTML content type '{content_type}'.")
+                    return None, None
+
+                chunks = []
+                size = 0
+                async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+                    if not chunks and looks_binary(chunk):
+                        logger.info(f"Skipping {url} due to binary content.")
+                        return None, None
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= self.MAX_BYTES:
+                        logger.info(f"Truncating {url} at {self.MAX_BYTES} bytes.")
+                        break
+                return b''.join(chunks)[:self.MAX_BYTES], charset_from_content_type(content_type)
+        except asyncio.TimeoutError:
+            logger.warning(f"Skipping {url} due to timeout.")
+            return None, None
+        except aiohttp.ClientError as e:
+            logger.warning(f"Error scraping {url}: {e}")
+            return None, None
+
+    def scrape_website(self, url: str) -> str:
+        """
+        Scrapes content from a specified URL, downloading and parsing in the calling thread.
+
+        Args:
+            url (str): Website URL to be scraped.
+
+        Returns:
+            str: Extracted text content or an empty string if an error occurs.
+        """
+        content, encoding = self.fetch_page(url)
+        return self.extractor.extract(content, encoding=encoding, max_chars=self.MAX_CHARS) if content else ""
 
-    def scrape_with_delay(self, result: Dict[str, Any], delay: int) -> Tuple[Dict[str, Any], str]:
+    def fetch_with_delay(self, result: Dict[str, Any], delay: float) -> Tuple[Dict[str, Any], Tuple[Optional[bytes], Optional[str]]]:
         """
-        Scrapes a website after a delay to avoid server overload.
+        Downloads a website after a delay to avoid server overload.
 
         Args:
             result (Dict[str, Any]): Search result containing URL and metadata.
-            delay (int): Delay in seconds before initiating scrape.
+            delay (float): Delay in seconds before initiating the download.
 
         Returns:
-            Tuple[Dict[str, Any], str]: Original result and scraped content.
+            Tuple[Dict[str, Any], Tuple[Optional[bytes], Optional[str]]]: Original result, and raw page content with its declared charset.
         """
         time.sleep(delay)
-        content = self.scrape_website(result['Link'])
-        return result, content
+        return result, self.fetch_page(result['Link'])
 
-    def scrape_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def scrape_results(self, results: List[SearchResult]) -> List[ScrapedPage]:
         """
         Concurrently scrapes content from provided search results.
 
+        Download threads put page bytes on a bounded queue; the calling thread drains it and
+        submits each page to the parse pool. At most `QUEUE_SIZE` pages wait in the queue and
+        at most twice the number of parse workers are being parsed, so downloads back off
+        when parsing falls behind.
+
         Args:
-            results (List[Dict[str, Any]]): List of search result dictionaries.
+            results (List[SearchResult]): List of search result dictionaries.
 
         Returns:
-            List[Dict[str, Any]]: List of dictionaries with title, URL, snippet, and content.
+            List[ScrapedPage]: List of dictionaries with title, URL, snippet, and content, in search rank order.
         """
-        os.makedirs(self.OUTPUT_DIR, exist_ok=True)
+        parse_pool = self._get_parse_pool()
+        fetched: queue.Queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        in_flight = threading.BoundedSemaphore(max(1, 2 * self.parse_workers))
+
+        def fetch(rank: int, result: Dict[str, Any]) -> None:
+            content, encoding = None, None
+            try:
+                # Download starts are staggered from the start of the batch, as on the async path
+                delay = max(0.0, started + rank * self.FETCH_STAGGER - time.monotonic())
+                _, (content, encoding) = self.fetch_with_delay(result, delay)
+            except Exception as e:
+                logger.error(f"Error downloading {result.get('Link')}: {e}")
+            finally:
+                fetched.put(((rank, result), content, encoding))
+
         scraped_results = []
+        parse_futures = {}
+        started = time.monotonic()
         with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
-            future_to_result = {executor.submit(self.scrape_with_delay, result, i): result for i, result in enumerate(results)}
-            for future in as_completed(future_to_result):
+            for i, result in enumerate(results):
+                executor.submit(fetch, i, result)
+
+            for _ in range(len(results)):
+                (rank, result), content, encoding = fetched.get()
+                if not content:
+                    logger.info(f"Skipping {result['Title']} due to empty content.")
+                    continue
+                if parse_pool is None:
+                    parse_futures[executor.submit(extract_text, content, self.extractor_name, self.MAX_CHARS, encoding)] = (rank, result)
+                    continue
+                in_flight.acquire()
+                future = parse_pool.submit(extract_text, content, self.extractor_name, self.MAX_CHARS, encoding)
+                future.add_done_callback(lambda _: in_flight.release())
+                parse_futures[future] = (rank, result)
+
+            for future in as_completed(parse_futures):
+                rank, result = parse_futures[future]
                 try:
-                    result, content = future.result()
+                    content = future.result()
                     if content:
-                        scraped_results.append({
+                        scraped_results.append((rank, {
                             'title': result['Title'],
                             'url': result['Link'],
                             'snippet': result['Snippet'],
                             'content': content
-                        })
+                        }))
                         logger.info(f"Scraped: {result['Title']}")
                     else:
                         logger.info(f"Skipping {result['Title']} due to empty content.")
                 except Exception as e:
                     logger.error(f"Error processing result: {e}")
-        return scraped_results
+        # Pages finish in any order; hand them on in search rank order
+        return [page for _, page in sorted(scraped_results, key=lambda item: item[0])]
+
+    async def ascrape_results(self, results: List[SearchResult]) -> List[ScrapedPage]:
+        """
+        Asynchronous counterpart of `scrape_results`. Downloads run on the event loop; parsing runs
+        on the parse pool (or a worker thread when parsing is in-process) so it never blocks the loop.
+
+        Args:
+            results (List[SearchResult]): List of search result dictionaries.
+
+        Returns:
+            List[ScrapedPage]: List of dictionaries with title, URL, snippet, and content, in search rank order.
+        """
+        loop = asyncio.get_running_loop()
+        parse_pool = self._get_parse_pool()
+
+        async def scrape(rank: int, result: Dict[str, Any]) -> Optional[ScrapedPage]:
+            await asyncio.sleep(rank * self.FETCH_STAGGER)
+            content, encoding = await self.afetch_page(result['Link'])
+            if not content:
+                logger.info(f"Skipping {result['Title']} due to empty content.")
+                return None
+            try:
+                text = await loop.run_in_executor(parse_pool, extract_text, content, self.extractor_name, self.MAX_CHARS, encoding)
+            except Exception as e:
+                logger.error(f"Error processing result: {e}")
+                return None
+            if not text:
+                logger.info(f"Skipping {result['Title']} due to empty content.")
+                return None
+            logger.info(f"Scraped: {result['Title']}")
+            return {'title': result['Title'], 'url': result['Link'], 'snippet': result['Snippet'], 'content': text}
+
+        pages = await asyncio.gather(*(scrape(rank, result) for rank, result in enumerate(results)))
+        return [page for page in pages if page is not None]
 
-    def save_results(self, query: str, scraped_results: List[Dict[str, Any]]) -> None:
+    def deduplicate(self, scraped_results: List[ScrapedPage]) -> List[ScrapedPage]:
         """
-        Saves scraped results to a text file.
+        Drops passages that near-duplicate other pages of the same result set.
+
+        Args:
+            scraped_results (List[ScrapedPage]): Scraped pages in search rank order.
+
+        Returns:
+            List[ScrapedPage]: The pages without duplicate passages, unchanged when deduplication is disabled.
+        """
+        if self.duplicate_filter is None:
+            return scraped_results
+        return self.duplicate_filter.run(scraped_results)
+
+    def save_results(self, query: str, scraped_results: List[ScrapedPage], output_dir: Optional[str] = None) -> None:
+        """
+        Saves scraped results to a JSONL scrape store, one entry per line.
 
         Args:
             query (str): Query string used to generate filename.
-            scraped_results (List[Dict[str, Any]]): List of scraped results.
+            scraped_results (List[ScrapedPage]): List of scraped results.
+            output_dir (Optional[str]): Folder to save into (default is OUTPUT_DIR).
         """
         try:
-            output_path = os.path.join(self.OUTPUT_DIR, generate_filename(query, 'txt'))
-
-            with open(output_path, 'w', encoding='utf-8') as outfile:
-                for result in scraped_results:
-                    outfile.write("==== BEGIN ENTRY ====\n")
-                    outfile.write(f"TITLE: {result['title']}\n")
-                    outfile.write(f"URL: {result['url']}\n")
-                    outfile.write(f"SNIPPET: {result['snippet']}\n")
-                    outfile.write(f"CONTENT:\n{result['content']}\n")
-                    outfile.write("==== END ENTRY ====\n\n")
+            output_path = os.path.join(output_dir or self.OUTPUT_DIR, generate_filename(query, 'jsonl'))
+            store = ScrapeStore(output_path)
+            store.clear()
+            store.extend(scraped_results)
             logger.info(f"Scraping complete. Results saved to '{output_path}'")
-            time.sleep(3)  # Delay to ensure no rapid consecutive saves
         except Exception as e:
             logger.error(f"Error saving results: {e}")
 
-    def load_search_results(self, query: str, location: str) -> List[Dict[str, Any]]:
+    def load_search_results(self, query: str, location: str, input_dir: Optional[str] = None) -> List[SearchResult]:
         """
         Loads search results from a JSON file based on the query and location.
 
         Args:
             query (str): Query string for filename generation.
             location (str): Location identifier for additional file context.
+            input_dir (Optional[str]): Folder to load from (default is INPUT_DIR).
 
         Returns:
-            List[Dict[str, Any]]: List of search result dictionaries.
+            List[SearchResult]: List of search result dictionaries.
         """
         try:
             filename = generate_filename(query, 'json')
-            file_path = os.path.join(self.INPUT_DIR, filename)
+            file_path = os.path.join(input_dir or self.INPUT_DIR, filename)
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"Search results file not found for query: '{query}' and location: '{location}'")
             
@@ -175,19 +451,56 @@ class WebScrapeAgent(ScrapeTask):
             logger.error(f"Error loading search results: {e}")
             raise
 
-    def run(self, query: str, location: str) -> None:
+    def run(self, query: str, location: str, results: Optional[List[SearchResult]] = None, persist: bool = True,
+            workspace: Optional[Workspace] = None) -> List[ScrapedPage]:
         """
         Orchestrates the web scraping process by loading search results, scraping content, and saving the results.
 
         Args:
             query (str): Query string for identifying relevant search results.
             location (str): Location identifier for loading appropriate files.
+            results (Optional[List[SearchResult]]): Search results handed over in memory; loaded from disk if None.
+            persist (bool): Whether to save the scraped pages to disk (default is True).
+            workspace (Optional[Workspace]): Folders to read from and write to (default is INPUT_DIR and OUTPUT_DIR).
+
+        Returns:
+            List[ScrapedPage]: The scraped pages.
+        """
+        try:
+            logger.info(f"Initiating scraping process for query: '{query}' and location: '{location}'")
+            if results is None:
+                results = self.load_search_results(query, location, workspace.search_dir if workspace else None)
+            scraped_results = self.deduplicate(self.scrape_results(results))
+            if persist:
+                self.save_results(query, scraped_results, workspace.scrape_dir if workspace else None)
+            return scraped_results
+        except Exception as e:
+            logger.error(f"Error during scraping process: {e}")
+            raise
+
+    async def arun(self, query: str, location: str, results: Optional[List[SearchResult]] = None, persist: bool = True,
+                   workspace: Optional[Workspace] = None) -> List[ScrapedPage]:
+        """
+        Asynchronous counterpart of `run`. Blocking file and index access runs in worker threads.
+
+        Args:
+            query (str): Query string for identifying relevant search results.
+            location (str): Location identifier for loading appropriate files.
+            results (Optional[List[SearchResult]]): Search results handed over in memory; loaded from disk if None.
+            persist (bool): Whether to save the scraped pages to disk (default is True).
+            workspace (Optional[Workspace]): Folders to read from and write to (default is INPUT_DIR and OUTPUT_DIR).
+
+        Returns:
+            List[ScrapedPage]: The scraped pages.
         """
         try:
             logger.info(f"Initiating scraping process for query: '{query}' and location: '{location}'")
-            results = self.load_search_results(query, location)
-            scraped_results = self.scrape_results(results)
-            self.save_results(query, scraped_results)
+            if results is None:
+                results = await asyncio.to_thread(self.load_search_results, query, location, workspace.search_dir if workspace else None)
+            scraped_results = await asyncio.to_thread(self.deduplicate, await self.ascrape_results(results))
+            if persist:
+                await asyncio.to_thread(self.save_results, query, scraped_results, workspace.scrape_dir if workspace else None)
+            return scraped_results
         except Exception as e:
             logger.error(f"Error during scraping process: {e}")
             raise
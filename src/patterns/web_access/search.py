@@ -1,14 +1,35 @@
 from vertexai.preview.generative_models import FunctionDeclaration
 from vertexai.preview.generative_models import GenerationResponse
+from src.patterns.web_access.serp import SEARCH_RESULTS_OUTPUT_DIR
+from src.patterns.web_access.serp import arun as agoogle_search
 from src.patterns.web_access.serp import run as google_search
+from src.patterns.web_access.serp import create_async_client
+from src.patterns.web_access.serp import AsyncSerpAPIClient
+from src.patterns.web_access.workspace import Workspace
+from src.patterns.web_access.tasks import SearchResult
 from src.patterns.web_access.tasks import SearchTask
+from concurrent.futures import ThreadPoolExecutor
 from vertexai.preview.generative_models import Tool
 from src.llm.generate import ResponseGenerator
 from src.prompt.manage import TemplateManager
+from src.utils.cache import PersistentCache
+from src.utils.aio import LoopLocal
 from src.config.logging import logger
 from typing import Optional
 from typing import Dict
+from typing import List
 from typing import Any 
+from typing import Tuple
+import asyncio
+import re
+
+
+# Conversational lead-ins that carry no search intent, stripped in heuristic rewrite mode.
+FILLER_PREFIXES = re.compile(
+    r"^(?:(?:can|could|would) you |please |hey |)"
+    r"(?:search (?:the web )?for |look up |find(?: me)? |show me |tell me about |i(?: am|'m) looking for |i want )",
+    re.IGNORECASE
+)
 
 
 class WebSearchAgent(SearchTask):
@@ -16,19 +37,151 @@ class WebSearchAgent(SearchTask):
     WebSearchAgent orchestrates search operations using a language model, generating search instructions,
     and performing the search via the SERP API.
 
+    Before searching, the query is rewritten into search arguments in one of three modes:
+    'llm' asks the model through function calling (memoized per normalized query, so repeated
+    queries skip the model round-trip), 'heuristic' strips conversational filler locally, and
+    'none' sends the query to SERP unchanged.
+
     Attributes:
         TEMPLATE_PATH (str): Path to the template configuration file used for search.
+        REWRITE_MODE (str): Default query rewrite mode ('llm', 'heuristic' or 'none').
+        REWRITE_CACHE_PATH (str): Path to the persistent query rewrite memo.
+        REWRITE_CACHE_TTL (int): Seconds a memoized rewrite is reused before the model is asked again.
+        REWRITE_CACHE_ENTRIES (int): Maximum number of memoized rewrites, least recently used evicted first.
+        MAX_SEARCH_WORKERS (int): Maximum number of queries of a batch searched concurrently.
         response_generator (ResponseGenerator): Instance to generate responses from the language model.
         template_manager (TemplateManager): Manages and fills templates for search instructions.
+        rewrite_mode (str): Query rewrite mode used by this agent.
+        rewrite_cache (Optional[PersistentCache]): Memo of normalized query to function arguments.
     """
     TEMPLATE_PATH = './config/patterns/web_access.yml'
+    REWRITE_MODES = ('llm', 'heuristic', 'none')
+    REWRITE_MODE = 'llm'
+    REWRITE_CACHE_PATH = './data/patterns/web_access/cache/rewrite.db'
+    REWRITE_CACHE_TTL = 30 * 24 * 60 * 60  # Rewrites are refreshed after a month
+    REWRITE_CACHE_ENTRIES = 5000
+    MAX_SEARCH_WORKERS = 5
 
-    def __init__(self) -> None:
+    def __init__(self, rewrite_mode: str = REWRITE_MODE, rewrite_cache: Optional[PersistentCache] = None) -> None:
         """
         Initializes WebSearchAgent with the response generator and template manager.
+
+        Args:
+            rewrite_mode (str): Query rewrite mode, one of 'llm', 'heuristic' or 'none' (default is 'llm').
+            rewrite_cache (Optional[PersistentCache]): Memo for LLM rewrites (default is a cache at REWRITE_CACHE_PATH).
+
+        Raises:
+            ValueError: If the rewrite mode is unknown.
         """
+        if rewrite_mode not in self.REWRITE_MODES:
+            logger.error(f"Unknown query rewrite mode: {rewrite_mode}")
+            raise ValueError(f"Unknown query rewrite mode: {rewrite_mode}")
         self.response_generator = ResponseGenerator()
         self.template_manager = TemplateManager(self.TEMPLATE_PATH)
+        self.rewrite_mode = rewrite_mode
+        self.rewrite_cache = rewrite_cache
+        if rewrite_mode == 'llm' and rewrite_cache is None:
+            self.rewrite_cache = PersistentCache(self.REWRITE_CACHE_PATH, ttl=self.REWRITE_CACHE_TTL,
+                                             max_entries=self.REWRITE_CACHE_ENTRIES)
+        # Memoized rewrites are invalidated whenever the search prompt changes
+        template = self.template_manager.create_template('tools', 'search')
+        self._prompt_version = PersistentCache.make_key(template['system'], template['user'])
+        self._serp_clients: LoopLocal[AsyncSerpAPIClient] = LoopLocal(create_async_client, AsyncSerpAPIClient.close)
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """
+        Normalizes a query for memo lookups: lowercase, single spaces, no trailing punctuation.
+
+        Args:
+            query (str): Raw query string.
+
+        Returns:
+            str: Normalized query.
+        """
+        return re.sub(r'\s+', ' ', query).strip().rstrip('?!.').strip().lower()
+
+    @staticmethod
+    def heuristic_rewrite(query: str) -> Dict[str, Any]:
+        """
+        Rewrites a query locally by dropping conversational lead-ins and trailing punctuation.
+        Place names stay in the query text, where the search engine resolves them itself.
+
+        Args:
+            query (str): Raw query string.
+
+        Returns:
+            Dict[str, Any]: Function arguments with the rewritten query and no location.
+        """
+        cleaned = re.sub(r'\s+', ' ', query).strip().rstrip('?!.').strip()
+        rewritten = FILLER_PREFIXES.sub('', cleaned).strip()
+        return {'query': rewritten or cleaned, 'location': ''}
+
+    def rewrite_query(self, model_name: str, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Turns a user query into search function arguments according to the rewrite mode.
+
+        Args:
+            model_name (str): Name of the model to use in 'llm' mode.
+            query (str): Raw query string.
+
+        Returns:
+            Optional[Dict[str, Any]]: Function arguments, or None to search with the raw query.
+        """
+        if self.rewrite_mode == 'none':
+            return None
+        if self.rewrite_mode == 'heuristic':
+            return self.heuristic_rewrite(query)
+
+        memo_key = PersistentCache.make_key(model_name, self._prompt_version, self.normalize_query(query))
+        function_args = self.rewrite_cache.get(memo_key)
+        if function_args is not None:
+            logger.info(f"Query rewrite memo hit for: '{query}'")
+            return function_args
+
+        search_tool = Tool(function_declarations=[self.create_search_function_declaration()])
+        response = self.function_call(model_name, query, search_tool)
+        return self._memoize_rewrite(memo_key, self.extract_function_args(response))
+
+    async def arewrite_query(self, model_name: str, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Asynchronous counterpart of `rewrite_query` that awaits the model in 'llm' mode. Memo
+        lookups and writes run in a worker thread, off the event loop.
+
+        Args:
+            model_name (str): Name of the model to use in 'llm' mode.
+            query (str): Raw query string.
+
+        Returns:
+            Optional[Dict[str, Any]]: Function arguments, or None to search with the raw query.
+        """
+        if self.rewrite_mode != 'llm':
+            return self.rewrite_query(model_name, query)
+
+        memo_key = PersistentCache.make_key(model_name, self._prompt_version, self.normalize_query(query))
+        function_args = await asyncio.to_thread(self.rewrite_cache.get, memo_key)
+        if function_args is not None:
+            logger.info(f"Query rewrite memo hit for: '{query}'")
+            return function_args
+
+        search_tool = Tool(function_declarations=[self.create_search_function_declaration()])
+        response = await self.afunction_call(model_name, query, search_tool)
+        return await asyncio.to_thread(self._memoize_rewrite, memo_key, self.extract_function_args(response))
+
+    def _memoize_rewrite(self, memo_key: str, function_args: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Stores extracted function arguments in the rewrite memo.
+
+        Args:
+            memo_key (str): Memo key of the normalized query.
+            function_args (Optional[Dict[str, Any]]): Arguments extracted from the model response.
+
+        Returns:
+            Optional[Dict[str, Any]]: The same arguments.
+        """
+        if function_args:
+            self.rewrite_cache.set(memo_key, {key: str(value) for key, value in function_args.items()})
+        return function_args
 
     def create_search_function_declaration(self) -> FunctionDeclaration:
         """
@@ -66,9 +219,7 @@ class WebSearchAgent(SearchTask):
             Exception: If there is an error during response generation.
         """
         try:
-            template = self.template_manager.create_template('tools', 'search')
-            system_instruction = template['system']
-            user_instruction = self.template_manager.fill_template(template['user'], query=search_query)
+            system_instruction, user_instruction = self._build_prompt(search_query)
             
             logger.info(f"Generating response for search query: {search_query}")
             return self.response_generator.generate_response(
@@ -81,6 +232,48 @@ class WebSearchAgent(SearchTask):
             logger.error(f"Error generating search data: {e}")
             raise
 
+    async def afunction_call(self, model_name: str, search_query: str, search_tool: Tool) -> GenerationResponse:
+        """
+        Asynchronous counterpart of `function_call`.
+
+        Args:
+            model_name (str): Name of the model to use for generating the response.
+            search_query (str): The search query string.
+            search_tool (Tool): Tool containing the function declaration for search.
+
+        Returns:
+            GenerationResponse: The response generated by the language model.
+
+        Raises:
+            Exception: If there is an error during response generation.
+        """
+        try:
+            system_instruction, user_instruction = self._build_prompt(search_query)
+
+            logger.info(f"Generating response for search query: {search_query}")
+            return await self.response_generator.agenerate_response(
+                model_name,
+                system_instruction,
+                [user_instruction],
+                tools=[search_tool]
+            )
+        except Exception as e:
+            logger.error(f"Error generating search data: {e}")
+            raise
+
+    def _build_prompt(self, search_query: str) -> Tuple[str, str]:
+        """
+        Fills the search template for a query.
+
+        Args:
+            search_query (str): The search query string.
+
+        Returns:
+            Tuple[str, str]: System and user instructions.
+        """
+        template = self.template_manager.create_template('tools', 'search')
+        return template['system'], self.template_manager.fill_template(template['user'], query=search_query)
+
     def extract_function_args(self, response: GenerationResponse) -> Optional[Dict[str, Any]]:
         """
         Extracts function arguments from the language model response.
@@ -104,7 +297,8 @@ class WebSearchAgent(SearchTask):
             logger.error(f"Failed to extract function arguments: {e}")
             return None
 
-    def run(self, model_name: str, query: str, location: str = '') -> None:
+    def run(self, model_name: str, query: str, location: str = '', persist: bool = True,
+            workspace: Optional[Workspace] = None) -> List[SearchResult]:
         """
         Runs the web search process, generating instructions, extracting arguments, and initiating the search.
 
@@ -112,20 +306,95 @@ class WebSearchAgent(SearchTask):
             model_name (str): Name of the language model for generating the search response.
             query (str): Search query string.
             location (str, optional): Geographic location for search (default is '').
+            persist (bool, optional): Whether to save the search results to disk (default is True).
+            workspace (Optional[Workspace]): Folders to write to (default is the shared output folders).
+
+        Returns:
+            List[SearchResult]: The top search results.
         """
         try:
-            # Create search function tool and generate response
-            search_tool = Tool(function_declarations=[self.create_search_function_declaration()])
-            response = self.function_call(model_name, query, search_tool)
-            function_args = self.extract_function_args(response)
+            # Rewrite the query into search arguments (memoized LLM call, local heuristic or none)
+            function_args = self.rewrite_query(model_name, query)
 
             # Set search terms and location based on function arguments if available
             search_terms = function_args.get('query', query) if function_args else query
             search_location = location or function_args.get('location', '') if function_args else location
 
             logger.info(f"Running web search for query: '{search_terms}', location: '{search_location}'")
-            google_search(query, search_terms, search_location)
+            output_dir = workspace.search_dir if workspace else SEARCH_RESULTS_OUTPUT_DIR
+            return google_search(query, search_terms, search_location, persist=persist, output_dir=output_dir)
 
         except Exception as e:
             logger.error(f"Error during search execution: {e}")
             raise
+
+    async def arun(self, model_name: str, query: str, location: str = '', persist: bool = True,
+                   workspace: Optional[Workspace] = None) -> List[SearchResult]:
+        """
+        Asynchronous counterpart of `run`. The model call and the SERP request are awaited on the
+        event loop, through a pooled SERP client kept per event loop.
+
+        Args:
+            model_name (str): Name of the language model for generating the search response.
+            query (str): Search query string.
+            location (str, optional): Geographic location for search (default is '').
+            persist (bool, optional): Whether to save the search results to disk (default is True).
+            workspace (Optional[Workspace]): Folders to write to (default is the shared output folders).
+
+        Returns:
+            List[SearchResult]: The top search results.
+        """
+        try:
+            function_args = await self.arewrite_query(model_name, query)
+
+            search_terms = function_args.get('query', query) if function_args else query
+            search_location = location or function_args.get('location', '') if function_args else location
+
+            logger.info(f"Running web search for query: '{search_terms}', location: '{search_location}'")
+            output_dir = workspace.search_dir if workspace else SEARCH_RESULTS_OUTPUT_DIR
+            return await agoogle_search(query, search_terms, search_location, persist=persist, output_dir=output_dir,
+                                        client=self._serp_clients.get())
+
+        except Exception as e:
+            logger.error(f"Error during search execution: {e}")
+            raise
+
+    async def aclose(self) -> None:
+        """
+        Closes the SERP client of the running event loop, if one was created.
+        """
+        client = self._serp_clients.pop()
+        if client is not None:
+            await client.close()
+
+    def run_batch(self, model_name: str, queries: List[str], location: str = '', persist: bool = True,
+                  workspace: Optional[Workspace] = None) -> Dict[str, List[SearchResult]]:
+        """
+        Searches several queries concurrently. SERP requests share the process-wide rate limiter,
+        so the fan-out never exceeds the API's request rate. A failing query yields no results
+        instead of failing the whole batch.
+
+        Args:
+            model_name (str): Name of the language model for rewriting the queries.
+            queries (List[str]): Search query strings; duplicates are searched once.
+            location (str, optional): Geographic location for every search (default is '').
+            persist (bool, optional): Whether to save each query's search results to disk (default is True).
+            workspace (Optional[Workspace]): Folders to write to (default is the shared output folders).
+
+        Returns:
+            Dict[str, List[SearchResult]]: The top search results of each query, in query order.
+        """
+        unique_queries = list(dict.fromkeys(queries))
+        if not unique_queries:
+            return {}
+
+        def search(query: str) -> List[SearchResult]:
+            try:
+                return self.run(model_name, query, location, persist=persist, workspace=workspace)
+            except Exception as e:
+                logger.error(f"Search failed for query '{query}' in batch: {e}")
+                return []
+
+        logger.info(f"Running batch web search for {len(unique_queries)} queries.")
+        with ThreadPoolExecutor(max_workers=min(self.MAX_SEARCH_WORKERS, len(unique_queries))) as executor:
+            return dict(zip(unique_queries, executor.map(search, unique_queries)))
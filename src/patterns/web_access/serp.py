@@ -1,37 +1,245 @@
+from src.patterns.web_access.tasks import SearchResult
+from requests.adapters import HTTPAdapter
+from src.utils.cache import PersistentCache
 from src.utils.io import generate_filename
 from src.config.logging import logger
 from src.utils.io import load_yaml
+from urllib.parse import urlsplit
+from urllib.parse import urlunsplit
+from functools import lru_cache
+from typing import Optional
 from typing import Union
+from typing import List
 from typing import Tuple
 from typing import Dict 
 from typing import Any 
+import threading
 import requests
+import aiohttp
+import asyncio
 import json
+import time
 import os
 
 
 # Static paths
 CREDENTIALS_PATH = './credentials/key.yml'
 SEARCH_RESULTS_OUTPUT_DIR = './data/patterns/web_access/output/search'
+SEARCH_CACHE_PATH = './data/patterns/web_access/cache/serp.db'
+
+# Client settings
+SERP_API_URL = "https://serpapi.com/search.json"
+SEARCH_CACHE_TTL = 24 * 60 * 60  # Seconds before a cached search result goes stale
+REQUEST_TIMEOUT = 10  # Seconds per SERP API request
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5  # Retries wait 0.5s, 1s, 2s, ...
+MAX_CONNECTIONS = 20
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+REQUESTS_PER_SECOND = 5  # Upper bound on SERP API calls issued by this process
+TOP_RESULTS = 5  # Organic results kept per query
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls at least `1 / rate` seconds apart.
+
+    Callers reserve the next free slot under a lock and sleep outside it, so concurrent
+    searches queue up behind each other instead of bursting into the API's rate limit.
+    """
+
+    def __init__(self, rate: float = REQUESTS_PER_SECOND) -> None:
+        """
+        Initializes the limiter.
+
+        Args:
+            rate (float): Maximum calls per second (default is 5).
+        """
+        self.interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Reserves the next free slot.
+
+        Returns:
+            float: Seconds to wait before the slot starts.
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+            return slot - now
+
+    def acquire(self) -> None:
+        """
+        Blocks until the caller may issue its request.
+        """
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """
+        Waits, without blocking the event loop, until the caller may issue its request.
+        """
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
 
 class SerpAPIClient:
     """
     Client for interacting with the SERP API to perform search queries.
+
+    Requests go through a pooled session. Transient failures are retried with exponential backoff,
+    and every attempt, retries included, waits for the rate limiter. Successful results are cached
+    by (query, engine, location) when a cache is given.
     """
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, base_url: str = SERP_API_URL, timeout: float = REQUEST_TIMEOUT,
+                 max_retries: int = MAX_RETRIES, cache: Optional[PersistentCache] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
         """
         Initializes SerpAPIClient with the provided API key.
 
         Args:
             api_key (str): API key for authenticating with the SERP API.
+            base_url (str, optional): Search endpoint, e.g. a local mock server (default is SerpApi).
+            timeout (float, optional): Seconds per request (default is 10).
+            max_retries (int, optional): Retries on connection errors and 429/5xx responses (default is 3).
+            cache (Optional[PersistentCache]): Query-to-results cache (default is no caching).
+            rate_limiter (Optional[RateLimiter]): Limiter applied to requests that miss the cache (default is none).
         """
         self.api_key = api_key
-        self.base_url = "https://serpapi.com/search.json"
+        self.base_url = base_url
+        self.timeout = timeout
+        self.cache = cache
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=MAX_CONNECTIONS))
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=MAX_CONNECTIONS))
 
     def search(self, query: str, engine: str = "google", location: str = "") -> Union[Dict[str, Any], Tuple[int, str]]:
         """
-        Executes a search query using the SERP API.
+        Executes a search query using the SERP API, retrying transient failures.
+
+        Args:
+            query (str): Search query string.
+            engine (str, optional): Search engine to use (default is "google").
+            location (str, optional): Location for the search query (default is "").
+
+        Returns:
+            Union[Dict[str, Any], Tuple[int, str]]: Search results as a JSON dictionary if successful, 
+            or a tuple with HTTP status code and error message if the request fails.
+        """
+        cache_key = PersistentCache.make_key(query, engine, location)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"SERP cache hit for query: '{query}'")
+                return cached
+
+        params = {
+            "engine": engine,
+            "q": query,
+            "api_key": self.api_key,
+            "location": location
+        }
+
+        error: Tuple[int, str] = (0, "No request made")
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(BACKOFF_FACTOR * 2 ** (attempt - 1))
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+                if response.status_code in RETRY_STATUS_CODES:
+                    error = (response.status_code, f"SERP API returned HTTP {response.status_code}")
+                    logger.warning(f"{error[1]} (attempt {attempt + 1}/{self.max_retries + 1})")
+                    continue
+                response.raise_for_status()
+                results = response.json()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = (0, str(e) or type(e).__name__)
+                logger.warning(f"Request to SERP API failed: {error[1]} (attempt {attempt + 1}/{self.max_retries + 1})")
+                continue
+            except requests.RequestException as e:
+                logger.error(f"Request to SERP API failed: {e}")
+                status_code = e.response.status_code if e.response is not None else 0
+                return status_code, str(e)
+
+            if self.cache is not None:
+                self.cache.set(cache_key, results)
+            return results
+
+        logger.error(f"Request to SERP API failed after {self.max_retries + 1} attempts: {error[1]}")
+        return error
+
+    def close(self) -> None:
+        """
+        Closes the pooled HTTP session.
+        """
+        self.session.close()
+
+
+class AsyncSerpAPIClient:
+    """
+    Asynchronous client for the SERP API built on a pooled aiohttp session.
+
+    Shares the retry, timeout and caching behaviour of SerpAPIClient; cache reads and writes run in
+    a worker thread so disk I/O never blocks the event loop. The session is bound to the event
+    loop it is first used on, so create one client per loop and close it when done.
+    """
+
+    def __init__(self, api_key: str, base_url: str = SERP_API_URL, timeout: float = REQUEST_TIMEOUT,
+                 max_retries: int = MAX_RETRIES, cache: Optional[PersistentCache] = None,
+                 max_connections: int = MAX_CONNECTIONS, rate_limiter: Optional[RateLimiter] = None):
+        """
+        Initializes AsyncSerpAPIClient with the provided API key.
+
+        Args:
+            api_key (str): API key for authenticating with the SERP API.
+            base_url (str, optional): Search endpoint, e.g. a local mock server (default is SerpApi).
+            timeout (float, optional): Seconds per request (default is 10).
+            max_retries (int, optional): Retries on connection errors and 429/5xx responses (default is 3).
+            cache (Optional[PersistentCache]): Query-to-results cache (default is no caching).
+            max_connections (int, optional): Size of the connection pool (default is 20).
+            rate_limiter (Optional[RateLimiter]): Limiter applied to requests that miss the cache (default is none).
+        """
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.cache = cache
+        self.max_connections = max_connections
+        self.rate_limiter = rate_limiter
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> 'AsyncSerpAPIClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Lazily creates the pooled session on the running event loop.
+
+        Returns:
+            aiohttp.ClientSession: The pooled session.
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=self.max_connections)
+            )
+        return self._session
+
+    async def search(self, query: str, engine: str = "google", location: str = "") -> Union[Dict[str, Any], Tuple[int, str]]:
+        """
+        Executes a search query using the SERP API, retrying transient failures.
 
         Args:
             query (str): Search query string.
@@ -42,20 +250,60 @@ class SerpAPIClient:
             Union[Dict[str, Any], Tuple[int, str]]: Search results as a JSON dictionary if successful, 
             or a tuple with HTTP status code and error message if the request fails.
         """
+        cache_key = PersistentCache.make_key(query, engine, location)
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                logger.info(f"SERP cache hit for query: '{query}'")
+                return cached
+
         params = {
             "engine": engine,
             "q": query,
             "api_key": self.api_key,
             "location": location
         }
+        session = self._get_session()
+        error: Tuple[int, str] = (0, "No request made")
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(BACKOFF_FACTOR * 2 ** (attempt - 1))
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+            try:
+                async with session.get(self.base_url, params=params) as response:
+                    if response.status in RETRY_STATUS_CODES:
+                        error = (response.status, f"SERP API returned HTTP {response.status}")
+                        logger.warning(f"{error[1]} (attempt {attempt + 1}/{self.max_retries + 1})")
+                        continue
+                    response.raise_for_status()
+                    results = await response.json(content_type=None)
+            except aiohttp.ClientResponseError as e:
+                logger.error(f"Request to SERP API failed: {e}")
+                return e.status, str(e)
+            except ValueError as e:
+                # The response body is not valid JSON
+                logger.error(f"Request to SERP API failed: {e}")
+                return 0, str(e)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = (0, str(e) or type(e).__name__)
+                logger.warning(f"Request to SERP API failed: {error[1]} (attempt {attempt + 1}/{self.max_retries + 1})")
+                continue
+
+            if self.cache is not None:
+                await asyncio.to_thread(self.cache.set, cache_key, results)
+            return results
 
-        try:
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            logger.error(f"Request to SERP API failed: {e}")
-            return response.status_code, str(e)
+        logger.error(f"Request to SERP API failed after {self.max_retries + 1} attempts: {error[1]}")
+        return error
+
+    async def close(self) -> None:
+        """
+        Closes the pooled HTTP session.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
 
 def load_api_key(credentials_path: str) -> str:
     """
@@ -73,6 +321,60 @@ def load_api_key(credentials_path: str) -> str:
     config = load_yaml(credentials_path)
     return config['serp']['key']
 
+@lru_cache(maxsize=None)
+def get_api_key(credentials_path: str = CREDENTIALS_PATH) -> str:
+    """
+    Loads the API key once per process and reuses it for every search.
+
+    Args:
+        credentials_path (str): Path to the YAML file containing API credentials.
+
+    Returns:
+        str: API key extracted from the YAML file.
+    """
+    return load_api_key(credentials_path)
+
+_search_cache: Optional[PersistentCache] = None
+_client: Optional[SerpAPIClient] = None
+_shared_lock = threading.Lock()
+_rate_limiter = RateLimiter(REQUESTS_PER_SECOND)
+
+def get_search_cache() -> PersistentCache:
+    """
+    Returns the process-wide query-to-results cache, opening it on first use.
+
+    Returns:
+        PersistentCache: Cache of SERP API responses keyed on query, engine and location.
+    """
+    global _search_cache
+    with _shared_lock:
+        if _search_cache is None:
+            _search_cache = PersistentCache(SEARCH_CACHE_PATH, ttl=SEARCH_CACHE_TTL)
+        return _search_cache
+
+def get_client() -> SerpAPIClient:
+    """
+    Returns the process-wide SERP API client, creating it on first use.
+
+    Returns:
+        SerpAPIClient: Client with a pooled session and the shared result cache.
+    """
+    global _client
+    cache = get_search_cache()
+    with _shared_lock:
+        if _client is None:
+            _client = SerpAPIClient(get_api_key(), cache=cache, rate_limiter=_rate_limiter)
+        return _client
+
+def create_async_client() -> AsyncSerpAPIClient:
+    """
+    Creates an asynchronous SERP API client sharing the process-wide key, result cache and rate limit.
+
+    Returns:
+        AsyncSerpAPIClient: A new client; close it (or use it as an async context manager) when done.
+    """
+    return AsyncSerpAPIClient(get_api_key(), cache=get_search_cache(), rate_limiter=_rate_limiter)
+
 def log_top_search_results(results: Dict[str, Any], top_n: int = 5) -> None:
     """
     Logs the top N search results.
@@ -90,16 +392,18 @@ def log_top_search_results(results: Dict[str, Any], top_n: int = 5) -> None:
         logger.info(f"  Snippet: {result.get('snippet')}")
         logger.info('-' * 100)
 
-def save_top_search_results_to_json(results: Dict[str, Any], output_path: str, top_n: int = 5) -> None:
+def get_top_search_results(results: Dict[str, Any], top_n: int = TOP_RESULTS) -> List[SearchResult]:
     """
-    Saves the top N search results to a JSON file.
+    Extracts the top N organic results from a SERP API response.
 
     Args:
         results (Dict[str, Any]): Search results from the SERP API.
-        output_path (str): File path to save the JSON output.
-        top_n (int, optional): Number of top results to save (default is 10).
+        top_n (int, optional): Number of top results to keep (default is 5).
+
+    Returns:
+        List[SearchResult]: Position, title, link and snippet of each top result.
     """
-    top_results = [
+    return [
         {
             "Position": result.get('position'),
             "Title": result.get('title'),
@@ -109,39 +413,139 @@ def save_top_search_results_to_json(results: Dict[str, Any], output_path: str, t
         for result in results.get('organic_results', [])[:top_n]
     ]
 
+def normalize_url(url: str) -> str:
+    """
+    Normalizes a result URL for deduplication: lowercase scheme and host, no fragment, no trailing slash.
+
+    Args:
+        url (str): Result URL.
+
+    Returns:
+        str: Normalized URL.
+    """
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ''))
+
+def dedupe_search_results(results_by_query: Dict[str, List[SearchResult]]) -> List[SearchResult]:
+    """
+    Merges the results of several queries, keeping the first occurrence of every URL.
+
+    Args:
+        results_by_query (Dict[str, List[SearchResult]]): Top results of each query, in query order.
+
+    Returns:
+        List[SearchResult]: Results with unique URLs, in query order and then rank order.
+    """
+    seen = set()
+    unique_results = []
+    for results in results_by_query.values():
+        for result in results:
+            if not result.get('Link'):
+                continue
+            url = normalize_url(result['Link'])
+            if url not in seen:
+                seen.add(url)
+                unique_results.append(result)
+    total = sum(len(results) for results in results_by_query.values())
+    logger.info(f"Deduplicated {total} search results from {len(results_by_query)} queries into {len(unique_results)} URLs")
+    return unique_results
+
+def save_search_results(top_results: List[SearchResult], output_path: str) -> None:
+    """
+    Saves already extracted top search results to a JSON file.
+
+    Args:
+        top_results (List[SearchResult]): Top search results.
+        output_path (str): File path to save the JSON output.
+    """
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
     with open(output_path, 'w', encoding='utf-8') as json_file:
         json.dump({"Top Results": top_results}, json_file, indent=4)
 
-    logger.info(f"Top {top_n} search results saved to {output_path}")
+    logger.info(f"Top {len(top_results)} search results saved to {output_path}")
+
+def save_top_search_results_to_json(results: Dict[str, Any], output_path: str, top_n: int = 5) -> None:
+    """
+    Saves the top N search results to a JSON file.
+
+    Args:
+        results (Dict[str, Any]): Search results from the SERP API.
+        output_path (str): File path to save the JSON output.
+        top_n (int, optional): Number of top results to save (default is 10).
+    """
+    save_search_results(get_top_search_results(results, top_n), output_path)
 
-def run(raw_query: str, search_query: str, location: str) -> None:
+def run(raw_query: str, search_query: str, location: str, persist: bool = True,
+        output_dir: str = SEARCH_RESULTS_OUTPUT_DIR) -> List[SearchResult]:
     """
-    Executes the search using SERP API, logs the top results, and saves them to a JSON file.
+    Executes the search using SERP API, logs the top results, and optionally saves them to a JSON file.
 
     Args:
         raw_query (str): Raw query string for filename generation.
         search_query (str): Search query for the SERP API.
         location (str): Location for the search query.
+        persist (bool, optional): Whether to save the top results to disk (default is True).
+        output_dir (str, optional): Folder to save the top results into (default is the shared search folder).
+
+    Returns:
+        List[SearchResult]: The top search results, or an empty list if the search failed.
+    """
+    # Perform the search with the shared, pooled client
+    results = get_client().search(search_query, location=location)
+    return process_search_results(raw_query, results, persist, output_dir)
+
+async def arun(raw_query: str, search_query: str, location: str, persist: bool = True,
+               output_dir: str = SEARCH_RESULTS_OUTPUT_DIR, client: Optional[AsyncSerpAPIClient] = None) -> List[SearchResult]:
+    """
+    Asynchronous counterpart of `run` that performs the search without blocking the event loop.
+
+    Args:
+        raw_query (str): Raw query string for filename generation.
+        search_query (str): Search query for the SERP API.
+        location (str): Location for the search query.
+        persist (bool, optional): Whether to save the top results to disk (default is True).
+        output_dir (str, optional): Folder to save the top results into (default is the shared search folder).
+        client (Optional[AsyncSerpAPIClient]): Client to reuse; a temporary one is created if None.
+
+    Returns:
+        List[SearchResult]: The top search results, or an empty list if the search failed.
     """
-    # Load the API key
-    api_key = load_api_key(CREDENTIALS_PATH)
+    if client is None:
+        async with create_async_client() as temporary_client:
+            results = await temporary_client.search(search_query, location=location)
+    else:
+        results = await client.search(search_query, location=location)
+    return process_search_results(raw_query, results, persist, output_dir)
 
-    # Initialize the SERP API client
-    serp_client = SerpAPIClient(api_key)
+def process_search_results(raw_query: str, results: Union[Dict[str, Any], Tuple[int, str]], persist: bool,
+                           output_dir: str) -> List[SearchResult]:
+    """
+    Logs the top results of a search and optionally saves them to a JSON file.
 
-    # Perform the search
-    results = serp_client.search(search_query, location=location)
+    Args:
+        raw_query (str): Raw query string for filename generation.
+        results (Union[Dict[str, Any], Tuple[int, str]]): Search response or (status code, error message).
+        persist (bool): Whether to save the top results to disk.
+        output_dir (str): Folder to save the top results into.
 
+    Returns:
+        List[SearchResult]: The top search results, or an empty list if the search failed.
+    """
     # Process results if the search was successful
     if isinstance(results, dict):
-        # Log and save the top search results
+        # Log and optionally save the top search results
         log_top_search_results(results)
-        output_path = os.path.join(SEARCH_RESULTS_OUTPUT_DIR, generate_filename(raw_query, 'json'))
-        save_top_search_results_to_json(results, output_path)
+        top_results = get_top_search_results(results)
+        if persist:
+            output_path = os.path.join(output_dir, generate_filename(raw_query, 'json'))
+            save_search_results(top_results, output_path)
+        return top_results
     else:
         # Handle the error response
         status_code, error_message = results
         logger.error(f"Search failed with status code {status_code}: {error_message}")
+        return []
 
 if __name__ == "__main__":
     search_query = "greek restaurants"
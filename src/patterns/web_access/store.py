@@ -0,0 +1,255 @@
+from src.patterns.web_access.extract import truncate_text
+from src.patterns.web_access.tasks import ScrapedPage
+from src.utils.tokens import estimate_tokens
+from src.utils.tokens import tokens_to_chars
+from src.config.logging import logger
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
+from typing import Dict
+from typing import List
+from typing import Any
+import threading
+import struct
+import json
+import os
+
+
+# Each index record holds the byte offset and length of one JSONL line.
+_INDEX_RECORD = struct.Struct('<QQ')
+
+
+class ScrapeStore:
+    """
+    Append-only JSONL store of scraped entries with a fixed-width offset index.
+
+    Entries are written one JSON object per line to `<path>`; a sidecar `<path>.idx` records the
+    byte offset and length of every line, so any entry can be read with two seeks and readers can
+    stream, select or truncate entries without loading and re-parsing the whole file.
+
+    Attributes:
+        path (str): Path to the JSONL data file.
+        index_path (str): Path to the binary offset index.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initializes the store for the given data file path.
+
+        Args:
+            path (str): Path to the JSONL data file.
+        """
+        self.path = path
+        self.index_path = f"{path}.idx"
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        """
+        Removes all entries, truncating both the data file and its index.
+        """
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            open(self.path, 'wb').close()
+            open(self.index_path, 'wb').close()
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """
+        Appends one entry to the store.
+
+        Args:
+            entry (Dict[str, Any]): JSON-serializable entry.
+
+        Returns:
+            int: Position of the appended entry.
+        """
+        line = (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'ab') as data_file, open(self.index_path, 'ab') as index_file:
+                data_file.seek(0, os.SEEK_END)
+                offset = data_file.tell()
+                data_file.write(line)
+                index_file.write(_INDEX_RECORD.pack(offset, len(line)))
+                position = index_file.tell() // _INDEX_RECORD.size - 1
+        return position
+
+    def extend(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Appends several entries to the store.
+
+        Args:
+            entries (List[Dict[str, Any]]): JSON-serializable entries.
+        """
+        for entry in entries:
+            self.append(entry)
+
+    def __len__(self) -> int:
+        if not os.path.exists(self.index_path):
+            return 0
+        return os.path.getsize(self.index_path) // _INDEX_RECORD.size
+
+    def offsets(self) -> List[Tuple[int, int]]:
+        """
+        Reads the offset index.
+
+        Returns:
+            List[Tuple[int, int]]: Byte offset and length of every entry, in append order.
+        """
+        if not os.path.exists(self.index_path):
+            return []
+        with open(self.index_path, 'rb') as index_file:
+            return list(_INDEX_RECORD.iter_unpack(index_file.read()))
+
+    def read_entry(self, position: int) -> Dict[str, Any]:
+        """
+        Reads a single entry by position without touching the rest of the file.
+
+        Args:
+            position (int): Position of the entry.
+
+        Returns:
+            Dict[str, Any]: The stored entry.
+
+        Raises:
+            IndexError: If the position is out of range.
+        """
+        if position < 0 or position >= len(self):
+            raise IndexError(f"Entry {position} out of range for store '{self.path}'")
+        with open(self.index_path, 'rb') as index_file:
+            index_file.seek(position * _INDEX_RECORD.size)
+            offset, length = _INDEX_RECORD.unpack(index_file.read(_INDEX_RECORD.size))
+        with open(self.path, 'rb') as data_file:
+            data_file.seek(offset)
+            return json.loads(data_file.read(length))
+
+    def iter_entries(self, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Streams entries in append order.
+
+        Args:
+            limit (Optional[int]): Maximum number of entries to yield (default is all).
+
+        Yields:
+            Dict[str, Any]: Stored entries.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as data_file:
+            for position, (offset, length) in enumerate(self.offsets()):
+                if limit is not None and position >= limit:
+                    break
+                data_file.seek(offset)
+                yield json.loads(data_file.read(length))
+
+    def select(self, top_k: Optional[int] = None, max_chars: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Selects the first `top_k` entries, truncating each entry's content to `max_chars`.
+
+        Args:
+            top_k (Optional[int]): Number of entries to keep (default is all).
+            max_chars (Optional[int]): Per-entry content budget in characters (default is no limit).
+
+        Returns:
+            List[Dict[str, Any]]: Selected entries.
+        """
+        selected = select_entries(self.iter_entries(limit=top_k), max_chars=max_chars)
+        logger.info(f"Selected {len(selected)} of {len(self)} entries from '{self.path}'")
+        return selected
+
+
+def select_entries(entries: Iterable[ScrapedPage], top_k: Optional[int] = None, max_chars: Optional[int] = None) -> List[ScrapedPage]:
+    """
+    Selects the first `top_k` entries, truncating each entry's content to `max_chars`.
+
+    Args:
+        entries (Iterable[ScrapedPage]): Scraped entries in rank order.
+        top_k (Optional[int]): Number of entries to keep (default is all).
+        max_chars (Optional[int]): Per-entry content budget in characters (default is no limit).
+
+    Returns:
+        List[ScrapedPage]: Selected entries, copied so the originals are left untouched.
+    """
+    selected = []
+    for entry in entries:
+        if top_k is not None and len(selected) >= top_k:
+            break
+        selected.append({**entry, 'content': truncate_text(entry.get('content', ''), max_chars)})
+    return selected
+
+
+def format_entries(entries: List[ScrapedPage]) -> str:
+    """
+    Renders scraped entries as the text blocks the summarization prompt expects.
+
+    Args:
+        entries (List[ScrapedPage]): Entries with title, url, snippet and content.
+
+    Returns:
+        str: Entries rendered between BEGIN/END ENTRY markers.
+    """
+    blocks = []
+    for entry in entries:
+        blocks.append(
+            "==== BEGIN ENTRY ====\n"
+            f"TITLE: {entry['title']}\n"
+            f"URL: {entry['url']}\n"
+            f"SNIPPET: {entry['snippet']}\n"
+            f"CONTENT:\n{entry['content']}\n"
+            "==== END ENTRY ====\n"
+        )
+    return "\n".join(blocks)
+
+
+def split_entry(entry: ScrapedPage, max_tokens: int) -> List[ScrapedPage]:
+    """
+    Splits an entry whose rendering exceeds `max_tokens` into consecutive parts that each fit,
+    cutting the content at word boundaries. Every part keeps the entry's title, URL and snippet.
+
+    Args:
+        entry (ScrapedPage): Scraped entry.
+        max_tokens (int): Token budget of one rendered part.
+
+    Returns:
+        List[ScrapedPage]: The entry itself if it fits, otherwise its parts in order.
+    """
+    if estimate_tokens(format_entries([entry])) <= max_tokens:
+        return [entry]
+    header_tokens = estimate_tokens(format_entries([{**entry, 'content': ''}]))
+    part_chars = max(1, tokens_to_chars(max_tokens - header_tokens))
+    parts = []
+    remaining = entry.get('content', '')
+    while remaining:
+        piece = truncate_text(remaining, part_chars)
+        parts.append({**entry, 'content': piece})
+        remaining = remaining[len(piece):].lstrip()
+    return parts
+
+
+def chunk_entries(entries: Iterable[ScrapedPage], max_tokens: int) -> List[List[ScrapedPage]]:
+    """
+    Packs entries, in order, into chunks whose rendering fits a token budget. Entries larger
+    than the budget are split across chunks with `split_entry`.
+
+    Args:
+        entries (Iterable[ScrapedPage]): Scraped entries in rank order.
+        max_tokens (int): Token budget of one rendered chunk.
+
+    Returns:
+        List[List[ScrapedPage]]: Chunks of entries.
+    """
+    chunks = []
+    current: List[ScrapedPage] = []
+    current_tokens = 0
+    for entry in entries:
+        for part in split_entry(entry, max_tokens):
+            # Rendered entries are joined by a newline, so account for one separator per entry
+            part_tokens = estimate_tokens(format_entries([part])) + 1
+            if current and current_tokens + part_tokens > max_tokens:
+                chunks.append(current)
+                current, current_tokens = [], 0
+            current.append(part)
+            current_tokens += part_tokens
+    if current:
+        chunks.append(current)
+    return chunks
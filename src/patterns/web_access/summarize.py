@@ -1,60 +1,406 @@
+from src.patterns.web_access.store import select_entries
+from src.patterns.web_access.store import format_entries
+from src.patterns.web_access.store import chunk_entries
+from src.patterns.web_access.scrape import WebScrapeAgent
+from src.patterns.web_access.rank import RelevanceFilter
 from src.patterns.web_access.tasks import SummarizeTask
+from src.patterns.web_access.store import ScrapeStore
+from src.patterns.web_access.workspace import Workspace
+from src.patterns.web_access.tasks import ScrapedPage
+from src.patterns.web_access.serp import TOP_RESULTS
 from src.llm.generate import ResponseGenerator
+from concurrent.futures import ThreadPoolExecutor
 from src.prompt.manage import TemplateManager
+from src.utils.tokens import CHARS_PER_TOKEN
+from src.utils.tokens import estimate_tokens
 from src.utils.io import generate_filename
+from src.utils.cache import PersistentCache
 from src.config.logging import logger
-from src.utils.io import read_file
+from typing import Optional
 from typing import Dict
+from typing import Tuple
+from typing import List
+import hashlib
+import asyncio
+import math
 import os
 
 
 class WebContentSummarizeAgent(SummarizeTask):
     """
     Agent for summarizing scraped web content using a language model and predefined templates.
+
+    Unless disabled, a local BM25 relevance filter first keeps only the passages most relevant
+    to the query within `RELEVANCE_TOKENS`, the filter's own budget; a default scrape of a few
+    pages already exceeds it, so prompts shrink to the relevant passages. Content whose estimated
+    prompt size fits `SINGLE_SHOT_TOKENS` is summarized in one request. `SINGLE_SHOT_TOKENS` is sized to the largest
+    scrape of one query under the default caps (`SCRAPE_TOKENS`: `TOP_RESULTS` pages of
+    `WebScrapeAgent.MAX_CHARS`), so default runs are always single-shot. Map-reduce applies when
+    callers raise those caps or pass in more pages: entries are packed into chunks of `CHUNK_TOKENS`,
+    the chunks are summarized concurrently, and the partial summaries are merged in rounds until one
+    remains, so the size of every request stays bounded however much content was scraped.
+
+    Summaries are cached by model, template version and a hash of the content sent to the model,
+    so re-running a query whose pages did not change returns without calling the model.
     
     Attributes:
         INPUT_DIR (str): Directory path for scraped content to be summarized.
         OUTPUT_DIR (str): Directory path to save generated summaries.
         TEMPLATE_PATH (str): Path to template configuration file for generating instructions.
+        TOP_K (Optional[int]): Number of scraped entries to summarize (None keeps all).
+        MAX_ENTRY_CHARS (Optional[int]): Per-entry content budget in characters (None keeps all), applied when relevance filtering is disabled.
+        RELEVANCE_TOKENS (Optional[int]): Token budget of the passages kept by relevance filtering (None disables it).
+        SCRAPE_TOKENS (int): Estimated content tokens of the largest scrape of one query under the default caps.
+        PROMPT_OVERHEAD_TOKENS (int): Allowance for the template and the entry headers of a single-shot prompt.
+        SINGLE_SHOT_TOKENS (int): Largest estimated prompt summarized in a single request.
+        CHUNK_TOKENS (int): Estimated token budget of the content in one map or reduce request.
+        MAX_MAP_WORKERS (int): Maximum number of chunk summaries generated concurrently.
+        SUMMARY_CACHE_PATH (str): Path to the persistent summary cache.
+        SUMMARY_CACHE_ENTRIES (int): Maximum number of cached summaries, least recently used evicted first.
     """
     INPUT_DIR = './data/patterns/web_access/output/scrape'
     OUTPUT_DIR = './data/patterns/web_access/output/summarize'
     TEMPLATE_PATH = './config/patterns/web_access.yml'
+    TOP_K: Optional[int] = None
+    MAX_ENTRY_CHARS: Optional[int] = 8000
+    SCRAPE_TOKENS = math.ceil(TOP_RESULTS * WebScrapeAgent.MAX_CHARS / CHARS_PER_TOKEN)
+    PROMPT_OVERHEAD_TOKENS = 2_000
+    SINGLE_SHOT_TOKENS = SCRAPE_TOKENS + PROMPT_OVERHEAD_TOKENS
+    RELEVANCE_TOKENS: Optional[int] = RelevanceFilter.MAX_TOKENS
+    CHUNK_TOKENS = 12_000
+    MAX_MAP_WORKERS = 4
+    SUMMARY_CACHE_PATH = './data/patterns/web_access/cache/summary.db'
+    SUMMARY_CACHE_ENTRIES = 1000
 
-    def __init__(self) -> None:
+    def __init__(self, relevance_tokens: Optional[int] = RELEVANCE_TOKENS, cache_summaries: bool = True,
+                 summary_cache: Optional[PersistentCache] = None) -> None:
         """
-        Initializes WebContentSummarizeAgent with a template manager and response generator.
+        Initializes WebContentSummarizeAgent with a template manager, response generator, relevance filter
+        and summary cache.
+
+        Args:
+            relevance_tokens (Optional[int]): Token budget of the passages kept by relevance filtering
+                (default is RELEVANCE_TOKENS, None disables filtering).
+            cache_summaries (bool): Whether to reuse summaries of identical content (default is True).
+            summary_cache (Optional[PersistentCache]): Summary cache (default is a cache at SUMMARY_CACHE_PATH).
         """
         self.template_manager = TemplateManager(self.TEMPLATE_PATH)
         self.response_generator = ResponseGenerator()
+        self.relevance_filter = RelevanceFilter(max_tokens=relevance_tokens) if relevance_tokens else None
+        # Ranking sees whole pages; blind truncation only applies when there is no ranking
+        self._entry_chars = None if self.relevance_filter else self.MAX_ENTRY_CHARS
+        self.summary_cache = summary_cache
+        if cache_summaries and summary_cache is None:
+            self.summary_cache = PersistentCache(self.SUMMARY_CACHE_PATH, max_entries=self.SUMMARY_CACHE_ENTRIES)
+        self._template_version = self._get_template_version()
+
+    def _get_template_version(self) -> str:
+        """
+        Fingerprints everything besides the content that shapes a summary: the summarize and reduce
+        templates and the single-shot and chunk budgets. Changing any of them invalidates cached summaries.
+
+        Returns:
+            str: Template version hash.
+        """
+        templates = [self.template_manager.create_template('tools', action) for action in ('summarize', 'summarize_reduce')]
+        return PersistentCache.make_key(
+            [[template['system'], template['user']] for template in templates], self.SINGLE_SHOT_TOKENS, self.CHUNK_TOKENS
+        )
+
+    def _summary_cache_key(self, model_name: str, query: str, entries: List[ScrapedPage]) -> str:
+        """
+        Builds the summary cache key of the content that would be sent to the model.
+
+        Args:
+            model_name (str): Model name to be used for summarization.
+            query (str): Query string to contextualize the summary.
+            entries (List[ScrapedPage]): Entries to summarize, after selection and relevance filtering.
 
-    def _read_scraped_content(self, query: str) -> str:
+        Returns:
+            str: Cache key.
+        """
+        content_hash = hashlib.sha256(format_entries(entries).encode('utf-8')).hexdigest()
+        return PersistentCache.make_key(model_name, self._template_version, query, content_hash)
+
+    def _read_scraped_entries(self, query: str, input_dir: Optional[str] = None) -> List[ScrapedPage]:
         """
-        Reads scraped content from the input directory based on the query.
+        Streams the top entries of the query's scrape store, truncating each to the per-entry budget.
 
         Args:
             query (str): Query string to locate the specific scraped content.
+            input_dir (Optional[str]): Folder holding the scrape store (default is INPUT_DIR).
 
         Returns:
-            str: Scraped content as a string.
+            List[ScrapedPage]: The selected scraped entries.
         """
         try:
             logger.info(f"Reading scraped content for query: '{query}'")
-            input_file_path = os.path.join(self.INPUT_DIR, generate_filename(query, 'txt'))
-            return read_file(input_file_path)
+            store = ScrapeStore(os.path.join(input_dir or self.INPUT_DIR, generate_filename(query, 'jsonl')))
+            return store.select(top_k=self.TOP_K, max_chars=self._entry_chars)
         except Exception as e:
             logger.error(f"Error reading scraped content: {e}")
             raise
 
-    def _save_summary(self, summary: str, query: str) -> None:
+    def _read_scraped_content(self, query: str, input_dir: Optional[str] = None) -> str:
+        """
+        Reads the selected entries of the query's scrape store and renders them for the prompt.
+
+        Args:
+            query (str): Query string to locate the specific scraped content.
+            input_dir (Optional[str]): Folder holding the scrape store (default is INPUT_DIR).
+
+        Returns:
+            str: Scraped content as a string.
+        """
+        return format_entries(self._read_scraped_entries(query, input_dir))
+
+    def _generate(self, model_name: str, action: str, **values: str) -> str:
+        """
+        Fills one of the summarization templates and generates its response.
+
+        Args:
+            model_name (str): Model name to be used for generation.
+            action (str): Template action, 'summarize' or 'summarize_reduce'.
+            **values (str): Values for the template placeholders.
+
+        Returns:
+            str: Generated text.
+        """
+        system_instruction, user_instruction = self._build_prompt(action, **values)
+        response = self.response_generator.generate_response(model_name, system_instruction, [user_instruction])
+        return response.text.strip()
+
+    async def _agenerate(self, model_name: str, action: str, **values: str) -> str:
+        """
+        Asynchronous counterpart of `_generate`.
+
+        Args:
+            model_name (str): Model name to be used for generation.
+            action (str): Template action, 'summarize' or 'summarize_reduce'.
+            **values (str): Values for the template placeholders.
+
+        Returns:
+            str: Generated text.
+        """
+        system_instruction, user_instruction = self._build_prompt(action, **values)
+        response = await self.response_generator.agenerate_response(model_name, system_instruction, [user_instruction])
+        return response.text.strip()
+
+    def _build_prompt(self, action: str, **values: str) -> Tuple[str, str]:
+        """
+        Fills one of the summarization templates.
+
+        Args:
+            action (str): Template action, 'summarize' or 'summarize_reduce'.
+            **values (str): Values for the template placeholders.
+
+        Returns:
+            Tuple[str, str]: System and user instructions.
+        """
+        template: Dict[str, str] = self.template_manager.create_template('tools', action)
+        return template['system'], self.template_manager.fill_template(template['user'], **values)
+
+    def _template_tokens(self, action: str) -> int:
+        """
+        Estimates the tokens a template adds to a request on top of the filled-in content.
+
+        Args:
+            action (str): Template action, 'summarize' or 'summarize_reduce'.
+
+        Returns:
+            int: Estimated token count of the system and user instructions.
+        """
+        template = self.template_manager.create_template('tools', action)
+        return estimate_tokens(template['system']) + estimate_tokens(template['user'])
+
+    def _merge(self, model_name: str, query: str, summaries: List[str]) -> str:
+        """
+        Merges a group of partial summaries into one with the reduce template.
+
+        Args:
+            model_name (str): Model name to be used for summarization.
+            query (str): Query string to contextualize the summary.
+            summaries (List[str]): Partial summaries to merge.
+
+        Returns:
+            str: The merged summary, or the only summary of a single-element group.
+        """
+        if len(summaries) == 1:
+            return summaries[0]
+        return self._generate(model_name, 'summarize_reduce', query=query, partial_summaries=self._format_partial_summaries(summaries))
+
+    async def _amerge(self, model_name: str, query: str, summaries: List[str]) -> str:
+        """
+        Asynchronous counterpart of `_merge`.
+
+        Args:
+            model_name (str): Model name to be used for summarization.
+            query (str): Query string to contextualize the summary.
+            summaries (List[str]): Partial summaries to merge.
+
+        Returns:
+            str: The merged summary, or the only summary of a single-element group.
+        """
+        if len(summaries) == 1:
+            return summaries[0]
+        return await self._agenerate(model_name, 'summarize_reduce', query=query,
+                                     partial_summaries=self._format_partial_summaries(summaries))
+
+    @staticmethod
+    def _format_partial_summaries(summaries: List[str]) -> str:
+        """
+        Renders partial summaries for the reduce prompt.
+
+        Args:
+            summaries (List[str]): Partial summaries.
+
+        Returns:
+            str: Summaries rendered between BEGIN/END PARTIAL SUMMARY markers.
+        """
+        return "\n".join(
+            f"==== BEGIN PARTIAL SUMMARY ====\n{summary}\n==== END PARTIAL SUMMARY ====\n" for summary in summaries
+        )
+
+    def _group_summaries(self, summaries: List[str]) -> List[List[str]]:
+        """
+        Groups summaries for one reduce round, packing each group to the chunk budget.
+
+        Args:
+            summaries (List[str]): Summaries to merge.
+
+        Returns:
+            List[List[str]]: Groups of summaries, each merged into one.
+        """
+        groups: List[List[str]] = [[]]
+        group_tokens = 0
+        for summary in summaries:
+            summary_tokens = estimate_tokens(summary)
+            # Every group merges at least two summaries so each round makes progress
+            if len(groups[-1]) >= 2 and group_tokens + summary_tokens > self.CHUNK_TOKENS:
+                groups.append([])
+                group_tokens = 0
+            groups[-1].append(summary)
+            group_tokens += summary_tokens
+        return groups
+
+    def _reduce(self, model_name: str, query: str, partial_summaries: List[str]) -> str:
+        """
+        Merges partial summaries hierarchically: summaries are grouped to the chunk budget, each
+        group is merged concurrently, and rounds repeat until a single summary remains.
+
+        Args:
+            model_name (str): Model name to be used for summarization.
+            query (str): Query string to contextualize the summary.
+            partial_summaries (List[str]): Summaries of the individual chunks.
+
+        Returns:
+            str: The merged summary.
+        """
+        summaries = partial_summaries
+        round_number = 0
+        while len(summaries) > 1:
+            round_number += 1
+            groups = self._group_summaries(summaries)
+            logger.info(f"Reduce round {round_number}: merging {len(summaries)} summaries in {len(groups)} groups.")
+            with ThreadPoolExecutor(max_workers=min(self.MAX_MAP_WORKERS, len(groups))) as executor:
+                summaries = list(executor.map(lambda group: self._merge(model_name, query, group), groups))
+        return summaries[0]
+
+    def summarize_entries(self, model_name: str, query: str, entries: List[ScrapedPage]) -> str:
+        """
+        Summarizes scraped entries in a single request when the estimated prompt fits
+        `SINGLE_SHOT_TOKENS`, and with map-reduce over `CHUNK_TOKENS` chunks otherwise.
+
+        Args:
+            model_name (str): Model name to be used for summarization.
+            query (str): Query string to contextualize the summary.
+            entries (List[ScrapedPage]): Scraped entries to summarize.
+
+        Returns:
+            str: Generated summary.
+        """
+        scraped_content = format_entries(entries)
+        prompt_tokens = self._template_tokens('summarize') + estimate_tokens(scraped_content)
+        if prompt_tokens <= self.SINGLE_SHOT_TOKENS:
+            logger.info(f"Summarizing {len(entries)} entries (~{prompt_tokens} tokens) in a single request.")
+            return self._generate(model_name, 'summarize', query=query, scraped_content=scraped_content)
+
+        chunks = chunk_entries(entries, self.CHUNK_TOKENS)
+        logger.info(f"Summarizing {len(entries)} entries (~{prompt_tokens} tokens) with map-reduce over {len(chunks)} chunks.")
+        with ThreadPoolExecutor(max_workers=min(self.MAX_MAP_WORKERS, len(chunks))) as executor:
+            partial_summaries = list(executor.map(
+                lambda chunk: self._generate(model_name, 'summarize', query=query, scraped_content=format_entries(chunk)),
+                chunks
+            ))
+        return self._reduce(model_name, query, partial_summaries)
+
+    async def _areduce(self, model_name: str, query: str, partial_summaries: List[str]) -> str:
+        """
+        Asynchronous counterpart of `_reduce`; at most MAX_MAP_WORKERS merges are in flight at once.
+
+        Args:
+            model_name (str): Model name to be used for summarization.
+            query (str): Query string to contextualize the summary.
+            partial_summaries (List[str]): Summaries of the individual chunks.
+
+        Returns:
+            str: The merged summary.
+        """
+        limit = asyncio.Semaphore(self.MAX_MAP_WORKERS)
+
+        async def merge(group: List[str]) -> str:
+            async with limit:
+                return await self._amerge(model_name, query, group)
+
+        summaries = partial_summaries
+        round_number = 0
+        while len(summaries) > 1:
+            round_number += 1
+            groups = self._group_summaries(summaries)
+            logger.info(f"Reduce round {round_number}: merging {len(summaries)} summaries in {len(groups)} groups.")
+            summaries = list(await asyncio.gather(*(merge(group) for group in groups)))
+        return summaries[0]
+
+    async def asummarize_entries(self, model_name: str, query: str, entries: List[ScrapedPage]) -> str:
+        """
+        Asynchronous counterpart of `summarize_entries`; at most MAX_MAP_WORKERS chunk summaries
+        are in flight at once.
+
+        Args:
+            model_name (str): Model name to be used for summarization.
+            query (str): Query string to contextualize the summary.
+            entries (List[ScrapedPage]): Scraped entries to summarize.
+
+        Returns:
+            str: Generated summary.
+        """
+        scraped_content = format_entries(entries)
+        prompt_tokens = self._template_tokens('summarize') + estimate_tokens(scraped_content)
+        if prompt_tokens <= self.SINGLE_SHOT_TOKENS:
+            logger.info(f"Summarizing {len(entries)} entries (~{prompt_tokens} tokens) in a single request.")
+            return await self._agenerate(model_name, 'summarize', query=query, scraped_content=scraped_content)
+
+        chunks = chunk_entries(entries, self.CHUNK_TOKENS)
+        logger.info(f"Summarizing {len(entries)} entries (~{prompt_tokens} tokens) with map-reduce over {len(chunks)} chunks.")
+        limit = asyncio.Semaphore(self.MAX_MAP_WORKERS)
+
+        async def summarize_chunk(chunk: List[ScrapedPage]) -> str:
+            async with limit:
+                return await self._agenerate(model_name, 'summarize', query=query, scraped_content=format_entries(chunk))
+
+        partial_summaries = list(await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks)))
+        return await self._areduce(model_name, query, partial_summaries)
+
+    def _save_summary(self, summary: str, query: str, output_dir: Optional[str] = None) -> None:
         """
         Saves the generated summary to the specified output directory.
 
         Args:
             summary (str): Generated summary to save.
             query (str): Query string used to generate the filename.
+            output_dir (Optional[str]): Folder to save into (default is OUTPUT_DIR).
         """
-        output_path = os.path.join(self.OUTPUT_DIR, f"{generate_filename(query, 'txt')}")
+        output_path = os.path.join(output_dir or self.OUTPUT_DIR, f"{generate_filename(query, 'txt')}")
         try:
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             logger.info(f"Saving summary to {output_path}")
@@ -65,42 +411,95 @@ class WebContentSummarizeAgent(SummarizeTask):
             logger.error(f"Error saving summary: {e}", exc_info=True)
             raise
 
-    def run(self, model_name: str, query: str) -> str:
+    def run(self, model_name: str, query: str, scraped_pages: Optional[List[ScrapedPage]] = None, persist: bool = True,
+            workspace: Optional[Workspace] = None) -> str:
         """
         Executes the summarization process for scraped content, generating a summary and saving it.
 
         Args:
             model_name (str): Model name to be used for summarization.
             query (str): Query string to contextualize the summary.
+            scraped_pages (Optional[List[ScrapedPage]]): Scraped pages handed over in memory; read from disk if None.
+            persist (bool): Whether to save the summary to disk (default is True).
+            workspace (Optional[Workspace]): Folders to read from and write to (default is INPUT_DIR and OUTPUT_DIR).
 
         Returns:
             str: Generated summary.
         """
         try:
-            # Read content specific to the query
-            scraped_content = self._read_scraped_content(query)
-
-            # Generate prompt template
-            logger.info("Fetching and processing template for response generation.")
-            template: Dict[str, str] = self.template_manager.create_template('tools', 'summarize')
-            system_instruction = template['system']
-            user_instruction = self.template_manager.fill_template(
-                template['user'], query=query, scraped_content=scraped_content
-            )
-
-            # Generate response
-            logger.info("Generating response from LLM.")
-            response = self.response_generator.generate_response(
-                model_name, system_instruction, [user_instruction]
-            )
-            summary = response.text.strip()
-            logger.info("Response generated successfully.")
+            # Use the pages handed over in memory, or read content specific to the query
+            if scraped_pages is None:
+                entries = self._read_scraped_entries(query, workspace.scrape_dir if workspace else None)
+            else:
+                entries = select_entries(scraped_pages, self.TOP_K, self._entry_chars)
+
+            # Keep only the passages most relevant to the query
+            if self.relevance_filter is not None:
+                entries = self.relevance_filter.run(query, entries)
+
+            # Reuse the summary of identical content, or generate it single-shot or map-reduce
+            cache_key = self._summary_cache_key(model_name, query, entries) if self.summary_cache is not None else None
+            summary = self.summary_cache.get(cache_key) if cache_key else None
+            if summary is not None:
+                logger.info(f"Summary cache hit for query: '{query}'")
+            else:
+                logger.info("Generating response from LLM.")
+                summary = self.summarize_entries(model_name, query, entries)
+                logger.info("Response generated successfully.")
+                if cache_key and summary:
+                    self.summary_cache.set(cache_key, summary)
 
             # Save the summary
-            self._save_summary(summary, query)
+            if persist:
+                self._save_summary(summary, query, workspace.summarize_dir if workspace else None)
             
             return summary
         
         except Exception as e:
             logger.error(f"Error during summarization process: {e}", exc_info=True)
             raise
+
+    async def arun(self, model_name: str, query: str, scraped_pages: Optional[List[ScrapedPage]] = None, persist: bool = True,
+                   workspace: Optional[Workspace] = None) -> str:
+        """
+        Asynchronous counterpart of `run`. Model calls are awaited on the event loop; relevance
+        filtering and file and cache access run in worker threads.
+
+        Args:
+            model_name (str): Model name to be used for summarization.
+            query (str): Query string to contextualize the summary.
+            scraped_pages (Optional[List[ScrapedPage]]): Scraped pages handed over in memory; read from disk if None.
+            persist (bool): Whether to save the summary to disk (default is True).
+            workspace (Optional[Workspace]): Folders to read from and write to (default is INPUT_DIR and OUTPUT_DIR).
+
+        Returns:
+            str: Generated summary.
+        """
+        try:
+            if scraped_pages is None:
+                entries = await asyncio.to_thread(self._read_scraped_entries, query, workspace.scrape_dir if workspace else None)
+            else:
+                entries = select_entries(scraped_pages, self.TOP_K, self._entry_chars)
+
+            if self.relevance_filter is not None:
+                entries = await asyncio.to_thread(self.relevance_filter.run, query, entries)
+
+            cache_key = self._summary_cache_key(model_name, query, entries) if self.summary_cache is not None else None
+            summary = await asyncio.to_thread(self.summary_cache.get, cache_key) if cache_key else None
+            if summary is not None:
+                logger.info(f"Summary cache hit for query: '{query}'")
+            else:
+                logger.info("Generating response from LLM.")
+                summary = await self.asummarize_entries(model_name, query, entries)
+                logger.info("Response generated successfully.")
+                if cache_key and summary:
+                    await asyncio.to_thread(self.summary_cache.set, cache_key, summary)
+
+            if persist:
+                await asyncio.to_thread(self._save_summary, summary, query, workspace.summarize_dir if workspace else None)
+
+            return summary
+
+        except Exception as e:
+            logger.error(f"Error during summarization process: {e}", exc_info=True)
+            raise
@@ -1,6 +1,25 @@
+from src.patterns.web_access.workspace import Workspace
 from src.config.logging import logger
+from typing import TypedDict
+from typing import Optional
 from abc import abstractmethod
+from typing import List
 from abc import ABC
+import asyncio
+
+
+# Result of the search stage, in the shape stored under "Top Results" in the search output JSON.
+SearchResult = TypedDict('SearchResult', {'Position': int, 'Title': str, 'Link': str, 'Snippet': str})
+
+
+class ScrapedPage(TypedDict):
+    """
+    Result of the scrape stage for a single page.
+    """
+    title: str
+    url: str
+    snippet: str
+    content: str
 
 
 class SearchTask(ABC):
@@ -12,13 +31,20 @@ class SearchTask(ABC):
     """
 
     @abstractmethod
-    def run(self, model_name: str, query: str) -> None:
+    def run(self, model_name: str, query: str, location: str = '', persist: bool = True,
+            workspace: Optional[Workspace] = None) -> List[SearchResult]:
         """
         Executes the search task with the given model and query.
 
         Args:
             model_name (str): The name of the model to be used for the search.
             query (str): The search query.
+            location (str): Optional location context for the search.
+            persist (bool): Whether to save the results to disk for later stages.
+            workspace (Optional[Workspace]): Output folders for this run (default is the shared folders).
+
+        Returns:
+            List[SearchResult]: The top search results.
 
         Raises:
             NotImplementedError: If the subclass does not implement this method.
@@ -26,6 +52,24 @@ class SearchTask(ABC):
         logger.error("SearchTask run method not implemented.")
         raise NotImplementedError("Subclasses must implement the `run` method")
 
+    async def arun(self, model_name: str, query: str, location: str = '', persist: bool = True,
+                   workspace: Optional[Workspace] = None) -> List[SearchResult]:
+        """
+        Asynchronous variant of `run`. Defaults to running `run` in a worker thread; subclasses
+        override it with native async I/O.
+
+        Args:
+            model_name (str): The name of the model to be used for the search.
+            query (str): The search query.
+            location (str): Optional location context for the search.
+            persist (bool): Whether to save the results to disk for later stages.
+            workspace (Optional[Workspace]): Output folders for this run (default is the shared folders).
+
+        Returns:
+            List[SearchResult]: The top search results.
+        """
+        return await asyncio.to_thread(self.run, model_name, query, location, persist, workspace)
+
 
 class ScrapeTask(ABC):
     """
@@ -36,13 +80,20 @@ class ScrapeTask(ABC):
     """
 
     @abstractmethod
-    def run(self, model_name: str, query: str) -> None:
+    def run(self, query: str, location: str, results: Optional[List[SearchResult]] = None, persist: bool = True,
+            workspace: Optional[Workspace] = None) -> List[ScrapedPage]:
         """
-        Executes the scrape task with the given model and query.
+        Executes the scrape task for the given query.
 
         Args:
-            model_name (str): The name of the model to be used for scraping.
-            query (str): The query or URL to be scraped.
+            query (str): The query whose search results are scraped.
+            location (str): Location identifier used by the search stage.
+            results (Optional[List[SearchResult]]): Search results handed over in memory; loaded from disk if None.
+            persist (bool): Whether to save the scraped pages to disk for later stages.
+            workspace (Optional[Workspace]): Output folders for this run (default is the shared folders).
+
+        Returns:
+            List[ScrapedPage]: The scraped pages.
 
         Raises:
             NotImplementedError: If the subclass does not implement this method.
@@ -50,6 +101,24 @@ class ScrapeTask(ABC):
         logger.error("ScrapeTask run method not implemented.")
         raise NotImplementedError("Subclasses must implement the `run` method")
 
+    async def arun(self, query: str, location: str, results: Optional[List[SearchResult]] = None, persist: bool = True,
+                   workspace: Optional[Workspace] = None) -> List[ScrapedPage]:
+        """
+        Asynchronous variant of `run`. Defaults to running `run` in a worker thread; subclasses
+        override it with native async I/O.
+
+        Args:
+            query (str): The query whose search results are scraped.
+            location (str): Location identifier used by the search stage.
+            results (Optional[List[SearchResult]]): Search results handed over in memory; loaded from disk if None.
+            persist (bool): Whether to save the scraped pages to disk for later stages.
+            workspace (Optional[Workspace]): Output folders for this run (default is the shared folders).
+
+        Returns:
+            List[ScrapedPage]: The scraped pages.
+        """
+        return await asyncio.to_thread(self.run, query, location, results, persist, workspace)
+
 
 class SummarizeTask(ABC):
     """
@@ -60,16 +129,41 @@ class SummarizeTask(ABC):
     """
 
     @abstractmethod
-    def run(self, model_name: str, query: str) -> None:
+    def run(self, model_name: str, query: str, scraped_pages: Optional[List[ScrapedPage]] = None, persist: bool = True,
+            workspace: Optional[Workspace] = None) -> str:
         """
         Executes the summarization task with the given model and query.
 
         Args:
             model_name (str): The name of the model to be used for summarization.
             query (str): The query or input data to be summarized.
+            scraped_pages (Optional[List[ScrapedPage]]): Scraped pages handed over in memory; loaded from disk if None.
+            persist (bool): Whether to save the summary to disk.
+            workspace (Optional[Workspace]): Output folders for this run (default is the shared folders).
+
+        Returns:
+            str: The generated summary.
 
         Raises:
             NotImplementedError: If the subclass does not implement this method.
         """
         logger.error("SummarizeTask run method not implemented.")
         raise NotImplementedError("Subclasses must implement the `run` method")
+
+    async def arun(self, model_name: str, query: str, scraped_pages: Optional[List[ScrapedPage]] = None, persist: bool = True,
+                   workspace: Optional[Workspace] = None) -> str:
+        """
+        Asynchronous variant of `run`. Defaults to running `run` in a worker thread; subclasses
+        override it with native async I/O.
+
+        Args:
+            model_name (str): The name of the model to be used for summarization.
+            query (str): The query or input data to be summarized.
+            scraped_pages (Optional[List[ScrapedPage]]): Scraped pages handed over in memory; loaded from disk if None.
+            persist (bool): Whether to save the summary to disk.
+            workspace (Optional[Workspace]): Output folders for this run (default is the shared folders).
+
+        Returns:
+            str: The generated summary.
+        """
+        return await asyncio.to_thread(self.run, model_name, query, scraped_pages, persist, workspace)
@@ -0,0 +1,163 @@
+from src.config.logging import logger
+from typing import Optional
+from typing import List
+import shutil
+import uuid
+import time
+import os
+
+
+class Workspace:
+    """
+    Set of output folders used by one web_access run.
+
+    The default workspace is the shared `output/{search,scrape,summarize}` layout. Per-run
+    workspaces live under `output/runs/<run_id>/` so concurrent runs never read or delete
+    each other's intermediate files. A per-run workspace is marked active from its creation until
+    `release` is called; `prune_runs` never deletes an active workspace and keeps only the most
+    recent `MAX_RUNS` finished ones.
+
+    Attributes:
+        ROOT (str): Root of the shared output folders.
+        MAX_RUNS (int): Default number of finished per-run workspaces kept by `prune_runs`.
+        ACTIVE_MARKER (str): File marking a per-run workspace whose run has not finished.
+        ABANDONED_AFTER (int): Seconds after which an active marker is taken to be left by a crashed run.
+        root (str): Root of this workspace.
+        run_id (Optional[str]): Identifier of the run owning this workspace, None for the shared one.
+        search_dir (str): Folder for search results (JSON).
+        scrape_dir (str): Folder for scraped content (JSONL).
+        summarize_dir (str): Folder for generated summaries.
+    """
+    ROOT = './data/patterns/web_access/output'
+    MAX_RUNS = 50
+    ACTIVE_MARKER = '.active'
+    ABANDONED_AFTER = 24 * 60 * 60
+
+    def __init__(self, root: str = ROOT, run_id: Optional[str] = None) -> None:
+        """
+        Initializes a workspace rooted at the given folder.
+
+        Args:
+            root (str): Root folder of the workspace (default is the shared output folder).
+            run_id (Optional[str]): Identifier of the run owning this workspace.
+        """
+        self.root = root
+        self.run_id = run_id
+        self.search_dir = os.path.join(root, 'search')
+        self.scrape_dir = os.path.join(root, 'scrape')
+        self.summarize_dir = os.path.join(root, 'summarize')
+
+    @classmethod
+    def for_run(cls, run_id: Optional[str] = None) -> 'Workspace':
+        """
+        Creates a workspace namespaced to a single run and marks it active.
+
+        Args:
+            run_id (Optional[str]): Identifier of the run (default is a random UUID).
+
+        Returns:
+            Workspace: A workspace under `output/runs/<run_id>`.
+        """
+        run_id = run_id or uuid.uuid4().hex
+        workspace = cls(os.path.join(cls.ROOT, 'runs', run_id), run_id=run_id)
+        os.makedirs(workspace.root, exist_ok=True)
+        open(workspace.marker_path, 'w').close()
+        return workspace
+
+    @property
+    def marker_path(self) -> str:
+        """
+        Returns:
+            str: Path of the file marking this workspace active.
+        """
+        return os.path.join(self.root, self.ACTIVE_MARKER)
+
+    def release(self) -> None:
+        """
+        Marks the run as finished, making its workspace eligible for `prune_runs`. Removing the
+        marker also updates the workspace's modification time, so runs are ranked by completion.
+        """
+        if self.run_id is None:
+            return
+        try:
+            os.unlink(self.marker_path)
+        except FileNotFoundError:
+            pass
+
+    def is_active(self) -> bool:
+        """
+        Returns:
+            bool: Whether the run is still writing to this workspace, judging by its active marker.
+        """
+        try:
+            return time.time() - os.path.getmtime(self.marker_path) < self.ABANDONED_AFTER
+        except OSError:
+            return False
+
+    @property
+    def folders(self) -> List[str]:
+        """
+        Returns:
+            List[str]: The search, scrape and summarize folders of this workspace.
+        """
+        return [self.search_dir, self.scrape_dir, self.summarize_dir]
+
+    def flush(self) -> None:
+        """
+        Flushes all files in the workspace folders, removing previous results.
+        """
+        for folder in self.folders:
+            try:
+                if os.path.exists(folder):
+                    for filename in os.listdir(folder):
+                        file_path = os.path.join(folder, filename)
+                        if os.path.isfile(file_path):
+                            os.unlink(file_path)
+                        elif os.path.isdir(file_path):
+                            shutil.rmtree(file_path)
+                    logger.info(f"Flushed output folder: {folder}")
+                else:
+                    logger.warning(f"Output folder does not exist: {folder}")
+            except Exception as e:
+                logger.error(f"Error flushing folder {folder}: {str(e)}")
+
+    @classmethod
+    def prune_runs(cls, keep: int = MAX_RUNS) -> int:
+        """
+        Deletes all but the `keep` most recently finished per-run workspaces. Workspaces of runs
+        still in progress are skipped, unless their marker is older than ABANDONED_AFTER.
+
+        Args:
+            keep (int): Number of finished per-run workspaces to keep (default is MAX_RUNS).
+
+        Returns:
+            int: Number of workspaces removed.
+        """
+        runs_dir = os.path.join(cls.ROOT, 'runs')
+        if not os.path.isdir(runs_dir):
+            return 0
+        runs = []
+        for run_id in os.listdir(runs_dir):
+            workspace = cls(os.path.join(runs_dir, run_id), run_id=run_id)
+            try:
+                if os.path.isdir(workspace.root) and not workspace.is_active():
+                    runs.append((os.path.getmtime(workspace.root), workspace))
+            except OSError:
+                continue  # Removed concurrently
+        runs.sort(key=lambda run: run[0], reverse=True)
+        stale = runs[max(0, keep):]
+        for _, workspace in stale:
+            workspace.remove()
+        if stale:
+            logger.info(f"Pruned {len(stale)} old run workspaces, keeping {keep} finished ones.")
+        return len(stale)
+
+    def remove(self) -> None:
+        """
+        Deletes a per-run workspace entirely. The shared workspace is never removed.
+        """
+        if self.run_id is None:
+            logger.warning("Refusing to remove the shared output workspace.")
+            return
+        shutil.rmtree(self.root, ignore_errors=True)
+        logger.info(f"Removed workspace for run {self.run_id}")
@@ -0,0 +1,88 @@
+from typing import Awaitable
+from typing import Callable
+from typing import Optional
+from typing import TypeVar
+from typing import Generic
+import threading
+import asyncio
+import weakref
+
+
+T = TypeVar('T')
+
+
+class LoopLocal(Generic[T]):
+    """
+    Holds one lazily created object per running event loop.
+
+    Async clients such as aiohttp sessions are bound to the loop they were created on, so objects
+    that outlive a single `asyncio.run` (shared agents, pipelines) keep one client per loop here.
+    Entries disappear together with their loop. When a closer is given, each object is also closed
+    as its loop shuts down: a watcher task is started next to it, and `asyncio.run` cancels the
+    watcher before closing the loop, so no client is left unclosed.
+    """
+
+    def __init__(self, factory: Callable[[], T], closer: Optional[Callable[[T], Awaitable[None]]] = None) -> None:
+        """
+        Initializes the holder.
+
+        Args:
+            factory (Callable[[], T]): Creates the object for a loop; called on that loop.
+            closer (Optional[Callable[[T], Awaitable[None]]]): Closes an object when its loop shuts down (default is none).
+        """
+        self._factory = factory
+        self._closer = closer
+        self._values: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, T]' = weakref.WeakKeyDictionary()
+        self._watchers: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Task]' = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        """
+        Returns the object of the running loop, creating it on first use.
+
+        Returns:
+            T: The object bound to the running loop.
+
+        Raises:
+            RuntimeError: If called outside a running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._values:
+                value = self._factory()
+                self._values[loop] = value
+                if self._closer is not None:
+                    self._watchers[loop] = loop.create_task(self._close_on_shutdown(loop, value))
+            return self._values[loop]
+
+    async def _close_on_shutdown(self, loop: asyncio.AbstractEventLoop, value: T) -> None:
+        """
+        Waits until cancelled by the loop shutting down, then closes the object if it is still held.
+        """
+        try:
+            await loop.create_future()
+        except asyncio.CancelledError:
+            with self._lock:
+                owned = self._values.get(loop) is value
+                if owned:
+                    del self._values[loop]
+                    self._watchers.pop(loop, None)
+            if owned:
+                await self._closer(value)
+            raise
+
+    def pop(self) -> Optional[T]:
+        """
+        Removes and returns the object of the running loop, if one was created. The caller is
+        responsible for closing it.
+
+        Returns:
+            Optional[T]: The removed object, or None.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            value = self._values.pop(loop, None)
+            watcher = self._watchers.pop(loop, None)
+        if watcher is not None:
+            watcher.cancel()
+        return value
@@ -0,0 +1,142 @@
+from src.config.logging import logger
+from typing import Optional
+from typing import Any
+import threading
+import hashlib
+import sqlite3
+import json
+import time
+import os
+
+
+class PersistentCache:
+    """
+    Thread-safe key-value cache persisted in a SQLite file, with optional time-to-live
+    and least-recently-used eviction. Values must be JSON serializable.
+
+    Attributes:
+        path (str): Path to the SQLite database file.
+        ttl (Optional[float]): Seconds after which an entry expires, or None to never expire.
+        max_entries (Optional[int]): Maximum number of entries kept, or None for no limit.
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = None, max_entries: Optional[int] = None) -> None:
+        """
+        Opens (or creates) the cache database.
+
+        Args:
+            path (str): Path to the SQLite database file.
+            ttl (Optional[float]): Seconds after which an entry expires (default is never).
+            max_entries (Optional[int]): Maximum number of entries kept (default is no limit).
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Builds a stable cache key from JSON-serializable parts.
+
+        Args:
+            *parts (Any): Values identifying the cached item.
+
+        Returns:
+            str: SHA-256 hex digest of the parts.
+        """
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Retrieves a value, dropping it if it has expired.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            Optional[Any]: The cached value, or None on a miss.
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute("SELECT value, created_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            self._connection.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Stores a value, evicting the least recently used entries beyond `max_entries`.
+
+        Args:
+            key (str): Cache key.
+            value (Any): JSON-serializable value.
+        """
+        now = time.time()
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now)
+            )
+            if self.max_entries is not None:
+                self._connection.execute(
+                    "DELETE FROM cache WHERE key IN ("
+                    "SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+
+    def delete(self, key: str) -> None:
+        """
+        Removes a single entry.
+
+        Args:
+            key (str): Cache key.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        """
+        Removes every expired entry.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        if self.ttl is None:
+            return 0
+        with self._lock, self._connection:
+            cursor = self._connection.execute("DELETE FROM cache WHERE created_at < ?", (time.time() - self.ttl,))
+        logger.info(f"Purged {cursor.rowcount} expired entries from '{self.path}'")
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        """
+        Removes every entry.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM cache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Closes the underlying database connection.
+        """
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,171 @@
+from src.utils.tokens import tokens_to_chars
+from typing import List
+import re
+
+
+# Paragraphs that open a new chapter or section: "CHAPTER XII", "Part Two", "BOOK I. ...", "# Title"
+HEADING_PATTERN = re.compile(r'^(?:(?:chapter|part|book|section|act)\s+[\w.-]+\b|#{1,6}\s)', re.IGNORECASE)
+PARAGRAPH_SEPARATOR = '\n\n'
+SAMPLE_SEPARATOR = '\n\n[...]\n\n'
+MIN_SAMPLE_CHARS = 400  # Smallest excerpt worth taking from a chunk when sampling a document
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """
+    Splits text into paragraphs at blank lines.
+
+    Args:
+        text (str): Document text.
+
+    Returns:
+        List[str]: Non-empty paragraphs, stripped, in order.
+    """
+    return [paragraph.strip() for paragraph in re.split(r'\n\s*\n', text) if paragraph.strip()]
+
+
+def is_heading(paragraph: str) -> bool:
+    """
+    Args:
+        paragraph (str): A paragraph.
+
+    Returns:
+        bool: Whether the paragraph starts a chapter or section.
+    """
+    return bool(HEADING_PATTERN.match(paragraph))
+
+
+def split_long_paragraph(paragraph: str, max_chars: int) -> List[str]:
+    """
+    Splits a paragraph longer than `max_chars` into pieces, cutting at the last sentence end in
+    the second half of each piece where possible and at a word boundary otherwise.
+
+    Args:
+        paragraph (str): The paragraph.
+        max_chars (int): Maximum characters per piece.
+
+    Returns:
+        List[str]: The pieces, in order.
+    """
+    pieces = []
+    remaining = paragraph
+    while len(remaining) > max_chars:
+        window = remaining[:max_chars]
+        cut = max(window.rfind('. '), window.rfind('? '), window.rfind('! ')) + 1
+        if cut < max_chars // 2:
+            cut = window.rfind(' ')
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(remaining[:cut].strip())
+        remaining = remaining[cut:].strip()
+    if remaining:
+        pieces.append(remaining)
+    return pieces
+
+
+def _tail(paragraphs: List[str], max_chars: int) -> List[str]:
+    """
+    Returns the trailing paragraphs that fit in `max_chars`, or the end of the last paragraph
+    (from a word boundary) if even that does not fit.
+    """
+    tail: List[str] = []
+    size = 0
+    for paragraph in reversed(paragraphs):
+        size += len(paragraph) + len(PARAGRAPH_SEPARATOR)
+        if size > max_chars:
+            break
+        tail.insert(0, paragraph)
+    if tail or not paragraphs or max_chars <= 0:
+        return tail
+    end = paragraphs[-1][-max_chars:]
+    boundary = end.find(' ')
+    return [end[boundary + 1:] if boundary >= 0 else end]
+
+
+def chunk_text(text: str, max_tokens: int, overlap_tokens: int = 0) -> List[str]:
+    """
+    Splits a document into chunks of at most `max_tokens` for processing in separate requests.
+
+    Chunks are packed from whole paragraphs; only paragraphs larger than a chunk are split. A
+    chapter or section heading starts a new chunk once the current one is at least half full, so
+    chunks follow the document's structure without producing many tiny chunks. Each chunk after
+    the first within a chapter repeats up to `overlap_tokens` from the end of the previous chunk,
+    so items that straddle a boundary are seen whole at least once.
+
+    Args:
+        text (str): Document text.
+        max_tokens (int): Token budget of one chunk, including its overlap.
+        overlap_tokens (int): Tokens repeated from the previous chunk (default is 0).
+
+    Returns:
+        List[str]: The chunks, in document order.
+
+    Raises:
+        ValueError: If the overlap is not smaller than half the chunk budget.
+    """
+    if overlap_tokens * 2 >= max_tokens:
+        raise ValueError("overlap_tokens must be smaller than half of max_tokens")
+    max_chars = tokens_to_chars(max_tokens)
+    overlap_chars = tokens_to_chars(overlap_tokens)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0  # Characters of the current chunk, separators included
+    new_size = 0  # Characters of the current chunk that are not overlap
+
+    for paragraph in split_paragraphs(text):
+        chapter_start = is_heading(paragraph)
+        for piece in split_long_paragraph(paragraph, max_chars - overlap_chars - len(PARAGRAPH_SEPARATOR)):
+            added = len(piece) + (len(PARAGRAPH_SEPARATOR) if current else 0)
+            full = size + added > max_chars
+            if new_size and (full or (chapter_start and new_size >= max_chars // 2)):
+                chunks.append(PARAGRAPH_SEPARATOR.join(current))
+                # Chapters are self-contained, so only carry an overlap within a chapter
+                current = [] if chapter_start else _tail(current, overlap_chars)
+                size = len(PARAGRAPH_SEPARATOR.join(current))
+                added = len(piece) + (len(PARAGRAPH_SEPARATOR) if current else 0)
+                new_size = 0
+            current.append(piece)
+            size += added
+            new_size += added
+            chapter_start = False
+
+    if new_size:
+        chunks.append(PARAGRAPH_SEPARATOR.join(current))
+    return chunks
+
+
+def sample_chunks(chunks: List[str], max_tokens: int) -> str:
+    """
+    Builds an excerpt of a whole document that fits in `max_tokens`, for tasks such as planning
+    that need an overview of the document but not all of it. The budget is split evenly across
+    the chunks, taking the opening paragraphs of each; if the chunks are too many for every one to
+    get MIN_SAMPLE_CHARS, evenly spaced chunks are sampled instead. Excerpts are separated by
+    "[...]" so the omissions stay visible.
+
+    Args:
+        chunks (List[str]): The chunks of the document, in order (see chunk_text).
+        max_tokens (int): Token budget of the excerpt.
+
+    Returns:
+        str: The excerpt, in document order.
+    """
+    if not chunks:
+        return ''
+    max_chars = tokens_to_chars(max_tokens)
+    count = max(1, min(len(chunks), max_chars // (MIN_SAMPLE_CHARS + len(SAMPLE_SEPARATOR))))
+    indices = sorted({round(i * (len(chunks) - 1) / max(1, count - 1)) for i in range(count)})
+    budget = max_chars // len(indices) - len(SAMPLE_SEPARATOR)
+
+    excerpts = []
+    for idx in indices:
+        excerpt: List[str] = []
+        size = 0
+        for paragraph in split_paragraphs(chunks[idx]):
+            size += len(paragraph) + (len(PARAGRAPH_SEPARATOR) if excerpt else 0)
+            if size > budget:
+                if not excerpt:
+                    excerpt.append(split_long_paragraph(paragraph, budget)[0])
+                break
+            excerpt.append(paragraph)
+        excerpts.append(PARAGRAPH_SEPARATOR.join(excerpt))
+    return SAMPLE_SEPARATOR.join(excerpts)
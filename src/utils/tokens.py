@@ -0,0 +1,45 @@
+from typing import Iterable
+import math
+
+
+# Average characters per token for English prose across Gemini and GPT-style tokenizers.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens in a text locally, without a tokenizer round-trip.
+
+    Args:
+        text (str): Text to measure.
+
+    Returns:
+        int: Estimated token count.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def estimate_total_tokens(texts: Iterable[str]) -> int:
+    """
+    Estimates the combined number of tokens in several texts.
+
+    Args:
+        texts (Iterable[str]): Texts to measure.
+
+    Returns:
+        int: Estimated token count.
+    """
+    return sum(estimate_tokens(text) for text in texts)
+
+
+def tokens_to_chars(tokens: int) -> int:
+    """
+    Converts a token budget into the matching character budget.
+
+    Args:
+        tokens (int): Token budget.
+
+    Returns:
+        int: Character budget.
+    """
+    return tokens * CHARS_PER_TOKEN
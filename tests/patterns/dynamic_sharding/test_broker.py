@@ -0,0 +1,64 @@
+from src.patterns.dynamic_sharding.backends import BrokerBackend
+from src.patterns.dynamic_sharding.broker import SQLiteBroker
+from src.patterns.dynamic_sharding import worker
+from typing import Iterator
+from typing import List
+import threading
+import asyncio
+import pytest
+import time
+
+
+@pytest.fixture
+def broker(tmp_path) -> Iterator[SQLiteBroker]:
+    sqlite_broker = SQLiteBroker(str(tmp_path / 'broker.db'), lease=0.2)
+    yield sqlite_broker
+    sqlite_broker.close()
+
+
+def test_tasks_are_claimed_once_in_order(broker: SQLiteBroker) -> None:
+    broker.submit('job', [['a'], ['b']])
+    assert broker.claim('w1') == ('job', 0, ['a'])
+    assert broker.claim('w2') == ('job', 1, ['b'])
+    assert broker.claim('w3') is None
+
+
+def test_results_wait_for_every_task(broker: SQLiteBroker) -> None:
+    broker.submit('job', [['a'], ['b']])
+    for worker_name in ('w1', 'w2'):
+        job, position, payload = broker.claim(worker_name)
+        assert broker.results(job) is None
+        broker.complete(job, position, [entity.upper() for entity in payload])
+    assert broker.results('job') == [['A'], ['B']]
+    broker.delete('job')
+    assert broker.claim('w1') is None
+
+
+def test_expired_lease_is_claimed_again(broker: SQLiteBroker) -> None:
+    broker.submit('job', [['a']])
+    assert broker.claim('crashed') == ('job', 0, ['a'])
+    assert broker.claim('w2') is None
+    time.sleep(broker.lease + 0.05)
+    assert broker.claim('w2') == ('job', 0, ['a'])
+
+
+def test_backend_collects_results_from_workers(broker: SQLiteBroker, monkeypatch: pytest.MonkeyPatch) -> None:
+    def run_shard(entities: List[str]) -> List[dict]:
+        return [{'entity': entity, 'info': entity, 'ok': True, 'latency': 0.0, 'cached': False} for entity in entities]
+
+    monkeypatch.setattr(worker, 'run_shard', run_shard)
+    monkeypatch.setattr(BrokerBackend, 'POLL_INTERVAL', 0.01)
+    workers = [
+        threading.Thread(target=worker.serve, args=(broker,), kwargs={'idle_timeout': 0.5, 'poll_interval': 0.01})
+        for _ in range(2)
+    ]
+    for thread in workers:
+        thread.start()
+
+    backend = BrokerBackend(broker, timeout=10)
+    results = asyncio.run(backend.run_shards([['a', 'b'], ['c']]))
+    for thread in workers:
+        thread.join()
+
+    assert [[result['entity'] for result in shard] for shard in results] == [['a', 'b'], ['c']]
+    assert broker.claim('late') is None
@@ -0,0 +1,45 @@
+from src.patterns.web_access.dedup import DuplicateFilter
+from src.patterns.web_access.dedup import SimHashIndex
+from src.patterns.web_access.dedup import simhash
+import pytest
+import random
+
+
+def passage(seed: int) -> str:
+    rng = random.Random(seed)
+    return ' '.join(f"word{rng.randrange(100_000)}" for _ in range(DuplicateFilter.PASSAGE_WORDS)) + '.'
+
+
+def page(url: str, *passages: str) -> dict:
+    return {'title': url, 'url': url, 'snippet': '', 'content': ' '.join(passages)}
+
+
+@pytest.fixture
+def index(tmp_path) -> SimHashIndex:
+    return SimHashIndex(str(tmp_path / 'simhash.db'))
+
+
+def test_duplicates_within_a_run_are_kept_once() -> None:
+    shared = passage(1)
+    pages = [page('https://a', shared, passage(2)), page('https://b', shared, passage(3))]
+    deduplicated = DuplicateFilter(persist=False).run(pages)
+    assert deduplicated[0]['content'] == pages[0]['content']
+    assert deduplicated[1]['content'] == passage(3)
+
+
+def test_passage_is_left_to_its_canonical_page(index: SimHashIndex) -> None:
+    shared = passage(1)
+    index.add_many([(simhash(shared), 'https://b')])
+    pages = [page('https://a', shared, passage(2)), page('https://b', passage(3), shared)]
+    deduplicated = DuplicateFilter(index=index).run(pages)
+    assert deduplicated[0]['content'] == passage(2)
+    assert deduplicated[1]['content'] == pages[1]['content']
+
+
+def test_passage_is_kept_when_its_canonical_page_no_longer_carries_it(index: SimHashIndex) -> None:
+    shared = passage(1)
+    index.add_many([(simhash(shared), 'https://b')])
+    pages = [page('https://a', shared, passage(2)), page('https://b', passage(3))]
+    deduplicated = DuplicateFilter(index=index).run(pages)
+    assert deduplicated[0]['content'] == pages[0]['content']
+    assert index.lookup(simhash(shared), DuplicateFilter.MAX_DISTANCE)[1] == 'https://a'
@@ -0,0 +1,135 @@
+from http.server import ThreadingHTTPServer
+from http.server import BaseHTTPRequestHandler
+from src.patterns.web_access.serp import AsyncSerpAPIClient
+from src.patterns.web_access.serp import SerpAPIClient
+from src.patterns.web_access.serp import RateLimiter
+from src.patterns.web_access import serp
+from src.utils.cache import PersistentCache
+from typing import Iterator
+from typing import Tuple
+from typing import List
+import threading
+import asyncio
+import pytest
+import json
+import time
+
+
+RESULTS = {'organic_results': [{'title': 'Result', 'link': 'https://example.com', 'snippet': 'Snippet'}]}
+
+
+class SerpStub:
+    """
+    Local stand-in for the SERP API. Replies with the queued (status, body) responses in order,
+    repeating the last one, and records the time of every request it receives.
+    """
+
+    def __init__(self) -> None:
+        self.responses: List[Tuple[int, str]] = [(200, json.dumps(RESULTS))]
+        self.request_times: List[float] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                stub.request_times.append(time.monotonic())
+                status, body = stub.responses.pop(0) if len(stub.responses) > 1 else stub.responses[0]
+                payload = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/search.json"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def hits(self) -> int:
+        return len(self.request_times)
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub() -> Iterator[SerpStub]:
+    server = SerpStub()
+    yield server
+    server.close()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(serp, 'BACKOFF_FACTOR', 0)
+
+
+@pytest.fixture
+def cache(tmp_path) -> PersistentCache:
+    return PersistentCache(str(tmp_path / 'serp.db'))
+
+
+def test_sync_client_retries_429_and_caches(stub: SerpStub, cache: PersistentCache) -> None:
+    stub.responses = [(429, '{}'), (429, '{}'), (200, json.dumps(RESULTS))]
+    client = SerpAPIClient('key', base_url=stub.url, cache=cache)
+    try:
+        assert client.search('python') == RESULTS
+        assert stub.hits == 3
+        assert client.search('python') == RESULTS
+        assert stub.hits == 3
+    finally:
+        client.close()
+
+
+def test_sync_client_gives_up_after_max_retries(stub: SerpStub, cache: PersistentCache) -> None:
+    stub.responses = [(503, '{}')]
+    client = SerpAPIClient('key', base_url=stub.url, max_retries=2, cache=cache)
+    try:
+        status, _ = client.search('python')
+        assert status == 503
+        assert stub.hits == 3
+        assert cache.get(PersistentCache.make_key('python', 'google', '')) is None
+    finally:
+        client.close()
+
+
+def test_sync_retries_wait_for_the_rate_limiter(stub: SerpStub) -> None:
+    stub.responses = [(429, '{}'), (429, '{}'), (200, json.dumps(RESULTS))]
+    limiter = RateLimiter(rate=10)
+    client = SerpAPIClient('key', base_url=stub.url, rate_limiter=limiter)
+    try:
+        assert client.search('python') == RESULTS
+    finally:
+        client.close()
+    gaps = [later - earlier for earlier, later in zip(stub.request_times, stub.request_times[1:])]
+    assert all(gap >= limiter.interval * 0.9 for gap in gaps)
+
+
+def test_async_client_retries_429_and_caches(stub: SerpStub, cache: PersistentCache) -> None:
+    stub.responses = [(429, '{}'), (200, json.dumps(RESULTS))]
+
+    async def search_twice() -> Tuple[object, object]:
+        async with AsyncSerpAPIClient('key', base_url=stub.url, cache=cache) as client:
+            return await client.search('python'), await client.search('python')
+
+    first, second = asyncio.run(search_twice())
+    assert first == RESULTS
+    assert second == RESULTS
+    assert stub.hits == 2
+
+
+def test_async_client_reports_invalid_json(stub: SerpStub, cache: PersistentCache) -> None:
+    stub.responses = [(200, 'not json')]
+
+    async def search() -> object:
+        async with AsyncSerpAPIClient('key', base_url=stub.url, cache=cache) as client:
+            return await client.search('python')
+
+    status, _ = asyncio.run(search())
+    assert status == 0
+    assert stub.hits == 1
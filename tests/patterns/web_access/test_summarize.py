@@ -0,0 +1,50 @@
+from src.patterns.web_access.summarize import WebContentSummarizeAgent
+from src.patterns.web_access.scrape import WebScrapeAgent
+from src.patterns.web_access.serp import TOP_RESULTS
+from src.llm.generate import ResponseGenerator
+from src.utils.tokens import estimate_tokens
+from types import SimpleNamespace
+from typing import List
+import pytest
+
+
+def make_pages(count: int, chars: int) -> List[dict]:
+    return [
+        {'title': f"Page {i}", 'url': f"https://example.com/{i}", 'snippet': 'Snippet', 'content': ('word ' * chars)[:chars]}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def requests_sent(monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    sent: List[str] = []
+
+    def generate_response(self, model_name, system_instruction, contents, *args, **kwargs):
+        sent.append(contents[0])
+        return SimpleNamespace(text='summary')
+
+    monkeypatch.setattr(ResponseGenerator, 'generate_response', generate_response)
+    return sent
+
+
+def test_default_scrape_is_summarized_in_one_request(requests_sent: List[str]) -> None:
+    agent = WebContentSummarizeAgent(relevance_tokens=None, cache_summaries=False)
+    pages = make_pages(TOP_RESULTS, WebScrapeAgent.MAX_CHARS)
+    assert agent.summarize_entries('model', 'query', pages) == 'summary'
+    assert len(requests_sent) == 1
+
+
+def test_scrape_above_the_default_caps_is_map_reduced(requests_sent: List[str]) -> None:
+    agent = WebContentSummarizeAgent(relevance_tokens=None, cache_summaries=False)
+    pages = make_pages(2 * TOP_RESULTS, 2 * WebScrapeAgent.MAX_CHARS)
+    assert agent.summarize_entries('model', 'query', pages) == 'summary'
+    # One request per chunk plus at least one reduce request
+    assert len(requests_sent) > 2
+    assert all(estimate_tokens(request) <= agent.CHUNK_TOKENS + agent.PROMPT_OVERHEAD_TOKENS for request in requests_sent)
+
+
+def test_default_scrape_is_filtered_to_the_relevance_budget() -> None:
+    agent = WebContentSummarizeAgent(cache_summaries=False)
+    pages = make_pages(TOP_RESULTS, WebScrapeAgent.MAX_CHARS)
+    filtered = agent.relevance_filter.run('word', pages)
+    assert sum(estimate_tokens(page['content']) for page in filtered) <= agent.RELEVANCE_TOKENS